@@ -44,7 +44,15 @@ async function initializeClients() {
 }
 
 // Date range helper
+const ISO_DATE = /^\d{4}-\d{2}-\d{2}$/;
+
 function parseDateRange(range: string) {
+  // Explicit "YYYY-MM-DD..YYYY-MM-DD" ranges, as built by requestDateRange
+  const [explicitStart, explicitEnd] = range.split('..');
+  if (ISO_DATE.test(explicitStart) && ISO_DATE.test(explicitEnd || '')) {
+    return { startDate: explicitStart, endDate: explicitEnd };
+  }
+
   const endDate = new Date();
   const startDate = new Date();
 
@@ -58,6 +66,9 @@ function parseDateRange(range: string) {
     case '7days':
       startDate.setDate(startDate.getDate() - 7);
       break;
+    case '14days':
+      startDate.setDate(startDate.getDate() - 14);
+      break;
     case '30days':
       startDate.setDate(startDate.getDate() - 30);
       break;
@@ -86,6 +97,17 @@ function parseDateRange(range: string) {
   };
 }
 
+// Date range for a request: explicit startDate/endDate query params take
+// precedence over the dateRange alias
+function requestDateRange(req: express.Request, fallback: string) {
+  const { startDate, endDate } = req.query;
+  if (typeof startDate === 'string' && typeof endDate === 'string'
+      && ISO_DATE.test(startDate) && ISO_DATE.test(endDate)) {
+    return `${startDate}..${endDate}`;
+  }
+  return req.query.dateRange as string || fallback;
+}
+
 // GA Data fetching functions
 async function getAnalyticsSummary(dateRange = '30days') {
   const { startDate, endDate } = parseDateRange(dateRange);
@@ -120,7 +142,7 @@ async function getAnalyticsSummary(dateRange = '30days') {
   };
 }
 
-async function getTopPages(dateRange = '30days', limit = 10, pagePathFilter?: string) {
+async function getTopPages(dateRange = '30days', limit = 10, pagePathFilter?: string, offset = 0) {
   const { startDate, endDate } = parseDateRange(dateRange);
   
   // Build request with optional page path filter
@@ -138,6 +160,7 @@ async function getTopPages(dateRange = '30days', limit = 10, pagePathFilter?: st
       { name: 'bounceRate' },
     ],
     limit,
+    offset,
     orderBys: [
       {
         metric: { metricName: 'screenPageViews' },
@@ -673,7 +696,7 @@ app.get('/health', (req, res) => {
 
 app.get('/api/summary', async (req, res) => {
   try {
-    const dateRange = req.query.dateRange as string || '30days';
+    const dateRange = requestDateRange(req, '30days');
     const data = await getAnalyticsSummary(dateRange);
     res.json(data);
   } catch (error) {
@@ -687,10 +710,11 @@ app.get('/api/summary', async (req, res) => {
 
 app.get('/api/pages', async (req, res) => {
   try {
-    const dateRange = req.query.dateRange as string || '30days';
+    const dateRange = requestDateRange(req, '30days');
     const limit = parseInt(req.query.limit as string || '10');
     const pagePathFilter = req.query.pagePathFilter as string;
-    const data = await getTopPages(dateRange, limit, pagePathFilter);
+    const offset = parseInt(req.query.offset as string || '0');
+    const data = await getTopPages(dateRange, limit, pagePathFilter, offset);
     res.json(data);
   } catch (error) {
     console.error('Pages error:', error);
@@ -703,7 +727,7 @@ app.get('/api/pages', async (req, res) => {
 
 app.get('/api/blog', async (req, res) => {
   try {
-    const dateRange = req.query.dateRange as string || '30days';
+    const dateRange = requestDateRange(req, '30days');
     const limit = parseInt(req.query.limit as string || '10');
     const data = await getBlogPages(dateRange, limit);
     res.json(data);
@@ -718,7 +742,7 @@ app.get('/api/blog', async (req, res) => {
 
 app.get('/api/traffic', async (req, res) => {
   try {
-    const dateRange = req.query.dateRange as string || '30days';
+    const dateRange = requestDateRange(req, '30days');
     const limit = parseInt(req.query.limit as string || '10');
     const data = await getTrafficSources(dateRange, limit);
     res.json(data);
@@ -733,7 +757,7 @@ app.get('/api/traffic', async (req, res) => {
 
 app.get('/api/devices', async (req, res) => {
   try {
-    const dateRange = req.query.dateRange as string || '30days';
+    const dateRange = requestDateRange(req, '30days');
     const data = await getDeviceBreakdown(dateRange);
     res.json(data);
   } catch (error) {
@@ -760,7 +784,7 @@ app.get('/api/realtime', async (req, res) => {
 
 app.get('/api/daily-traffic', async (req, res) => {
   try {
-    const dateRange = req.query.dateRange as string || '14days';
+    const dateRange = requestDateRange(req, '14days');
     const data = await getDailyTraffic(dateRange);
     res.json(data);
   } catch (error) {
@@ -774,7 +798,7 @@ app.get('/api/daily-traffic', async (req, res) => {
 
 app.get('/api/demographics', async (req, res) => {
   try {
-    const dateRange = req.query.dateRange as string || '30days';
+    const dateRange = requestDateRange(req, '30days');
     const data = await getDemographics(dateRange);
     res.json(data);
   } catch (error) {
@@ -788,7 +812,7 @@ app.get('/api/demographics', async (req, res) => {
 
 app.get('/api/geography', async (req, res) => {
   try {
-    const dateRange = req.query.dateRange as string || '30days';
+    const dateRange = requestDateRange(req, '30days');
     const limit = parseInt(req.query.limit as string) || 10;
     const data = await getGeography(dateRange, limit);
     res.json(data);
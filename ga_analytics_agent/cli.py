@@ -4,7 +4,8 @@
 import asyncio
 import sys
 from typing import Optional
-from src.agent import run_analytics_query, run_proactive_monitoring, get_dashboard_summary
+from src.agent import stream_analytics_query, run_proactive_monitoring, get_dashboard_summary, update_history
+from src.http_pool import startup_http_pool, shutdown_http_pool
 from src.settings import settings
 import json
 
@@ -14,6 +15,30 @@ async def main():
     print("🎯 GA Analytics Dashboard Agent")
     print("=" * 50)
     
+    # Share one keep-alive connection pool across every query in this session
+    await startup_http_pool()
+    try:
+        await run_cli()
+    finally:
+        await shutdown_http_pool()
+
+
+async def print_streamed_answer(query: str):
+    """Print an answer as the agent writes it, with the tools it calls."""
+    answering = False
+    async for event in stream_analytics_query(query):
+        if event.type == "tool_call":
+            print(f"  🔧 {event.tool}", flush=True)
+        elif event.type == "text":
+            if not answering:
+                print()
+                answering = True
+            print(event.content, end="", flush=True)
+    print()
+
+
+async def run_cli():
+    """Dispatch command mode or interactive mode."""
     # Check if running in interactive mode or with arguments
     if len(sys.argv) > 1:
         # Command mode
@@ -23,8 +48,7 @@ async def main():
             # Run a query
             query = " ".join(sys.argv[2:])
             print(f"\n📊 Running query: {query}")
-            result = await run_analytics_query(query)
-            print(f"\n{result}")
+            await print_streamed_answer(query)
             
         elif command == "monitor":
             # Run proactive monitoring
@@ -38,11 +62,22 @@ async def main():
             result = await get_dashboard_summary()
             print(json.dumps(result, indent=2))
             
+        elif command == "history" and len(sys.argv) > 2:
+            # Fill the local snapshot history
+            action = sys.argv[2].lower()
+            date_range = " ".join(sys.argv[3:]) or None
+            print(f"\n🗄️ Updating local history ({action})...")
+            result = await update_history(action, date_range)
+            print(f"Captured {len(result['captured'])} days for "
+                  f"{result['dateRange']['startDate']} to {result['dateRange']['endDate']}")
+            
         else:
             print("\nUsage:")
             print("  python cli.py query <your analytics question>")
             print("  python cli.py monitor")
             print("  python cli.py dashboard")
+            print("  python cli.py history backfill [date range]")
+            print("  python cli.py history capture [date range]")
             print("  python cli.py  # Interactive mode")
     
     else:
@@ -88,8 +123,8 @@ async def main():
                 else:
                     # Run as analytics query
                     print("\n⏳ Analyzing...")
-                    result = await run_analytics_query(query)
-                    print(f"\n{result}\n")
+                    await print_streamed_answer(query)
+                    print()
                     
             except KeyboardInterrupt:
                 print("\n\nGoodbye! 👋")
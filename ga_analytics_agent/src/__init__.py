@@ -2,11 +2,14 @@
 
 from .agent import ga_analytics_agent, run_analytics_query
 from .dependencies import GAAnalyticsDependencies
+from .http_pool import shutdown_http_pool, startup_http_pool
 from .settings import settings
 
 __all__ = [
     "ga_analytics_agent",
     "run_analytics_query", 
     "GAAnalyticsDependencies",
+    "startup_http_pool",
+    "shutdown_http_pool",
     "settings"
 ]
\ No newline at end of file
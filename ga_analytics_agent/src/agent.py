@@ -1,11 +1,32 @@
 """Main GA Analytics Dashboard Agent implementation."""
 
-from typing import Optional, Dict, Any
+import asyncio
+import functools
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, AsyncIterator, Tuple
 from pydantic_ai import Agent, RunContext
 from .providers import get_llm_model
-from .dependencies import GAAnalyticsDependencies
-from .prompts import SYSTEM_PROMPT, get_marketing_context, get_prompt_for_mode
-from .tools import fetch_ga_data, analyze_metrics, generate_insights
+from .answer_cache import AnswerCache, get_answer_cache
+from .date_ranges import parse_date_range
+from .dependencies import GAAnalyticsDependencies, record_data_reads
+from .history import backfill_history, capture_snapshot
+from .intent_router import try_fast_answer
+from .prefetch import speculative_prefetch
+from .prompts import SYSTEM_PROMPT, build_marketing_context, get_marketing_context, get_mode_instructions
+from .tools import (
+    fetch_ga_data,
+    fetch_daily_traffic,
+    detect_traffic_anomalies,
+    get_metric_history,
+    summarize_pages,
+    rank_report,
+    analyze_metrics,
+    compare_periods,
+    generate_insights,
+)
 from .settings import settings
 
 
@@ -18,6 +39,35 @@ ga_analytics_agent = Agent(
 )
 
 
+@dataclass
+class StreamEvent:
+    """One event of a streamed answer."""
+    type: str  # "text", "tool_call" or "tool_result"
+    content: str = ""
+    tool: Optional[str] = None
+    args: Dict[str, Any] = field(default_factory=dict)
+
+
+# Event queue of the streaming run in progress, if any
+_stream_events: ContextVar[Optional["asyncio.Queue[Optional[StreamEvent]]"]] = ContextVar(
+    "stream_events", default=None
+)
+
+
+def _streamed(tool):
+    """Report calls of a tool to the active streaming run, if there is one."""
+    @functools.wraps(tool)
+    async def wrapper(ctx, *args, **kwargs):
+        events = _stream_events.get()
+        if events is None:
+            return await tool(ctx, *args, **kwargs)
+        events.put_nowait(StreamEvent("tool_call", tool=tool.__name__, args=kwargs))
+        result = await tool(ctx, *args, **kwargs)
+        events.put_nowait(StreamEvent("tool_result", tool=tool.__name__))
+        return result
+    return wrapper
+
+
 # Register the dynamic context prompt
 @ga_analytics_agent.system_prompt
 async def marketing_context_prompt(ctx: RunContext[GAAnalyticsDependencies]) -> str:
@@ -25,8 +75,16 @@ async def marketing_context_prompt(ctx: RunContext[GAAnalyticsDependencies]) ->
     return await get_marketing_context(ctx)
 
 
+# Register the operation mode instructions
+@ga_analytics_agent.system_prompt
+async def mode_instructions_prompt(ctx: RunContext[GAAnalyticsDependencies]) -> str:
+    """Add the instructions for the run's operation mode."""
+    return await get_mode_instructions(ctx)
+
+
 # Register tool: Fetch GA Data
 @ga_analytics_agent.tool
+@_streamed
 async def fetch_analytics_data(
     ctx: RunContext[GAAnalyticsDependencies],
     endpoint: str,
@@ -45,8 +103,142 @@ async def fetch_analytics_data(
     return await fetch_ga_data(ctx, endpoint, date_range)
 
 
+# Register tool: Fetch Daily Traffic
+@ga_analytics_agent.tool
+@_streamed
+async def fetch_daily_traffic_data(
+    ctx: RunContext[GAAnalyticsDependencies],
+    date_range: Optional[str] = "30days"
+) -> Dict[str, Any]:
+    """
+    Fetch day-by-day users, page views and sessions for trend questions.
+    
+    Args:
+        date_range: Date range for data (e.g., "30days", "90days", "12months")
+    
+    Returns:
+        Daily rows, plus page view and session totals for the window
+        (use /api/summary for the window's unique users)
+    """
+    return await fetch_daily_traffic(ctx, date_range)
+
+
+# Register tool: Traffic Anomalies
+@ga_analytics_agent.tool
+@_streamed
+async def find_traffic_anomalies(
+    ctx: RunContext[GAAnalyticsDependencies],
+    date_range: Optional[str] = "90days"
+) -> Dict[str, Any]:
+    """
+    Find days with unusual users, page views or sessions for their weekday.
+    
+    Args:
+        date_range: Window to scan (e.g., "30days", "90days")
+    
+    Returns:
+        Flagged days with expected value, z-score, direction and severity
+    """
+    return await detect_traffic_anomalies(ctx, date_range)
+
+
+# Register tool: Page Summary
+@ga_analytics_agent.tool
+@_streamed
+async def summarize_all_pages(
+    ctx: RunContext[GAAnalyticsDependencies],
+    date_range: Optional[str] = "30days",
+    top_k: int = 10
+) -> Dict[str, Any]:
+    """
+    Summarize all pages of the site without listing every page.
+    
+    Args:
+        date_range: Date range for data (e.g., "30days", "90days")
+        top_k: Number of top pages by views to include
+    
+    Returns:
+        Page count, totals, views-weighted rates, number of high-bounce pages and the top pages
+    """
+    return await summarize_pages(ctx, date_range, top_k)
+
+
+# Register tool: Rankings
+@ga_analytics_agent.tool
+@_streamed
+async def rank_analytics_rows(
+    ctx: RunContext[GAAnalyticsDependencies],
+    report: str = "pages",
+    date_range: Optional[str] = "30days",
+    k: int = 5,
+    min_weight: float = 0
+) -> Dict[str, Any]:
+    """
+    Answer "top pages", "worst bounce pages" or "top countries" questions.
+    
+    Args:
+        report: Rows to rank (pages, traffic, geography)
+        date_range: Date range for data (e.g., "7days", "30days")
+        k: Number of rows in each top and bottom ranking
+        min_weight: Minimum views (pages) or sessions (traffic) for rate rankings
+    
+    Returns:
+        Top, bottom and median/p90 values for each metric
+    """
+    return await rank_report(ctx, report, date_range, k, min_weight=min_weight)
+
+
+# Register tool: Period Comparison
+@ga_analytics_agent.tool
+@_streamed
+async def compare_analytics_periods(
+    ctx: RunContext[GAAnalyticsDependencies],
+    endpoint: str = "/api/summary",
+    date_range: Optional[str] = "30days",
+    comparison_period: Optional[str] = "previous_period"
+) -> Dict[str, Any]:
+    """
+    Compare a period with the previous period, last year or a custom range.
+    
+    Args:
+        endpoint: API endpoint (/api/summary, /api/pages, /api/traffic, /api/devices)
+        date_range: Current period (e.g., "7days", "30days")
+        comparison_period: "previous_period", "same_period_last_year" or "YYYY-MM-DD..YYYY-MM-DD"
+    
+    Returns:
+        Change percentage, trend and severity for every metric
+    """
+    return await compare_periods(ctx, endpoint, date_range, comparison_period)
+
+
+# Register tool: Metric History
+@ga_analytics_agent.tool
+@_streamed
+async def query_metric_history(
+    ctx: RunContext[GAAnalyticsDependencies],
+    report: str = "summary",
+    date_range: Optional[str] = "30days",
+    dimension: Optional[str] = None,
+    granularity: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Compare a period with the previous one using locally stored daily snapshots.
+    
+    Args:
+        report: Report to read (summary, pages, traffic, devices)
+        date_range: Date range for the current period (e.g., "30days", "2years")
+        dimension: Optional page path, traffic source or device key
+        granularity: Optional "week" or "month" breakdown for long ranges
+    
+    Returns:
+        Current and previous period metrics from the local history
+    """
+    return await get_metric_history(ctx, report, date_range, dimension, granularity)
+
+
 # Register tool: Analyze Metrics
 @ga_analytics_agent.tool
+@_streamed
 async def analyze_performance_metrics(
     ctx: RunContext[GAAnalyticsDependencies],
     metrics_data: Dict[str, Any]
@@ -76,6 +268,7 @@ async def analyze_performance_metrics(
 
 # Register tool: Generate Insights
 @ga_analytics_agent.tool
+@_streamed
 async def generate_actionable_insights(
     ctx: RunContext[GAAnalyticsDependencies],
     analytics_data: Dict[str, Any]
@@ -113,6 +306,16 @@ async def run_analytics_query(
     """
     Run an analytics query with the GA agent.
     
+    Simple lookups such as "sessions last 30 days" or "top 5 pages this
+    week" are answered directly from GA data when
+    ``intent_router_enabled`` is set; other questions go to the agent.
+    Reports the question likely needs are prefetched while the model
+    plans its first tool call (see ``prefetch.classify_query``).
+    Agent answers are cached keyed on the normalized question, mode, marketing
+    context and day. A cached answer is reused only while every GA
+    payload it was built from is unchanged; ``answer_cache_ttl`` bounds
+    its lifetime and 0 disables the cache.
+    
     Args:
         query: User's analytics question
         session_id: Optional session identifier
@@ -122,23 +325,28 @@ async def run_analytics_query(
     Returns:
         Agent's response with analytics insights
     """
-    # Create dependencies
+    # Create dependencies; the mode selects the system prompt instructions
     deps = GAAnalyticsDependencies.from_settings(
         settings_override=None,
         session_id=session_id,
+        mode=mode,
         **dependency_overrides
     )
     
-    # Get appropriate prompt for mode
-    prompt = get_prompt_for_mode(mode)
+    answer_cache = get_answer_cache()
+    cache_key = answer_cache.key(query, mode, build_marketing_context(deps))
     
     try:
-        # Run the agent
-        result = await ga_analytics_agent.run(
-            query,
-            deps=deps,
-            system_prompt=prompt
-        )
+        hit, answer = await _answer_without_agent(deps, query, mode, answer_cache, cache_key)
+        if hit:
+            return answer
+        
+        # Run the agent while the reports it will likely need are fetched,
+        # noting which GA data the answer is built from
+        with speculative_prefetch(deps, query), record_data_reads() as reads:
+            result = await ga_analytics_agent.run(query, deps=deps)
+        if isinstance(result.data, str):
+            answer_cache.set(cache_key, result.data, reads)
         return result.data
     
     finally:
@@ -146,6 +354,91 @@ async def run_analytics_query(
         await deps.cleanup()
 
 
+async def _answer_without_agent(
+    deps: GAAnalyticsDependencies,
+    query: str,
+    mode: str,
+    answer_cache: AnswerCache,
+    cache_key: str
+) -> Tuple[bool, Optional[str]]:
+    """Answer from the intent router or the answer cache, if either can."""
+    if settings.intent_router_enabled and mode == "conversational":
+        answer = await try_fast_answer(deps, query)
+        if answer is not None:
+            return True, answer
+    return await answer_cache.get(cache_key, deps)
+
+
+async def stream_analytics_query(
+    query: str,
+    session_id: Optional[str] = None,
+    mode: str = "conversational",
+    **dependency_overrides
+) -> AsyncIterator[StreamEvent]:
+    """
+    Run an analytics query, yielding the answer as it is generated.
+    
+    Yields a "tool_call" and "tool_result" event around every tool the
+    agent uses, then "text" events with each chunk of the answer as the
+    model produces it. Routed lookups and cached answers arrive as a
+    single text event. The complete answer is cached like
+    ``run_analytics_query`` answers.
+    
+    Args:
+        query: User's analytics question
+        session_id: Optional session identifier
+        mode: Operation mode (conversational, proactive, default)
+        **dependency_overrides: Additional dependency overrides
+        
+    Yields:
+        StreamEvent for each tool call and answer chunk
+    """
+    deps = GAAnalyticsDependencies.from_settings(
+        settings_override=None,
+        session_id=session_id,
+        mode=mode,
+        **dependency_overrides
+    )
+    
+    answer_cache = get_answer_cache()
+    cache_key = answer_cache.key(query, mode, build_marketing_context(deps))
+    events: "asyncio.Queue[Optional[StreamEvent]]" = asyncio.Queue()
+    
+    async def run_agent():
+        # Runs in its own task, so the queue is only visible to this run's tools
+        _stream_events.set(events)
+        try:
+            chunks = []
+            with speculative_prefetch(deps, query), record_data_reads() as reads:
+                async with ga_analytics_agent.run_stream(query, deps=deps) as result:
+                    async for chunk in result.stream_text(delta=True):
+                        chunks.append(chunk)
+                        events.put_nowait(StreamEvent("text", chunk))
+            answer_cache.set(cache_key, "".join(chunks), reads)
+        finally:
+            events.put_nowait(None)
+    
+    try:
+        hit, answer = await _answer_without_agent(deps, query, mode, answer_cache, cache_key)
+        if hit:
+            yield StreamEvent("text", answer)
+            return
+        
+        runner = asyncio.create_task(run_agent())
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+            await runner  # Surface errors from the run
+        finally:
+            runner.cancel()
+    
+    finally:
+        await deps.cleanup()
+
+
 async def run_proactive_monitoring(
     session_id: Optional[str] = None,
     **dependency_overrides
@@ -168,41 +461,142 @@ async def run_proactive_monitoring(
     )
 
 
+# Dashboard sections and the GA MCP endpoints that back them
+DASHBOARD_SECTIONS = {
+    "summary": "/api/summary",
+    "traffic": "/api/traffic",
+    "pages": "/api/pages",
+    "devices": "/api/devices",
+}
+
+
+async def _fetch_dashboard_section(
+    deps: GAAnalyticsDependencies,
+    endpoint: str,
+    timeout: float
+) -> Tuple[Any, float, bool]:
+    """
+    Fetch one dashboard section under a deadline.
+    
+    Failures are returned as an error marker instead of raised so the
+    remaining sections still reach the caller.
+    
+    Returns:
+        Tuple of (section data or error marker, elapsed milliseconds, succeeded)
+    """
+    started = time.perf_counter()
+    succeeded = False
+    try:
+        data = await asyncio.wait_for(deps.fetch_ga_data(endpoint), timeout)
+        succeeded = True
+    except asyncio.TimeoutError:
+        data = {"error": f"Timed out after {timeout}s", "status": "timeout"}
+    except Exception as e:
+        data = {"error": str(e), "status": "error"}
+    return data, round((time.perf_counter() - started) * 1000, 1), succeeded
+
+
 async def get_dashboard_summary(
     session_id: Optional[str] = None,
+    section_timeout: Optional[float] = None,
     **dependency_overrides
 ) -> Dict[str, Any]:
     """
     Get comprehensive dashboard data for all sections.
     
+    Sections are fetched concurrently, each under its own deadline. A
+    slow or failing section is reported with an error marker while the
+    others are still returned.
+    
     Args:
         session_id: Optional session identifier
+        section_timeout: Per-section deadline in seconds
         **dependency_overrides: Additional dependency overrides
         
     Returns:
-        Dashboard data for all sections
+        Dashboard data for all sections with per-section timings
     """
     deps = GAAnalyticsDependencies.from_settings(
         settings_override=None,
         session_id=session_id,
         **dependency_overrides
     )
+    timeout = section_timeout or settings.dashboard_section_timeout
     
     try:
-        # Fetch data from all endpoints
-        dashboard_data = {
-            "summary": await deps.fetch_ga_data("/api/summary"),
-            "traffic": await deps.fetch_ga_data("/api/traffic"),
-            "pages": await deps.fetch_ga_data("/api/pages"),
-            "devices": await deps.fetch_ga_data("/api/devices")
-        }
+        # Fetch all sections concurrently
+        results = await asyncio.gather(*(
+            _fetch_dashboard_section(deps, endpoint, timeout)
+            for endpoint in DASHBOARD_SECTIONS.values()
+        ))
         
-        # Add timestamp
-        from datetime import datetime
+        dashboard_data: Dict[str, Any] = {}
+        section_timings = {}
+        failed_sections = []
+        for section, (data, elapsed_ms, succeeded) in zip(DASHBOARD_SECTIONS, results):
+            dashboard_data[section] = data
+            section_timings[section] = elapsed_ms
+            if not succeeded:
+                failed_sections.append(section)
+        
+        # Add metadata
         dashboard_data["timestamp"] = datetime.utcnow().isoformat()
         dashboard_data["cache_ttl"] = deps.cache_ttl
+        dashboard_data["section_timings_ms"] = section_timings
+        dashboard_data["failed_sections"] = failed_sections
         
         return dashboard_data
     
     finally:
-        await deps.cleanup()
\ No newline at end of file
+        await deps.cleanup()
+
+
+async def update_history(
+    action: str = "backfill",
+    date_range: Optional[str] = None,
+    **dependency_overrides
+) -> Dict[str, Any]:
+    """
+    Fill the local snapshot history from GA; meant for a daily job.
+    
+    ``backfill`` captures the days of the window without a settled
+    snapshot (default: the last 30 days). ``capture`` records every day
+    of the window again (default: yesterday).
+    
+    Args:
+        action: 'backfill' or 'capture'
+        date_range: Date range alias or explicit pair
+        **dependency_overrides: Additional dependency overrides
+        
+    Returns:
+        The resolved window and the days captured
+    """
+    if action not in ("backfill", "capture"):
+        raise ValueError(f"Invalid history action: {action}. Must be 'backfill' or 'capture'")
+    deps = GAAnalyticsDependencies.from_settings(settings_override=None, **dependency_overrides)
+    
+    try:
+        store = deps.history
+        if store is None:
+            raise ValueError("History store is not configured. Set HISTORY_DB_PATH to enable it.")
+        
+        if action == "backfill":
+            window = parse_date_range(date_range or "30days")
+            captured = await backfill_history(deps, store, window)
+        else:
+            window = parse_date_range(date_range or "yesterday")
+            captured = []
+            day = window.start
+            while day <= window.end:
+                await capture_snapshot(deps, store, day)
+                captured.append(day)
+                day += timedelta(days=1)
+        
+        return {
+            "action": action,
+            "dateRange": window.to_params(),
+            "captured": [day.isoformat() for day in captured],
+        }
+    
+    finally:
+        await deps.cleanup()
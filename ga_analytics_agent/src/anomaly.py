@@ -0,0 +1,174 @@
+"""Seasonal anomaly detection over daily GA traffic series."""
+
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .date_ranges import DateWindow
+from .incremental import DAILY_METRICS, row_date
+from .settings import settings
+
+
+@dataclass
+class Anomaly:
+    """A day whose value deviates from its weekday baseline."""
+    day: date
+    metric: str
+    value: float
+    expected: float
+    z_score: float
+    direction: str  # "spike" or "drop"
+    severity: str  # "warning" or "critical"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-friendly representation for tool output."""
+        return {
+            "date": self.day.isoformat(),
+            "metric": self.metric,
+            "value": self.value,
+            "expected": round(self.expected, 2),
+            "z_score": round(self.z_score, 2),
+            "direction": self.direction,
+            "severity": self.severity,
+        }
+
+
+@dataclass
+class SeasonalEWMADetector:
+    """
+    Day-of-week EWMA baseline with robust, incremental updates.
+
+    Keeps an exponentially weighted mean and variance per metric and
+    weekday, so Mondays are compared with earlier Mondays. State arrays
+    are shaped (metrics, 7) and every day is scored for all metrics in one
+    vectorized step. Residuals are clipped to ``clip`` standard deviations
+    before updating, so an outlier barely moves the baseline.
+
+    Feed days in date order with ``update``; days at or before
+    ``last_day`` are ignored, so replaying a window only processes the
+    new days.
+    """
+
+    metrics: Tuple[str, ...] = DAILY_METRICS
+    alpha: float = 0.3
+    threshold: float = 3.0
+    critical_threshold: float = 5.0
+    warmup: int = 3
+    clip: float = 3.0
+    min_relative_std: float = 0.05
+
+    mean: np.ndarray = field(init=False, repr=False)
+    var: np.ndarray = field(init=False, repr=False)
+    count: np.ndarray = field(init=False, repr=False)
+    last_day: Optional[date] = field(default=None, init=False)
+
+    def __post_init__(self):
+        shape = (len(self.metrics), 7)
+        self.mean = np.zeros(shape)
+        self.var = np.zeros(shape)
+        self.count = np.zeros(shape, dtype=np.int64)
+
+    def score(self, day: date, values: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score one day against the baseline without updating it.
+
+        Args:
+            day: Day of the observation
+            values: One value per metric
+
+        Returns:
+            Tuple of (z-scores, expected values); z is NaN during warmup
+        """
+        weekday = day.weekday()
+        values = np.asarray(values, dtype=float)
+        expected = self.mean[:, weekday]
+        z = (values - expected) / self._std(weekday)
+        z[self.count[:, weekday] < self.warmup] = np.nan
+        return z, expected.copy()
+
+    def update(self, day: date, values: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score one day, then fold it into the baseline.
+
+        Returns:
+            Tuple of (z-scores, expected values) from before the update
+        """
+        z, expected = self.score(day, values)
+        if self.last_day is not None and day <= self.last_day:
+            return z, expected
+
+        weekday = day.weekday()
+        values = np.asarray(values, dtype=float)
+        first = self.count[:, weekday] == 0
+        limit = self.clip * self._std(weekday)
+        diff = np.clip(values - self.mean[:, weekday], -limit, limit)
+        increment = self.alpha * diff
+
+        self.mean[:, weekday] = np.where(first, values, self.mean[:, weekday] + increment)
+        self.var[:, weekday] = np.where(
+            first, 0.0, (1 - self.alpha) * (self.var[:, weekday] + diff * increment)
+        )
+        self.count[:, weekday] += 1
+        self.last_day = day
+        return z, expected
+
+    def detect(self, rows: List[Dict[str, Any]], settled_before: Optional[date] = None) -> List[Anomaly]:
+        """
+        Process daily rows and report anomalous days.
+
+        Settled days after ``last_day`` update the baseline; days on or
+        after ``settled_before`` are only scored, since GA may still
+        revise them.
+
+        Args:
+            rows: Daily rows with ``rawDate`` and one field per metric
+            settled_before: First day that is not final yet
+
+        Returns:
+            Anomalies among the newly processed and scored days
+        """
+        anomalies: List[Anomaly] = []
+        for row in sorted(rows, key=lambda item: item.get("rawDate") or ""):
+            day = row_date(row)
+            if day is None or (self.last_day is not None and day <= self.last_day):
+                continue
+            values = [float(row.get(metric) or 0) for metric in self.metrics]
+            if settled_before is not None and day >= settled_before:
+                z, expected = self.score(day, values)
+            else:
+                z, expected = self.update(day, values)
+            anomalies.extend(self._flag(day, values, z, expected))
+        return anomalies
+
+    def _std(self, weekday: int) -> np.ndarray:
+        floor = np.maximum(self.min_relative_std * np.abs(self.mean[:, weekday]), 1.0)
+        return np.maximum(np.sqrt(self.var[:, weekday]), floor)
+
+    def _flag(self, day: date, values: List[float], z: np.ndarray, expected: np.ndarray) -> List[Anomaly]:
+        flagged = np.flatnonzero(np.abs(np.nan_to_num(z)) >= self.threshold)
+        return [
+            Anomaly(
+                day=day,
+                metric=self.metrics[index],
+                value=values[index],
+                expected=float(expected[index]),
+                z_score=float(z[index]),
+                direction="spike" if z[index] > 0 else "drop",
+                severity="critical" if abs(z[index]) >= self.critical_threshold else "warning",
+            )
+            for index in flagged
+        ]
+
+
+# Days before a scanned window that warm up the weekday baseline
+BASELINE_DAYS = 56
+
+
+def baseline_window(window: DateWindow, baseline_days: int = BASELINE_DAYS) -> DateWindow:
+    """Window to fetch so a scan of ``window`` starts from a warmed-up baseline."""
+    return DateWindow(window.start - timedelta(days=baseline_days), window.end)
+
+
+def settled_before(today: date) -> date:
+    """First day GA may still revise, given ``ga_data_settle_days``."""
+    return today - timedelta(days=settings.ga_data_settle_days - 1)
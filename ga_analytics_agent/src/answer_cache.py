@@ -0,0 +1,159 @@
+"""Cache of agent answers keyed on the question and the GA data behind them."""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+from .cache import payload_fingerprint
+from .date_ranges import utc_today
+from .dependencies import DataReads
+from .settings import settings
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase a question and collapse whitespace and trailing punctuation."""
+    return " ".join(query.lower().split()).rstrip("?!. ")
+
+
+@dataclass
+class AnswerStats:
+    """Counters describing answer cache effectiveness."""
+    hits: int = 0
+    misses: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    evictions: int = 0
+
+
+@dataclass
+class _AnswerEntry:
+    answer: str
+    reads: DataReads
+    expires_at: float
+
+
+@dataclass
+class AnswerCache:
+    """
+    Agent answers reused while the GA data they used is unchanged.
+
+    Entries are keyed on the normalized question, mode, marketing context
+    and day, and remember the fingerprint of every GA payload read while
+    answering. A lookup refetches those payloads through the dependencies
+    (usually from the response cache) and drops the answer if any of them
+    changed.
+    """
+
+    ttl: float = field(default_factory=lambda: settings.answer_cache_ttl)
+    max_entries: int = field(default_factory=lambda: settings.answer_cache_max_entries)
+    clock: Any = field(default=time.monotonic, repr=False)
+
+    _entries: "OrderedDict[str, _AnswerEntry]" = field(default_factory=OrderedDict, init=False, repr=False)
+    stats: AnswerStats = field(default_factory=AnswerStats, init=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, query: str, mode: str, context: str, today: Optional[date] = None) -> str:
+        """
+        Build the cache key for a question.
+
+        The day is part of the key because relative ranges such as "last
+        week" cover different dates tomorrow.
+        """
+        parts = [normalize_query(query), mode, context, (today or utc_today()).isoformat()]
+        return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+    async def get(self, key: str, deps: Any) -> Tuple[bool, Optional[str]]:
+        """
+        Look up an answer and check that its GA data is unchanged.
+
+        Args:
+            key: Key from ``key``
+            deps: GAAnalyticsDependencies used to refetch the answer's data
+
+        Returns:
+            Tuple of (hit, answer); answer is None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return False, None
+
+        if entry.expires_at <= self.clock():
+            del self._entries[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return False, None
+
+        if not await self._data_unchanged(entry, deps):
+            self._entries.pop(key, None)
+            self.stats.invalidations += 1
+            self.stats.misses += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return True, entry.answer
+
+    def set(self, key: str, answer: str, reads: DataReads) -> bool:
+        """
+        Store an answer with the GA reads it depended on.
+
+        Returns:
+            True if the answer was cached
+        """
+        if self.ttl <= 0:
+            return False
+        self._entries.pop(key, None)
+        self._entries[key] = _AnswerEntry(answer=answer, reads=dict(reads), expires_at=self.clock() + self.ttl)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+        return True
+
+    def clear(self):
+        """Remove all answers without resetting the counters."""
+        self._entries.clear()
+
+    def stats_snapshot(self) -> Dict[str, Any]:
+        """Get answer cache counters and occupancy for monitoring."""
+        lookups = self.stats.hits + self.stats.misses
+        return {
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "expirations": self.stats.expirations,
+            "invalidations": self.stats.invalidations,
+            "evictions": self.stats.evictions,
+            "hit_rate": round(self.stats.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+    async def _data_unchanged(self, entry: _AnswerEntry, deps: Any) -> bool:
+        reads = list(entry.reads.values())
+        try:
+            payloads = await asyncio.gather(*(
+                deps.fetch_ga_data(endpoint, params) for endpoint, params, _ in reads
+            ))
+        except Exception:
+            return False
+        return all(
+            payload_fingerprint(payload) == fingerprint
+            for payload, (_, _, fingerprint) in zip(payloads, reads)
+        )
+
+
+# Process-wide answer cache
+_answer_cache: Optional[AnswerCache] = None
+
+
+def get_answer_cache() -> AnswerCache:
+    """Get the process-wide answer cache, creating it on first use."""
+    global _answer_cache
+    if _answer_cache is None:
+        _answer_cache = AnswerCache()
+    return _answer_cache
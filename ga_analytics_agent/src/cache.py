@@ -0,0 +1,496 @@
+"""Response caching for GA MCP server requests."""
+
+import hashlib
+import json
+import logging
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+from .date_ranges import DateWindow, resolve_date_range
+from .settings import settings
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # Redis is an optional dependency
+    redis_asyncio = None
+
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(endpoint: str, params: Optional[Dict] = None) -> str:
+    """
+    Build a stable cache key from an endpoint and its query parameters.
+
+    Parameters are sorted and ``None`` values dropped so that equivalent
+    requests built in a different order share one entry.
+
+    Args:
+        endpoint: API endpoint path
+        params: Optional query parameters
+
+    Returns:
+        Cache key string
+    """
+    normalized = {
+        str(key): str(value)
+        for key, value in (params or {}).items()
+        if value is not None
+    }
+    return f"{endpoint.rstrip('/')}?{json.dumps(normalized, sort_keys=True, separators=(',', ':'))}"
+
+
+def encode_json(payload: Any) -> bytes:
+    """Compact UTF-8 JSON encoding of a decoded payload."""
+    return json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def payload_fingerprint(payload: Any) -> str:
+    """Stable digest of a decoded JSON payload, used to detect changed data."""
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Counters describing cache effectiveness."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    stale_hits: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@dataclass
+class _CacheEntry:
+    blob: bytes
+    expires_at: float
+
+    @property
+    def size(self) -> int:
+        return len(self.blob)
+
+    def value(self) -> Any:
+        return json.loads(self.blob)
+
+
+@dataclass
+class ResponseCache:
+    """
+    In-process TTL cache with LRU eviction.
+
+    The cache is bounded both by entry count and by the approximate
+    serialized size of the stored payloads. Least recently used entries
+    are evicted first when either bound is exceeded. Expired entries are
+    retained for up to ``max_stale`` seconds so they can still be served
+    through ``get_stale`` when the MCP server is unavailable.
+
+    Payloads are stored as encoded JSON and decoded on every read, so
+    each caller gets its own copy and changing it cannot alter the entry.
+    """
+
+    max_entries: int = field(default_factory=lambda: settings.cache_max_entries)
+    max_bytes: int = field(default_factory=lambda: settings.cache_max_bytes)
+    max_stale: float = field(default_factory=lambda: settings.cache_max_staleness)
+    clock: Any = field(default=time.monotonic, repr=False)
+
+    _entries: "OrderedDict[str, _CacheEntry]" = field(default_factory=OrderedDict, init=False, repr=False)
+    _total_bytes: int = field(default=0, init=False, repr=False)
+    stats: CacheStats = field(default_factory=CacheStats, init=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        """Approximate size of all cached payloads in bytes."""
+        return self._total_bytes
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look up a cached payload.
+
+        Args:
+            key: Cache key from ``make_cache_key``
+
+        Returns:
+            Tuple of (hit, value); value is None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return False, None
+
+        now = self.clock()
+        if entry.expires_at <= now:
+            if entry.expires_at + self.max_stale <= now:
+                self._remove(key)
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return True, entry.value()
+
+    def get_stale(self, key: str) -> Tuple[bool, Any, float]:
+        """
+        Look up a payload, accepting entries that expired within ``max_stale``.
+
+        Does not affect hit/miss counters.
+
+        Args:
+            key: Cache key from ``make_cache_key``
+
+        Returns:
+            Tuple of (hit, value, seconds past expiry; 0 if still fresh)
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None, 0.0
+
+        now = self.clock()
+        staleness = max(0.0, now - entry.expires_at)
+        if entry.expires_at + self.max_stale <= now:
+            self._remove(key)
+            return False, None, 0.0
+
+        self._entries.move_to_end(key)
+        self.stats.stale_hits += 1
+        return True, entry.value(), staleness
+
+    def set(self, key: str, value: Any, ttl: float) -> bool:
+        """
+        Store a payload for ``ttl`` seconds.
+
+        Args:
+            key: Cache key from ``make_cache_key``
+            value: Decoded JSON payload
+            ttl: Time to live in seconds
+
+        Returns:
+            True if the payload was cached
+        """
+        if ttl <= 0:
+            return False
+
+        blob = encode_json(value)
+        if len(blob) > self.max_bytes:
+            # A single oversized payload would flush the whole cache
+            return False
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = _CacheEntry(blob=blob, expires_at=self.clock() + ttl)
+        self._total_bytes += len(blob)
+        self._evict()
+        return True
+
+    def invalidate(self, key: str) -> bool:
+        """Remove a single entry, returning True if it existed."""
+        if key in self._entries:
+            self._remove(key)
+            return True
+        return False
+
+    def clear(self):
+        """Remove all entries without resetting the counters."""
+        self._entries.clear()
+        self._total_bytes = 0
+
+    def stats_snapshot(self) -> Dict[str, Any]:
+        """Get cache counters and occupancy for monitoring."""
+        return {
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "evictions": self.stats.evictions,
+            "expirations": self.stats.expirations,
+            "stale_hits": self.stats.stale_hits,
+            "hit_rate": round(self.stats.hit_rate, 4),
+            "entries": len(self._entries),
+            "bytes": self._total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry.size
+
+    def _evict(self):
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.stats.evictions += 1
+
+
+# Process-wide cache shared by every dependencies instance
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide response cache, creating it on first use."""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
+
+
+# Endpoints reporting live data regardless of the requested date range
+REALTIME_ENDPOINTS = frozenset({"/api/realtime"})
+
+
+@dataclass
+class FreshnessPolicy:
+    """
+    Derive cache TTLs from how much the requested data can still change.
+
+    Realtime endpoints get ``realtime_ttl``. Other requests are resolved
+    to absolute dates: ranges that include today get ``live_ttl``, past
+    ranges ending within ``settle_days`` (GA may still revise them) get
+    ``recent_ttl``, and older closed ranges get ``historical_ttl``.
+    A raw alias such as ``7days`` resolves to different dates once the UTC
+    day rolls over, so without explicit ``startDate``/``endDate`` the TTL
+    never extends past midnight UTC.
+    """
+
+    live_ttl: int = field(default_factory=lambda: settings.cache_ttl)
+    realtime_ttl: int = field(default_factory=lambda: settings.cache_realtime_ttl)
+    recent_ttl: int = field(default_factory=lambda: settings.cache_recent_ttl)
+    historical_ttl: int = field(default_factory=lambda: settings.cache_historical_ttl)
+    settle_days: int = field(default_factory=lambda: settings.ga_data_settle_days)
+    now: Callable[[], datetime] = field(default=lambda: datetime.now(timezone.utc), repr=False)
+
+    def ttl_for(self, endpoint: str, params: Optional[Dict] = None) -> float:
+        """
+        Get the TTL for a response.
+
+        Args:
+            endpoint: API endpoint path
+            params: Query parameters, including ``startDate``/``endDate``
+                or ``dateRange``
+
+        Returns:
+            TTL in seconds; 0 means do not cache
+        """
+        if endpoint.rstrip("/") in REALTIME_ENDPOINTS:
+            return self.realtime_ttl
+
+        now = self.now()
+        today = now.date()
+        window = DateWindow.from_params(params)
+        explicit = window is not None
+        if not explicit:
+            window = resolve_date_range((params or {}).get("dateRange"), today)
+
+        if window.end >= today:
+            ttl = self.live_ttl
+        elif window.end >= today - timedelta(days=self.settle_days):
+            ttl = self.recent_ttl
+        else:
+            ttl = self.historical_ttl
+        if explicit:
+            return ttl
+
+        next_midnight = datetime.combine(today + timedelta(days=1), datetime.min.time(), timezone.utc)
+        return min(ttl, (next_midnight - now).total_seconds())
+
+
+# Serialized payload markers for the shared cache tier
+_RAW_MARKER = b"j"
+_ZLIB_MARKER = b"z"
+
+
+def encode_payload(value: Any, expires_at: float, compress_threshold: int = 1024) -> bytes:
+    """
+    Serialize a payload into a compact, optionally compressed blob.
+
+    Args:
+        value: Decoded JSON payload
+        expires_at: Wall-clock expiry timestamp stored alongside the value
+        compress_threshold: Compress blobs larger than this many bytes
+
+    Returns:
+        Marker-prefixed bytes suitable for Redis
+    """
+    raw = json.dumps(
+        {"e": round(expires_at, 3), "v": value},
+        separators=(",", ":"),
+        default=str
+    ).encode("utf-8")
+    if len(raw) > compress_threshold:
+        return _ZLIB_MARKER + zlib.compress(raw)
+    return _RAW_MARKER + raw
+
+
+def decode_payload(blob: bytes) -> Tuple[Any, float]:
+    """
+    Decode a blob produced by ``encode_payload``.
+
+    Returns:
+        Tuple of (value, expires_at)
+    """
+    marker, body = blob[:1], blob[1:]
+    if marker == _ZLIB_MARKER:
+        body = zlib.decompress(body)
+    elif marker != _RAW_MARKER:
+        raise ValueError(f"Unknown cache payload marker: {marker!r}")
+    envelope = json.loads(body)
+    return envelope["v"], float(envelope["e"])
+
+
+@dataclass
+class RedisCacheTier:
+    """
+    Shared second-level cache backed by Redis.
+
+    Lets several agent worker processes share GA responses. Any Redis
+    failure is treated as a miss and the tier backs off for
+    ``retry_interval`` seconds, so callers fall back to the in-process
+    cache and the MCP server without waiting on an unreachable Redis.
+    """
+
+    url: Optional[str] = None
+    key_prefix: str = field(default_factory=lambda: settings.redis_key_prefix)
+    timeout: float = field(default_factory=lambda: settings.redis_timeout)
+    retry_interval: float = field(default_factory=lambda: settings.redis_retry_interval)
+    compress_threshold: int = 1024
+    client: Optional[Any] = field(default=None, repr=False)
+
+    hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+    writes: int = field(default=0, init=False)
+    errors: int = field(default=0, init=False)
+    _unavailable_until: float = field(default=0.0, init=False, repr=False)
+
+    @property
+    def available(self) -> bool:
+        """Whether the tier should be tried on this request."""
+        return time.monotonic() >= self._unavailable_until and self._get_client() is not None
+
+    async def get(self, key: str) -> Tuple[bool, Any, float]:
+        """
+        Look up a payload in Redis.
+
+        Args:
+            key: Cache key from ``make_cache_key``
+
+        Returns:
+            Tuple of (hit, value, remaining_ttl_seconds)
+        """
+        if not self.available:
+            return False, None, 0.0
+
+        try:
+            blob = await self._get_client().get(self.key_prefix + key)
+        except Exception as e:
+            self._mark_unavailable(e)
+            return False, None, 0.0
+
+        if blob is None:
+            self.misses += 1
+            return False, None, 0.0
+
+        try:
+            value, expires_at = decode_payload(blob)
+        except (ValueError, zlib.error) as e:
+            logger.warning("Discarding undecodable cache entry %s: %s", key, e)
+            self.misses += 1
+            return False, None, 0.0
+
+        remaining = expires_at - time.time()
+        if remaining <= 0:
+            self.misses += 1
+            return False, None, 0.0
+
+        self.hits += 1
+        return True, value, remaining
+
+    async def set(self, key: str, value: Any, ttl: float) -> bool:
+        """
+        Store a payload in Redis with a TTL.
+
+        Args:
+            key: Cache key from ``make_cache_key``
+            value: Decoded JSON payload
+            ttl: Time to live in seconds
+
+        Returns:
+            True if the payload was written
+        """
+        if ttl <= 0 or not self.available:
+            return False
+
+        blob = encode_payload(value, time.time() + ttl, self.compress_threshold)
+        try:
+            await self._get_client().set(self.key_prefix + key, blob, px=max(1, int(ttl * 1000)))
+        except Exception as e:
+            self._mark_unavailable(e)
+            return False
+
+        self.writes += 1
+        return True
+
+    def stats_snapshot(self) -> Dict[str, Any]:
+        """Get shared tier counters for monitoring."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "errors": self.errors,
+            "available": self.available,
+        }
+
+    async def close(self):
+        """Close the Redis connection pool."""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def _get_client(self) -> Optional[Any]:
+        if self.client is None and self.url and redis_asyncio is not None:
+            self.client = redis_asyncio.from_url(
+                self.url,
+                socket_timeout=self.timeout,
+                socket_connect_timeout=self.timeout
+            )
+        return self.client
+
+    def _mark_unavailable(self, error: Exception):
+        self.errors += 1
+        self._unavailable_until = time.monotonic() + self.retry_interval
+        logger.warning(
+            "Redis cache unavailable, using in-process cache for %ss: %s",
+            self.retry_interval, error
+        )
+
+
+# Shared tiers keyed by Redis URL
+_redis_tiers: Dict[str, RedisCacheTier] = {}
+
+
+def get_redis_tier(url: Optional[str]) -> Optional[RedisCacheTier]:
+    """
+    Get the shared Redis cache tier for a URL.
+
+    Returns:
+        RedisCacheTier, or None when no URL is configured or the
+        redis package is not installed
+    """
+    if not url or redis_asyncio is None:
+        return None
+    if url not in _redis_tiers:
+        _redis_tiers[url] = RedisCacheTier(url=url)
+    return _redis_tiers[url]
@@ -0,0 +1,181 @@
+"""Columnar, NumPy-backed representation of GA report rows."""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from .history import RATE_METRICS
+
+try:
+    import pandas as pd
+except ImportError:  # pandas is only needed for to_pandas
+    pd = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow is an optional dependency
+    pa = None
+
+
+@dataclass
+class ColumnarReport:
+    """
+    Report rows stored as one NumPy array per field.
+
+    Integer fields become int64 arrays, numeric fields with gaps become
+    float64 with NaN, and text fields stay object arrays. Payload keys
+    other than the rows (e.g. ``dateRange``) are kept in ``meta``.
+    """
+
+    columns: Dict[str, np.ndarray]
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]], fields: Optional[Sequence[str]] = None) -> "ColumnarReport":
+        """
+        Build columns from decoded row dicts.
+
+        Args:
+            rows: Row dicts, e.g. the ``pages`` list of a payload
+            fields: Fields to keep; defaults to every field seen, in order
+
+        Returns:
+            ColumnarReport with one array per field
+        """
+        rows = rows if isinstance(rows, list) else list(rows)
+        if fields is None:
+            fields = list(dict.fromkeys(key for row in rows for key in row))
+        return cls({name: _column([row.get(name) for row in rows]) for name in fields})
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any], rows_key: str, fields: Optional[Sequence[str]] = None) -> "ColumnarReport":
+        """Build a report from an MCP server payload and its row list key."""
+        report = cls.from_rows(payload.get(rows_key) or [], fields)
+        report.meta = {key: value for key, value in payload.items() if key != rows_key}
+        return report
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self.columns)
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.columns
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """Yield rows as dicts of Python values, e.g. for JSON output."""
+        names = self.fields
+        for values in zip(*(self.columns[name].tolist() for name in names)):
+            yield dict(zip(names, values))
+
+    def take(self, indexes: np.ndarray) -> "ColumnarReport":
+        """Rows at the given indexes, or where a boolean mask is true."""
+        return ColumnarReport({name: column[indexes] for name, column in self.columns.items()}, dict(self.meta))
+
+    def top(self, metric: str, k: int, largest: bool = True) -> "ColumnarReport":
+        """The ``k`` rows with the largest (or smallest) values of a metric."""
+        return self.take(_top_indexes(self.columns[metric].astype(float), k, largest))
+
+    def ranking(
+        self,
+        metrics: Sequence[str],
+        label: str,
+        k: int = 5,
+        quantiles: Tuple[float, ...] = (0.5, 0.9),
+        weight: Optional[str] = None,
+        min_weight: float = 0
+    ) -> Dict[str, Any]:
+        """
+        Top-k, bottom-k and exact quantiles per metric, vectorized.
+
+        Answers "top pages", "worst bounce pages" and similar questions
+        from one fetched report, with the same result shape as
+        ``streaming.RankingSummary`` gives for streamed rows. Rows whose
+        ``weight`` is below
+        ``min_weight`` are left out of rate-metric rankings, so a page
+        with one view and a 100% bounce rate does not top the list, but
+        still count towards quantiles.
+
+        Returns:
+            Dict with the row ``count`` and, per metric, ``top`` and
+            ``bottom`` lists of {label, "value"} plus ``quantiles``
+        """
+        labels = self.columns[label]
+        small = np.zeros(len(self), dtype=bool)
+        if weight is not None and weight in self.columns:
+            small = np.nan_to_num(self.columns[weight].astype(float)) < min_weight
+
+        results = {}
+        for metric in metrics:
+            values = self.columns[metric].astype(float) if metric in self.columns else np.full(len(self), np.nan)
+            ranked = np.where(small, np.nan, values) if metric in RATE_METRICS else values
+            present = values[~np.isnan(values)]
+            results[metric] = {
+                "top": [
+                    {label: labels[index], "value": self.columns[metric][index].item()}
+                    for index in _top_indexes(ranked, k)
+                ],
+                "bottom": [
+                    {label: labels[index], "value": self.columns[metric][index].item()}
+                    for index in _top_indexes(ranked, k, largest=False)
+                ],
+                "quantiles": {
+                    f"p{q * 100:g}": float(np.quantile(present, q)) if len(present) else None
+                    for q in quantiles
+                },
+            }
+        return {"count": len(self), "metrics": results}
+
+    def to_pandas(self):
+        """
+        Convert to a pandas DataFrame without copying the column arrays.
+
+        Raises:
+            ImportError: If pandas is not installed
+        """
+        if pd is None:
+            raise ImportError("pandas is required for ColumnarReport.to_pandas()")
+        frame = pd.DataFrame(self.columns, copy=False)
+        frame.attrs.update(self.meta)
+        return frame
+
+    def to_arrow(self):
+        """
+        Convert to a pyarrow Table; numeric columns without nulls are not copied.
+
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        if pa is None:
+            raise ImportError("pyarrow is required for ColumnarReport.to_arrow()")
+        return pa.table({name: pa.array(column) for name, column in self.columns.items()})
+
+
+def _column(values: List[Any]) -> np.ndarray:
+    kinds = {type(value) for value in values if value is not None}
+    if kinds and kinds <= {int} and None not in values:
+        return np.array(values, dtype=np.int64)
+    if kinds and kinds <= {int, float}:
+        return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def _top_indexes(values: np.ndarray, k: int, largest: bool = True) -> np.ndarray:
+    """Indexes of the k best non-NaN values, best first; ties keep row order."""
+    valid = np.flatnonzero(~np.isnan(values))
+    scores = values[valid] if largest else -values[valid]
+    if k <= 0 or not len(scores):
+        return valid[:0]
+    candidates = np.arange(len(scores))
+    if k < len(scores):
+        # O(n) selection, then sort only the values tied with or above the k-th
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        candidates = np.flatnonzero(scores >= kth)
+    order = np.lexsort((candidates, -scores[candidates]))[:k]
+    return valid[candidates[order]]
@@ -0,0 +1,170 @@
+"""Period-over-period comparison of GA reports."""
+
+import asyncio
+import re
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+from .date_ranges import DateWindow, parse_date_range
+from .history import SNAPSHOT_REPORTS, split_rows
+from .metric_engine import FRACTION_METRICS, MetricBatch, analyze_metrics_batch
+
+
+# Named comparison periods; any other value is parsed as a custom date range
+COMPARISON_PERIODS = ("previous_period", "same_period_last_year")
+
+# Report key of each comparable endpoint
+_REPORTS_BY_ENDPOINT = {spec.endpoint: report for report, spec in SNAPSHOT_REPORTS.items()}
+
+
+def comparison_window(window: DateWindow, comparison_period: Optional[str] = "previous_period") -> DateWindow:
+    """
+    Resolve the baseline window for a period.
+
+    Args:
+        window: Current period
+        comparison_period: "previous_period" (the same number of days just
+            before), "same_period_last_year", or a custom date range such as
+            "2024-01-01..2024-01-31"
+
+    Returns:
+        Baseline DateWindow
+
+    Raises:
+        ValueError: If the comparison period is not recognised
+    """
+    if comparison_period in (None, "previous_period"):
+        return DateWindow(window.start - timedelta(days=window.days), window.start - timedelta(days=1))
+    if comparison_period == "same_period_last_year":
+        return DateWindow(_year_before(window.start), _year_before(window.end))
+    try:
+        return parse_date_range(comparison_period)
+    except ValueError:
+        raise ValueError(
+            f"Invalid comparison period: {comparison_period!r}. Use one of {list(COMPARISON_PERIODS)} "
+            "or a date range such as 'YYYY-MM-DD..YYYY-MM-DD'"
+        ) from None
+
+
+def metric_name(field: str) -> str:
+    """Analysis rule name of a report field, e.g. ``bounceRate`` -> ``bounce_rate``."""
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", field).lower()
+
+
+def metric_rows(endpoint: str, payload: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Numeric metrics of a payload keyed by dimension value ("" for summary).
+
+    Fractional rates such as ``bounceRate`` are scaled to percent, the
+    scale the analysis thresholds use.
+    """
+    report = _REPORTS_BY_ENDPOINT.get(endpoint)
+    if report is None:
+        raise ValueError(f"Cannot compare {endpoint}. Must be one of {list(_REPORTS_BY_ENDPOINT)}")
+    return {
+        dimension: {
+            metric: value * 100 if metric in FRACTION_METRICS else value
+            for metric, value in metrics.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        }
+        for dimension, metrics in split_rows(report, payload).items()
+    }
+
+
+def compare_metrics(
+    current: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]]
+) -> MetricBatch:
+    """
+    Compute deltas for every metric of every dimension value in one batch.
+
+    Args:
+        current: Metrics per dimension value for the current period
+        baseline: Metrics per dimension value for the baseline period
+
+    Returns:
+        MetricBatch labelled "metric" or "dimension metric"
+    """
+    names: List[str] = []
+    labels: List[str] = []
+    values: List[float] = []
+    previous: List[Optional[float]] = []
+    for dimension, metrics in current.items():
+        before = baseline.get(dimension, {})
+        for metric, value in metrics.items():
+            names.append(metric_name(metric))
+            labels.append(f"{dimension} {metric}" if dimension else metric)
+            values.append(value)
+            previous.append(before.get(metric))
+    return analyze_metrics_batch(names, values, previous, labels)
+
+
+@dataclass
+class PeriodComparison:
+    """A report for a period and its baseline, with per-metric deltas."""
+    endpoint: str
+    window: DateWindow
+    baseline_window: DateWindow
+    comparison_period: str
+    batch: MetricBatch
+
+    def to_dict(self, include_normal: bool = True) -> Dict[str, Any]:
+        """JSON-friendly comparison for tool output."""
+        return {
+            "endpoint": self.endpoint,
+            "dateRange": self.window.to_params(),
+            "comparisonRange": self.baseline_window.to_params(),
+            "comparisonPeriod": self.comparison_period,
+            "metrics": self.batch.records(include_normal=include_normal),
+        }
+
+
+async def fetch_comparison(
+    deps: Any,
+    endpoint: str = "/api/summary",
+    date_range: Optional[str] = "30days",
+    comparison_period: Optional[str] = "previous_period",
+    params: Optional[Dict[str, Any]] = None,
+    today: Optional[date] = None
+) -> PeriodComparison:
+    """
+    Fetch a report for a period and its baseline concurrently and compare them.
+
+    Both requests go through the dependencies' cache, so repeated
+    comparisons of settled periods are served locally.
+
+    Args:
+        deps: GAAnalyticsDependencies used for the requests
+        endpoint: Report endpoint, e.g. '/api/summary' or '/api/pages'
+        date_range: Current period
+        comparison_period: See ``comparison_window``
+        params: Additional report parameters, e.g. ``limit``
+        today: Reference date; defaults to today in UTC
+
+    Returns:
+        PeriodComparison with deltas for every metric
+    """
+    if endpoint not in _REPORTS_BY_ENDPOINT:
+        raise ValueError(f"Cannot compare {endpoint}. Must be one of {list(_REPORTS_BY_ENDPOINT)}")
+    window = parse_date_range(date_range, today)
+    baseline_window = comparison_window(window, comparison_period)
+    extra = {**dict(SNAPSHOT_REPORTS[_REPORTS_BY_ENDPOINT[endpoint]].params), **(params or {})}
+
+    current, baseline = await asyncio.gather(
+        deps.fetch_ga_data(endpoint, {**extra, **window.to_params()}),
+        deps.fetch_ga_data(endpoint, {**extra, **baseline_window.to_params()}),
+    )
+    return PeriodComparison(
+        endpoint=endpoint,
+        window=window,
+        baseline_window=baseline_window,
+        comparison_period=comparison_period or "previous_period",
+        batch=compare_metrics(metric_rows(endpoint, current), metric_rows(endpoint, baseline)),
+    )
+
+
+def _year_before(day: date) -> date:
+    try:
+        return day.replace(year=day.year - 1)
+    except ValueError:  # February 29th
+        return day.replace(year=day.year - 1, day=28)
@@ -0,0 +1,262 @@
+"""Concurrency controls for outbound GA MCP server requests."""
+
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+# Rate limiter priorities; lower values are served first
+PRIORITY_INTERACTIVE = 0  # Cache misses a user is waiting on
+PRIORITY_BACKGROUND = 1   # Refreshes and prefetches nobody is blocked on
+
+
+@dataclass
+class SingleFlight:
+    """
+    Coalesce concurrent identical requests into one in-flight call.
+
+    The first caller for a key starts the work in its own task; callers
+    arriving while it runs await the same task. Cancelling one caller
+    (e.g. a dashboard section deadline) does not cancel the shared work
+    for the others.
+    """
+
+    executions: int = field(default=0, init=False)
+    coalesced: int = field(default=0, init=False)
+    _in_flight: Dict[str, "asyncio.Task[Any]"] = field(default_factory=dict, init=False, repr=False)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``fn`` once for all concurrent callers with the same key.
+
+        Args:
+            key: Request identity, e.g. a cache key
+            fn: Zero-argument coroutine function performing the request
+
+        Returns:
+            Result of the shared call
+        """
+        return await asyncio.shield(self.start(key, fn))
+
+    def start(self, key: str, fn: Callable[[], Awaitable[Any]]) -> "asyncio.Task[Any]":
+        """
+        Start ``fn`` for a key, or join the call already running, without waiting.
+
+        The key is registered before this returns, so callers in the same
+        event loop iteration coalesce onto one task.
+
+        Returns:
+            The shared task
+        """
+        task = self._in_flight.get(key)
+        if task is not None and not task.done():
+            self.coalesced += 1
+            return task
+
+        self.executions += 1
+        task = asyncio.ensure_future(fn())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return task
+
+    def in_flight(self, key: str) -> bool:
+        """Whether a call for ``key`` is currently running."""
+        task = self._in_flight.get(key)
+        return task is not None and not task.done()
+
+    def stats_snapshot(self) -> Dict[str, Any]:
+        """Get coalescing counters for monitoring."""
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
+
+    def _finish(self, key: str, task: "asyncio.Task[Any]"):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the exception retrieved; every awaiting caller re-raises it
+        if not task.cancelled():
+            task.exception()
+
+
+# Process-wide single-flight group shared by every dependencies instance
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """Get the process-wide single-flight group, creating it on first use."""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
+
+
+@dataclass
+class _Waiter:
+    future: "asyncio.Future[float]"
+    enqueued_at: float
+    priority: int
+    key: Optional[str]
+    sequence: int
+
+
+@dataclass
+class TokenBucketRateLimiter:
+    """
+    Async token bucket that queues requests instead of rejecting them.
+
+    Holds up to ``rate_limit`` tokens and refills at ``rate_limit /
+    window`` tokens per second. When the bucket is empty, callers wait in
+    a priority queue: interactive cache-miss traffic is released before
+    background traffic, and FIFO within a priority.
+    """
+
+    rate_limit: int
+    window: float
+    clock: Callable[[], float] = field(default=time.monotonic, repr=False)
+
+    acquired: int = field(default=0, init=False)
+    queued: int = field(default=0, init=False)
+    total_wait: float = field(default=0.0, init=False)
+    max_wait: float = field(default=0.0, init=False)
+    _tokens: float = field(default=0.0, init=False, repr=False)
+    _updated: float = field(default=0.0, init=False, repr=False)
+    _waiters: List[Tuple[int, int, _Waiter]] = field(default_factory=list, init=False, repr=False)
+    _sequence: Any = field(default_factory=itertools.count, init=False, repr=False)
+    _dispatcher: Optional["asyncio.Task[None]"] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        self._tokens = float(self.rate_limit)
+        self._updated = self.clock()
+
+    @property
+    def refill_rate(self) -> float:
+        """Tokens added per second."""
+        return self.rate_limit / self.window
+
+    @property
+    def tokens(self) -> float:
+        """Tokens currently available."""
+        self._refill()
+        return self._tokens
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE, key: Optional[str] = None) -> float:
+        """
+        Take one token, waiting for a refill if the bucket is empty.
+
+        Args:
+            priority: PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND
+            key: Optional request identity, used by ``promote``
+
+        Returns:
+            Seconds spent waiting for the token
+        """
+        self._refill()
+        if not self._pending() and self._tokens >= 1:
+            self._tokens -= 1
+            self._record(0.0)
+            return 0.0
+
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(loop.create_future(), self.clock(), priority, key, next(self._sequence))
+        self._push(waiter)
+        self.queued += 1
+        self._ensure_dispatcher()
+        return await waiter.future
+
+    def promote(self, key: str, priority: int = PRIORITY_INTERACTIVE) -> bool:
+        """
+        Raise the priority of a queued request.
+
+        Used when an interactive caller joins an in-flight background
+        request so it is not stuck behind other background traffic.
+
+        Returns:
+            True if a queued request was promoted
+        """
+        promoted = False
+        for _, _, waiter in list(self._waiters):
+            if waiter.key == key and priority < waiter.priority and not waiter.future.done():
+                waiter.priority = priority
+                self._push(waiter)
+                promoted = True
+        return promoted
+
+    def stats_snapshot(self) -> Dict[str, Any]:
+        """Get limiter counters for monitoring."""
+        return {
+            "rate_limit": self.rate_limit,
+            "window": self.window,
+            "tokens": round(self.tokens, 3),
+            "acquired": self.acquired,
+            "queued": self.queued,
+            "waiting": self._pending(),
+            "avg_wait": round(self.total_wait / self.acquired, 4) if self.acquired else 0.0,
+            "max_wait": round(self.max_wait, 4),
+        }
+
+    def _refill(self):
+        now = self.clock()
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(float(self.rate_limit), self._tokens + elapsed * self.refill_rate)
+            self._updated = now
+
+    def _push(self, waiter: _Waiter):
+        # Promoted waiters keep their original place within the new priority
+        heapq.heappush(self._waiters, (waiter.priority, waiter.sequence, waiter))
+
+    def _pending(self) -> int:
+        # Promoted waiters appear twice in the heap; count each caller once
+        return len({id(waiter) for _, _, waiter in self._waiters if not waiter.future.done()})
+
+    def _record(self, waited: float):
+        self.acquired += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    def _ensure_dispatcher(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+
+    async def _dispatch(self):
+        while self._waiters:
+            priority, _, waiter = self._waiters[0]
+            # Skip cancelled callers and stale entries left behind by promote()
+            if waiter.future.done() or priority != waiter.priority:
+                heapq.heappop(self._waiters)
+                continue
+
+            self._refill()
+            if self._tokens >= 1:
+                heapq.heappop(self._waiters)
+                self._tokens -= 1
+                waited = self.clock() - waiter.enqueued_at
+                self._record(waited)
+                waiter.future.set_result(waited)
+                continue
+
+            await asyncio.sleep((1 - self._tokens) / self.refill_rate)
+
+
+# Process-wide limiters keyed by (rate_limit, window)
+_rate_limiters: Dict[Tuple[int, float], TokenBucketRateLimiter] = {}
+
+
+def get_rate_limiter(rate_limit: int, window: float) -> Optional[TokenBucketRateLimiter]:
+    """
+    Get the limiter shared by every dependencies instance with this quota.
+
+    Returns:
+        TokenBucketRateLimiter, or None when rate limiting is disabled
+    """
+    if rate_limit <= 0 or window <= 0:
+        return None
+    key = (rate_limit, float(window))
+    if key not in _rate_limiters:
+        _rate_limiters[key] = TokenBucketRateLimiter(rate_limit=rate_limit, window=float(window))
+    return _rate_limiters[key]
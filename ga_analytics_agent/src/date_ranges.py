@@ -0,0 +1,244 @@
+"""Resolve GA date ranges to canonical absolute dates."""
+
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Optional
+
+
+# First day of GA4 data served for the ``alltime`` alias
+ALLTIME_START = date(2020, 1, 1)
+
+# Fallback the MCP server applies to unknown or missing aliases
+DEFAULT_DATE_RANGE = "30days"
+
+# Endpoint-specific defaults when a request names no range
+ENDPOINT_DEFAULT_RANGES: Dict[str, str] = {
+    "/api/daily-traffic": "14days",
+}
+
+# Endpoints that take no date range
+UNDATED_ENDPOINTS = frozenset({"/api/realtime", "/api/query"})
+
+# Aliases understood by the MCP server, as days back from today
+_DAY_OFFSETS: Dict[str, int] = {
+    "today": 0,
+    "7days": 7,
+    "14days": 14,
+    "30days": 30,
+    "90days": 90,
+}
+
+# Aliases measured in calendar months back from today
+_MONTH_OFFSETS: Dict[str, int] = {
+    "12months": 12,
+    "2years": 24,
+    "3years": 36,
+}
+
+_ALLTIME_ALIASES = frozenset({"alltime", "all", "all_time", "all-time", "all time"})
+
+# "this month", "last_quarter", "previous year", ...: calendar periods, not rolling windows
+_CALENDAR_PATTERN = re.compile(r"^(this|last|previous)[\s_-]*(week|month|quarter|year)$")
+
+# "7days", "last7days", "past_7_days", "last 30 days", "7d", "12m", "2y", ...
+_RELATIVE_PATTERN = re.compile(
+    r"^(?:last|past|previous)?[\s_-]*(\d+)[\s_-]*(d|days?|w|weeks?|m|months?|y|years?)$"
+)
+
+# "2024-01-01..2024-01-31", "2024-01-01/2024-01-31", "2024-01-01 to 2024-01-31"
+_EXPLICIT_PATTERN = re.compile(
+    r"^(\d{4}-\d{2}-\d{2})\s*(?:\.\.|/|,|\s+to\s+)\s*(\d{4}-\d{2}-\d{2})$"
+)
+
+
+def utc_today() -> date:
+    """Current date in UTC, the calendar the MCP server resolves ranges in."""
+    return datetime.now(timezone.utc).date()
+
+
+@dataclass(frozen=True)
+class DateWindow:
+    """Absolute, inclusive date range in UTC."""
+    start: date
+    end: date
+
+    @property
+    def days(self) -> int:
+        """Number of days covered, inclusive."""
+        return (self.end - self.start).days + 1
+
+    def includes(self, day: date) -> bool:
+        """Whether ``day`` falls within the window."""
+        return self.start <= day <= self.end
+
+    def to_params(self) -> Dict[str, str]:
+        """Query parameters selecting this window on the MCP server."""
+        return {"startDate": self.start.isoformat(), "endDate": self.end.isoformat()}
+
+    @classmethod
+    def from_params(cls, params: Optional[Dict]) -> Optional["DateWindow"]:
+        """Read explicit ``startDate``/``endDate`` parameters, if both are set."""
+        params = params or {}
+        if not params.get("startDate") or not params.get("endDate"):
+            return None
+        return cls(_parse_iso(params["startDate"]), _parse_iso(params["endDate"]))
+
+
+def parse_date_range(date_range: Optional[str], today: Optional[date] = None) -> DateWindow:
+    """
+    Resolve a date range alias or explicit date pair to absolute dates.
+
+    Accepts the MCP server aliases (``7days``, ``12months``, ``alltime``,
+    ...), common spellings of relative windows (``last7days``,
+    ``past_30_days``, ``7d``, ``2 weeks``, ``6months``) and explicit pairs
+    such as ``2024-01-01..2024-01-31``. Relative windows follow the
+    server's convention of ending today. Calendar periods (``this week``,
+    ``last month``, ``last quarter``, ``this year``) are resolved locally:
+    the current period runs from its first day to today, the last one is
+    the complete previous period, with weeks starting on Monday.
+
+    Args:
+        date_range: Alias or explicit range; None means ``30days``
+        today: Reference date; defaults to today in UTC
+
+    Returns:
+        DateWindow for the range
+
+    Raises:
+        ValueError: If the range is not recognised or is inverted
+    """
+    today = today or utc_today()
+    alias = re.sub(r"\s+", " ", (date_range or DEFAULT_DATE_RANGE).strip().lower())
+
+    if alias == "yesterday":
+        yesterday = today - timedelta(days=1)
+        return DateWindow(yesterday, yesterday)
+    if alias in _ALLTIME_ALIASES:
+        return DateWindow(ALLTIME_START, today)
+    if alias in _DAY_OFFSETS:
+        return DateWindow(today - timedelta(days=_DAY_OFFSETS[alias]), today)
+    if alias in _MONTH_OFFSETS:
+        return DateWindow(_months_before(today, _MONTH_OFFSETS[alias]), today)
+
+    calendar = _CALENDAR_PATTERN.match(alias)
+    if calendar:
+        when, unit = calendar.groups()
+        start = _period_start(today, unit)
+        if when == "this":
+            return DateWindow(start, today)
+        end = start - timedelta(days=1)
+        return DateWindow(_period_start(end, unit), end)
+
+    explicit = _EXPLICIT_PATTERN.match(alias)
+    if explicit:
+        return _checked_window(_parse_iso(explicit.group(1)), _parse_iso(explicit.group(2)))
+
+    relative = _RELATIVE_PATTERN.match(alias)
+    if relative:
+        count, unit = int(relative.group(1)), relative.group(2)[0]
+        if unit == "d":
+            return DateWindow(today - timedelta(days=count), today)
+        if unit == "w":
+            return DateWindow(today - timedelta(weeks=count), today)
+        if unit == "m":
+            return DateWindow(_months_before(today, count), today)
+        return DateWindow(_months_before(today, 12 * count), today)
+
+    raise ValueError(
+        f"Unrecognised date range: {date_range!r}. Use e.g. '7days', '12months', "
+        "'alltime' or 'YYYY-MM-DD..YYYY-MM-DD'"
+    )
+
+
+def resolve_date_range(date_range: Optional[str], today: Optional[date] = None) -> DateWindow:
+    """
+    Resolve a date range the way the MCP server does for raw aliases.
+
+    Unknown aliases fall back to the last 30 days instead of raising.
+
+    Args:
+        date_range: Alias such as ``7days``, ``12months`` or ``alltime``
+        today: Reference date; defaults to today in UTC
+
+    Returns:
+        DateWindow for the alias
+    """
+    try:
+        return parse_date_range(date_range, today)
+    except ValueError:
+        return parse_date_range(DEFAULT_DATE_RANGE, today)
+
+
+def normalize_date_params(
+    endpoint: str,
+    params: Optional[Dict] = None,
+    today: Optional[date] = None
+) -> Dict:
+    """
+    Replace any date range in request parameters with canonical absolute dates.
+
+    ``dateRange`` aliases and explicit ``startDate``/``endDate`` pairs are
+    resolved to ``startDate``/``endDate``, so equivalent windows produce
+    identical parameters and therefore one cache entry and one GA call.
+    Requests without a range get the endpoint's default window.
+    Undated endpoints have date parameters removed.
+
+    Args:
+        endpoint: API endpoint path
+        params: Query parameters
+        today: Reference date; defaults to today in UTC
+
+    Returns:
+        New parameter dict
+    """
+    normalized = {
+        key: value
+        for key, value in (params or {}).items()
+        if key not in ("dateRange", "startDate", "endDate")
+    }
+    endpoint = endpoint.rstrip("/")
+    if endpoint in UNDATED_ENDPOINTS:
+        return normalized
+
+    params = params or {}
+    if params.get("startDate") or params.get("endDate"):
+        if not params.get("startDate") or not params.get("endDate"):
+            raise ValueError("startDate and endDate must be given together")
+        window = _checked_window(_parse_iso(params["startDate"]), _parse_iso(params["endDate"]))
+    else:
+        date_range = params.get("dateRange") or ENDPOINT_DEFAULT_RANGES.get(endpoint, DEFAULT_DATE_RANGE)
+        window = parse_date_range(date_range, today)
+
+    normalized.update(window.to_params())
+    return normalized
+
+
+def _parse_iso(value: str) -> date:
+    try:
+        return date.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError(f"Invalid date {value!r}; expected YYYY-MM-DD") from None
+
+
+def _checked_window(start: date, end: date) -> DateWindow:
+    if start > end:
+        raise ValueError(f"Date range starts after it ends: {start} > {end}")
+    return DateWindow(start, end)
+
+
+def _period_start(day: date, unit: str) -> date:
+    if unit == "week":
+        return day - timedelta(days=day.weekday())
+    if unit == "month":
+        return day.replace(day=1)
+    if unit == "quarter":
+        return date(day.year, 3 * ((day.month - 1) // 3) + 1, 1)
+    return date(day.year, 1, 1)
+
+
+def _months_before(day: date, months: int) -> date:
+    # Day overflow rolls into the next month (Mar 31 - 1 month = Mar 2/3),
+    # matching JavaScript's Date.setMonth on the MCP server
+    year, month = divmod(day.month - 1 - months, 12)
+    return date(day.year + year, month + 1, 1) + timedelta(days=day.day - 1)
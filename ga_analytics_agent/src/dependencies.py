@@ -1,11 +1,91 @@
 """Dependency injection for GA Analytics Agent."""
 
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass, field
-from typing import Optional, Any, Dict, List
+from typing import Optional, Any, Dict, Iterator, List, Set, Tuple
 import httpx
+from .cache import (
+    FreshnessPolicy,
+    RedisCacheTier,
+    ResponseCache,
+    get_redis_tier,
+    get_response_cache,
+    make_cache_key,
+    payload_fingerprint,
+)
+from .concurrency import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    SingleFlight,
+    TokenBucketRateLimiter,
+    get_rate_limiter,
+    get_single_flight,
+)
+from .date_ranges import normalize_date_params
+from .history import HistoryStore
+from .http_pool import get_http_pool
+from .rollups import get_history_store
+from .resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    GAFetchError,
+    RetryBudget,
+    get_circuit_breaker,
+    is_retryable,
+    parse_retry_after,
+)
 from .settings import settings
 
 
+logger = logging.getLogger(__name__)
+
+# Endpoints where a slightly stale answer beats waiting on the MCP server
+STALE_WHILE_REVALIDATE_ENDPOINTS = frozenset({
+    "/api/summary",
+    "/api/traffic",
+    "/api/pages",
+    "/api/devices",
+})
+
+# GA reads of the current task: cache key -> (endpoint, params, payload fingerprint)
+DataReads = Dict[str, Tuple[str, Dict, str]]
+_data_reads: ContextVar[Optional[DataReads]] = ContextVar("ga_data_reads", default=None)
+
+
+@contextmanager
+def record_data_reads() -> Iterator[DataReads]:
+    """
+    Record every payload returned by ``fetch_ga_data`` within the block.
+
+    Reads made by tasks started inside the block are recorded too. The
+    fingerprints tell callers such as the answer cache which GA data a
+    result depended on.
+
+    Yields:
+        Dict filled with cache key -> (endpoint, params, fingerprint)
+    """
+    reads: DataReads = {}
+    token = _data_reads.set(reads)
+    try:
+        yield reads
+    finally:
+        _data_reads.reset(token)
+
+
+# Strong references to background refreshes so they are not garbage collected
+_background_refreshes: Set["asyncio.Task[Any]"] = set()
+
+
+async def drain_background_refreshes():
+    """Wait for all scheduled stale-while-revalidate refreshes to finish."""
+    while _background_refreshes:
+        await asyncio.gather(*list(_background_refreshes), return_exceptions=True)
+
+
 @dataclass
 class GAAnalyticsDependencies:
     """Dependencies for GA Analytics Dashboard Agent."""
@@ -17,6 +97,7 @@ class GAAnalyticsDependencies:
     # Session Context
     session_id: Optional[str] = None
     user_id: Optional[str] = None
+    mode: str = "default"  # Operation mode; selects the mode instructions in the system prompt
     
     # Chart Generation Settings
     chart_width: int = field(default_factory=lambda: settings.chart_width)
@@ -26,11 +107,19 @@ class GAAnalyticsDependencies:
     # Performance Settings
     max_retries: int = field(default_factory=lambda: settings.max_retries)
     timeout: int = field(default_factory=lambda: settings.timeout_seconds)
+    retry_base_delay: float = field(default_factory=lambda: settings.retry_base_delay)
+    retry_max_delay: float = field(default_factory=lambda: settings.retry_max_delay)
+    retry_budget_seconds: float = field(default_factory=lambda: settings.retry_budget_seconds)
     cache_ttl: int = field(default_factory=lambda: settings.cache_ttl)
+    stale_while_revalidate: int = field(
+        default_factory=lambda: settings.cache_stale_while_revalidate
+    )
+    redis_url: Optional[str] = field(default_factory=lambda: settings.redis_url)
     
     # Runtime Configuration
     debug: bool = field(default_factory=lambda: settings.debug)
     api_rate_limit: int = field(default_factory=lambda: settings.api_rate_limit)
+    api_rate_window: int = field(default_factory=lambda: settings.api_rate_window)
     
     # Analytics Context
     date_range: Optional[str] = None
@@ -39,43 +128,321 @@ class GAAnalyticsDependencies:
     
     # Lazy-initialized clients
     _http_client: Optional[httpx.AsyncClient] = field(default=None, init=False, repr=False)
-    _cache_client: Optional[Any] = field(default=None, init=False, repr=False)
+    _cache_client: Optional[ResponseCache] = field(default=None, init=False, repr=False)
+    _shared_cache_client: Optional[RedisCacheTier] = field(default=None, init=False, repr=False)
+    _single_flight: Optional[SingleFlight] = field(default=None, init=False, repr=False)
+    _retry_budget: Optional[RetryBudget] = field(default=None, init=False, repr=False)
+    _circuit_breaker: Optional[CircuitBreaker] = field(default=None, init=False, repr=False)
+    _freshness_policy: Optional[FreshnessPolicy] = field(default=None, init=False, repr=False)
+    _history_store: Optional[HistoryStore] = field(default=None, init=False, repr=False)
+    
+    # Per-request rate limiter wait times as (endpoint, seconds)
+    rate_limit_waits: List[Tuple[str, float]] = field(default_factory=list, init=False, repr=False)
+    
+    @property
+    def cache(self) -> ResponseCache:
+        """Get the response cache, shared process-wide unless overridden."""
+        if self._cache_client is None:
+            self._cache_client = get_response_cache()
+        return self._cache_client
+    
+    @property
+    def shared_cache(self) -> Optional[RedisCacheTier]:
+        """Get the Redis cache tier shared across worker processes, if configured."""
+        if self._shared_cache_client is None:
+            self._shared_cache_client = get_redis_tier(self.redis_url)
+        return self._shared_cache_client
+    
+    @property
+    def freshness_policy(self) -> FreshnessPolicy:
+        """Get the policy deriving cache TTLs from the requested date range."""
+        if self._freshness_policy is None:
+            self._freshness_policy = FreshnessPolicy(live_ttl=self.cache_ttl)
+        return self._freshness_policy
+    
+    @property
+    def history(self) -> Optional[HistoryStore]:
+        """Get the local snapshot history with rollups, if ``history_db_path`` is configured."""
+        if self._history_store is None:
+            self._history_store = get_history_store()
+        return self._history_store
+    
+    @property
+    def single_flight(self) -> SingleFlight:
+        """Get the single-flight group coalescing identical in-flight requests."""
+        if self._single_flight is None:
+            self._single_flight = get_single_flight()
+        return self._single_flight
+    
+    @property
+    def retry_budget(self) -> RetryBudget:
+        """Get the backoff budget shared by every retry in this query."""
+        if self._retry_budget is None:
+            self._retry_budget = RetryBudget(max_seconds=self.retry_budget_seconds)
+        return self._retry_budget
+    
+    @property
+    def circuit_breaker(self) -> Optional[CircuitBreaker]:
+        """Get the circuit breaker shared by all instances for this server, if enabled."""
+        if self._circuit_breaker is None:
+            self._circuit_breaker = get_circuit_breaker(self.ga_server_url)
+        return self._circuit_breaker
+    
+    @property
+    def rate_limiter(self) -> Optional[TokenBucketRateLimiter]:
+        """Get the token bucket shared by all instances with this quota, if enabled."""
+        return get_rate_limiter(self.api_rate_limit, self.api_rate_window)
     
     @property
     def http_client(self) -> httpx.AsyncClient:
-        """Get or create HTTP client for GA MCP server requests."""
-        if self._http_client is None:
-            self._http_client = httpx.AsyncClient(
-                timeout=httpx.Timeout(self.timeout),
-                base_url=self.ga_server_url,
-                headers={"Content-Type": "application/json"}
-            )
-        return self._http_client
+        """
+        Get the HTTP client for GA MCP server requests.
+        
+        Uses the process-wide keep-alive pool unless a dedicated client
+        has been assigned to ``_http_client``.
+        """
+        if self._http_client is not None:
+            return self._http_client
+        return get_http_pool().get_client(self.ga_server_url)
     
-    async def fetch_ga_data(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
+    async def fetch_ga_data(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+        allow_stale: Optional[bool] = None
+    ) -> Dict:
         """
         Fetch data from GA MCP server.
         
+        Date ranges in ``params`` (``dateRange`` aliases or explicit
+        ``startDate``/``endDate``) are first normalized to absolute
+        ``startDate``/``endDate``, so equivalent windows share one request.
+        Responses are cached keyed on the endpoint and normalized
+        parameters, with a TTL from ``freshness_policy``: ``cache_ttl``
+        for ranges including today, longer for settled historical ranges
+        and shorter for realtime data. Lookups check the in-process
+        cache first, then the shared Redis tier when ``redis_url`` is set.
+        A ``cache_ttl`` of 0 disables caching. Concurrent misses for the
+        same endpoint and parameters share a single in-flight request.
+        Outbound requests are queued by the shared ``api_rate_limit`` /
+        ``api_rate_window`` token bucket rather than rejected. While the
+        server's circuit breaker is open, requests fail fast with
+        ``CircuitOpenError`` or are served from stale cache entries.
+        
+        Dashboard endpoints use stale-while-revalidate: for up to
+        ``stale_while_revalidate`` seconds past expiry the cached payload
+        is returned immediately and refreshed in a background task.
+        
+        Inside ``record_data_reads`` each returned payload is logged with
+        its fingerprint.
+        
         Args:
             endpoint: API endpoint path
             params: Optional query parameters
+            priority: Rate limiter priority; background work should pass
+                ``PRIORITY_BACKGROUND`` so user-facing misses go first
+            allow_stale: Override stale-while-revalidate for this call;
+                defaults to True for ``STALE_WHILE_REVALIDATE_ENDPOINTS``
             
         Returns:
             Response data as dictionary
+        
+        Raises:
+            ValueError: If the date range cannot be resolved
+        """
+        params = normalize_date_params(endpoint, params)
+        cache_key = make_cache_key(endpoint, params)
+        data = await self._lookup(cache_key, endpoint, params, priority, allow_stale)
+        reads = _data_reads.get()
+        if reads is not None:
+            reads[cache_key] = (endpoint, params, payload_fingerprint(data))
+        return data
+    
+    async def _lookup(
+        self,
+        cache_key: str,
+        endpoint: str,
+        params: Dict,
+        priority: int,
+        allow_stale: Optional[bool]
+    ) -> Dict:
+        """Serve a normalized request from the cache tiers or the MCP server."""
+        if self.cache_ttl > 0:
+            hit, cached = self.cache.get(cache_key)
+            if hit:
+                return cached
+            
+            if allow_stale is None:
+                allow_stale = endpoint.rstrip("/") in STALE_WHILE_REVALIDATE_ENDPOINTS
+            if allow_stale and self.stale_while_revalidate > 0:
+                hit, stale, staleness = self.cache.get_stale(cache_key)
+                if hit and staleness <= self.stale_while_revalidate:
+                    self._schedule_refresh(cache_key, endpoint, params)
+                    return stale
+            
+            shared_cache = self.shared_cache
+            if shared_cache is not None:
+                hit, cached, remaining_ttl = await shared_cache.get(cache_key)
+                if hit:
+                    self.cache.set(cache_key, cached, remaining_ttl)
+                    return cached
+        
+        if self.single_flight.in_flight(cache_key) and self.rate_limiter is not None:
+            # Joining a queued request: make sure it waits at our priority
+            self.rate_limiter.promote(cache_key, priority)
+        
+        return await self.single_flight.do(
+            cache_key,
+            lambda: self._fetch_and_cache(cache_key, endpoint, params, priority)
+        )
+    
+    def _schedule_refresh(self, cache_key: str, endpoint: str, params: Optional[Dict]):
+        """Refresh a stale entry in the background unless a fetch is already running."""
+        if self.single_flight.in_flight(cache_key):
+            return
+        
+        task = self.single_flight.start(cache_key, lambda: self._refresh(cache_key, endpoint, params))
+        _background_refreshes.add(task)
+        task.add_done_callback(_finish_refresh)
+    
+    async def _refresh(self, cache_key: str, endpoint: str, params: Optional[Dict]) -> Dict:
+        """Revalidate an entry, preferring a copy another worker already refreshed."""
+        shared_cache = self.shared_cache
+        if shared_cache is not None:
+            hit, cached, remaining_ttl = await shared_cache.get(cache_key)
+            if hit:
+                self.cache.set(cache_key, cached, remaining_ttl)
+                return cached
+        return await self._fetch_and_cache(cache_key, endpoint, params, PRIORITY_BACKGROUND)
+    
+    async def _fetch_and_cache(
+        self,
+        cache_key: str,
+        endpoint: str,
+        params: Optional[Dict],
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Dict:
+        """Request GA data and store it in every configured cache tier."""
+        breaker = self.circuit_breaker
+        if breaker is not None and not breaker.allow_request():
+            hit, stale, staleness = self.cache.get_stale(cache_key)
+            if hit:
+                if self.debug:
+                    print(f"Circuit open: serving {endpoint} from cache ({staleness:.0f}s stale)")
+                return stale
+            raise CircuitOpenError(
+                f"GA MCP server circuit is open; retry in {breaker.retry_after:.0f}s",
+                endpoint=endpoint,
+                retry_after=breaker.retry_after
+            )
+        
+        rate_limiter = self.rate_limiter
+        if rate_limiter is not None:
+            waited = await rate_limiter.acquire(priority, key=cache_key)
+            self.rate_limit_waits.append((endpoint, waited))
+            if self.debug and waited > 0:
+                print(f"Rate limiter delayed {endpoint} by {waited:.2f}s")
+        
+        data = await self._timed_request(breaker, endpoint, params)
+        
+        if self.cache_ttl > 0:
+            ttl = self.freshness_policy.ttl_for(endpoint, params)
+            self.cache.set(cache_key, data, ttl)
+            if self.shared_cache is not None:
+                await self.shared_cache.set(cache_key, data, ttl)
+        return data
+    
+    async def _timed_request(
+        self,
+        breaker: Optional[CircuitBreaker],
+        endpoint: str,
+        params: Optional[Dict]
+    ) -> Dict:
+        """Issue a request and report its outcome and latency to the circuit breaker."""
+        if breaker is None:
+            return await self._request_ga_data(endpoint, params)
+        
+        started = time.perf_counter()
+        try:
+            data = await self._request_ga_data(endpoint, params)
+        except Exception as e:
+            latency = time.perf_counter() - started
+            if is_retryable(e):
+                breaker.record_failure(latency)
+            else:
+                # The server answered; client errors say nothing about its health
+                breaker.record_success(latency)
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        breaker.record_success(time.perf_counter() - started)
+        return data
+    
+    async def _request_ga_data(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
+        """
+        Issue a GA MCP server request, bypassing the cache.
+        
+        Raises:
+            GAFetchError: Classified as timeout, connection, http or error
         """
         try:
-            response = await self.http_client.get(endpoint, params=params)
+            response = await self.http_client.get(
+                endpoint,
+                params=params,
+                timeout=httpx.Timeout(self.timeout)
+            )
             response.raise_for_status()
             return response.json()
-        except httpx.TimeoutException:
-            raise ValueError(f"Request to {endpoint} timed out after {self.timeout}s")
+        except httpx.TimeoutException as e:
+            raise GAFetchError(
+                f"Request to {endpoint} timed out after {self.timeout}s",
+                endpoint=endpoint,
+                kind="timeout"
+            ) from e
         except httpx.HTTPStatusError as e:
-            raise ValueError(f"GA MCP server error: {e.response.status_code} - {e.response.text}")
+            raise GAFetchError(
+                f"GA MCP server error: {e.response.status_code} - {e.response.text}",
+                endpoint=endpoint,
+                kind="http",
+                status_code=e.response.status_code,
+                retry_after=parse_retry_after(e.response.headers.get("Retry-After"))
+            ) from e
+        except httpx.TransportError as e:
+            raise GAFetchError(
+                f"Failed to connect to GA MCP server: {str(e)}",
+                endpoint=endpoint,
+                kind="connection"
+            ) from e
         except Exception as e:
-            raise ValueError(f"Failed to fetch GA data: {str(e)}")
+            raise GAFetchError(f"Failed to fetch GA data: {str(e)}", endpoint=endpoint) from e
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Get response cache counters for monitoring."""
+        stats = self.cache.stats_snapshot()
+        if self.shared_cache is not None:
+            stats["shared"] = self.shared_cache.stats_snapshot()
+        return stats
+    
+    def request_stats(self) -> Dict[str, Any]:
+        """Get cache and request coalescing counters for monitoring."""
+        return {
+            "cache": self.cache_stats(),
+            "single_flight": self.single_flight.stats_snapshot(),
+            "rate_limiter": self.rate_limiter.stats_snapshot() if self.rate_limiter else None,
+            "rate_limit_waits": list(self.rate_limit_waits),
+            "circuit_breaker": self.circuit_breaker.stats_snapshot() if self.circuit_breaker else None,
+            "background_refreshes": len(_background_refreshes),
+        }
     
     async def cleanup(self):
-        """Clean up resources like HTTP client connections."""
+        """
+        Clean up resources owned by this instance.
+        
+        Pooled connections are shared and stay open; they are closed by
+        ``http_pool.shutdown_http_pool`` at application shutdown.
+        """
         if self._http_client:
             await self._http_client.aclose()
             self._http_client = None
@@ -101,9 +468,15 @@ class GAAnalyticsDependencies:
             'chart_theme': settings.chart_theme,
             'max_retries': settings.max_retries,
             'timeout': settings.timeout_seconds,
+            'retry_base_delay': settings.retry_base_delay,
+            'retry_max_delay': settings.retry_max_delay,
+            'retry_budget_seconds': settings.retry_budget_seconds,
             'cache_ttl': settings.cache_ttl,
+            'stale_while_revalidate': settings.cache_stale_while_revalidate,
+            'redis_url': settings.redis_url,
             'debug': settings.debug,
             'api_rate_limit': settings.api_rate_limit,
+            'api_rate_window': settings.api_rate_window,
         }
         
         # Apply settings overrides if provided
@@ -126,20 +499,39 @@ class GAAnalyticsDependencies:
         Returns:
             New GAAnalyticsDependencies with session context
         """
-        return GAAnalyticsDependencies(
+        session_deps = GAAnalyticsDependencies(
             ga_server_url=self.ga_server_url,
             ga_timeout=self.ga_timeout,
             session_id=session_id,
             user_id=user_id,
+            mode=self.mode,
             chart_width=self.chart_width,
             chart_height=self.chart_height,
             chart_theme=self.chart_theme,
             max_retries=self.max_retries,
             timeout=self.timeout,
+            retry_base_delay=self.retry_base_delay,
+            retry_max_delay=self.retry_max_delay,
+            retry_budget_seconds=self.retry_budget_seconds,
             cache_ttl=self.cache_ttl,
+            stale_while_revalidate=self.stale_while_revalidate,
+            redis_url=self.redis_url,
             debug=self.debug,
             api_rate_limit=self.api_rate_limit,
+            api_rate_window=self.api_rate_window,
             date_range=self.date_range,
             active_campaigns=self.active_campaigns,
             focus_metrics=self.focus_metrics
-        )
\ No newline at end of file
+        )
+        session_deps._cache_client = self._cache_client
+        session_deps._shared_cache_client = self._shared_cache_client
+        session_deps._single_flight = self._single_flight
+        session_deps._circuit_breaker = self._circuit_breaker
+        session_deps._history_store = self._history_store
+        return session_deps
+
+
+def _finish_refresh(task: "asyncio.Task[Any]"):
+    _background_refreshes.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Background cache refresh failed: %s", task.exception())
@@ -0,0 +1,319 @@
+"""Local SQLite history of daily GA report snapshots."""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .date_ranges import DateWindow, utc_today
+from .settings import settings
+
+
+@dataclass(frozen=True)
+class SnapshotReport:
+    """How a dashboard report is fetched and split into per-dimension rows."""
+    endpoint: str
+    rows_key: Optional[str] = None  # None: the payload's "metrics" is one row
+    dimensions: Tuple[str, ...] = ()
+    weight: str = "sessions"  # Metric used to average rate metrics across days
+    params: Tuple[Tuple[str, Any], ...] = ()
+
+
+# Reports captured in daily snapshots
+SNAPSHOT_REPORTS: Dict[str, SnapshotReport] = {
+    "summary": SnapshotReport("/api/summary"),
+    "pages": SnapshotReport("/api/pages", "pages", ("path",), weight="views", params=(("limit", 100),)),
+    "traffic": SnapshotReport("/api/traffic", "sources", ("source",), params=(("limit", 50),)),
+    "devices": SnapshotReport(
+        "/api/devices", "devices", ("deviceCategory", "operatingSystem", "browser")
+    ),
+}
+
+# Ratio metrics that must be weighted rather than summed across days
+RATE_METRICS = frozenset({"avgSessionDuration", "avgDuration", "bounceRate", "engagementRate"})
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    property_id TEXT NOT NULL,
+    report TEXT NOT NULL,
+    day TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    metrics TEXT NOT NULL,
+    fetched_on TEXT NOT NULL,
+    PRIMARY KEY (property_id, report, day, dimension)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS snapshots_by_dimension
+    ON snapshots (property_id, report, dimension, day);
+"""
+
+
+def split_rows(report: str, payload: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Split a report payload into metric rows keyed by dimension value.
+
+    Args:
+        report: Key of ``SNAPSHOT_REPORTS``
+        payload: MCP server response for a single day
+
+    Returns:
+        Mapping of dimension key ("" for summary) to metric values
+    """
+    spec = SNAPSHOT_REPORTS[report]
+    if spec.rows_key is None:
+        return {"": dict(payload.get("metrics") or {})}
+
+    rows = {}
+    for row in payload.get(spec.rows_key) or []:
+        dimension = "|".join(str(row.get(name, "")) for name in spec.dimensions)
+        rows[dimension] = {
+            key: value for key, value in row.items()
+            if key not in spec.dimensions
+        }
+    return rows
+
+
+def aggregate_rows(rows: Iterable[Dict[str, Any]], weight: str = "sessions") -> Dict[str, Any]:
+    """
+    Combine daily metric rows into one row for the whole period.
+
+    Counts are summed; rate metrics are averaged weighted by ``weight``.
+    Summed daily users are an upper bound on unique users for the period.
+    """
+    totals: Dict[str, float] = {}
+    weighted: Dict[str, float] = {}
+    weights: Dict[str, float] = {}
+    for row in rows:
+        row_weight = float(row.get(weight) or 0)
+        for metric, value in row.items():
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            if metric in RATE_METRICS:
+                weighted[metric] = weighted.get(metric, 0.0) + value * row_weight
+                weights[metric] = weights.get(metric, 0.0) + row_weight
+            else:
+                totals[metric] = totals.get(metric, 0) + value
+
+    for metric, total_weight in weights.items():
+        totals[metric] = weighted[metric] / total_weight if total_weight else 0.0
+    return totals
+
+
+@dataclass
+class HistoryStore:
+    """
+    Daily snapshots of summary, pages, traffic and device metrics.
+
+    Rows are stored in SQLite per property, report, day and dimension
+    value, indexed for date-range reads. Blocking database calls run in a
+    worker thread so they do not stall the event loop.
+    """
+
+    path: str = field(default_factory=lambda: settings.history_db_path or ":memory:")
+    property_id: str = field(default_factory=lambda: settings.ga_property_id)
+    settle_days: int = field(default_factory=lambda: settings.ga_data_settle_days)
+
+    _connection: Optional[sqlite3.Connection] = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    async def record(self, report: str, day: date, payload: Dict[str, Any], fetched_on: Optional[date] = None) -> int:
+        """
+        Store a single-day report payload, replacing any earlier snapshot.
+
+        Args:
+            report: Key of ``SNAPSHOT_REPORTS``
+            day: Day the payload covers
+            payload: MCP server response for that day
+            fetched_on: Date the payload was fetched; defaults to today
+
+        Returns:
+            Number of rows stored
+        """
+        rows = split_rows(report, payload)
+        fetched = (fetched_on or utc_today()).isoformat()
+        values = [
+            (self.property_id, report, day.isoformat(), dimension, json.dumps(metrics), fetched)
+            for dimension, metrics in rows.items()
+        ]
+
+        def write(connection: sqlite3.Connection):
+            connection.execute(
+                "DELETE FROM snapshots WHERE property_id = ? AND report = ? AND day = ?",
+                (self.property_id, report, day.isoformat())
+            )
+            connection.executemany("INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?)", values)
+
+        await self._run(write, commit=True)
+        return len(values)
+
+    async def rows(
+        self,
+        report: str,
+        window: DateWindow,
+        dimension: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Read stored rows for a date range in date order.
+
+        Args:
+            report: Key of ``SNAPSHOT_REPORTS``
+            window: Days to read
+            dimension: Only this dimension value (e.g. a page path)
+
+        Returns:
+            Rows with ``day``, ``dimension`` and their metrics
+        """
+        query = (
+            "SELECT day, dimension, metrics FROM snapshots "
+            "WHERE property_id = ? AND report = ? AND day BETWEEN ? AND ?"
+        )
+        args: List[Any] = [self.property_id, report, window.start.isoformat(), window.end.isoformat()]
+        if dimension is not None:
+            query += " AND dimension = ?"
+            args.append(dimension)
+        query += " ORDER BY day, dimension"
+
+        records = await self._run(lambda connection: connection.execute(query, args).fetchall())
+        return [
+            {"day": day, "dimension": dim, **json.loads(metrics)}
+            for day, dim, metrics in records
+        ]
+
+    async def aggregate(
+        self,
+        report: str,
+        window: DateWindow,
+        dimension: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Aggregate stored rows over a period, per dimension value.
+
+        Returns:
+            Mapping of dimension key to combined metrics (see ``aggregate_rows``)
+        """
+        by_dimension: Dict[str, List[Dict[str, Any]]] = {}
+        for row in await self.rows(report, window, dimension):
+            by_dimension.setdefault(row["dimension"], []).append(row)
+        weight = SNAPSHOT_REPORTS[report].weight
+        return {key: aggregate_rows(rows, weight) for key, rows in by_dimension.items()}
+
+    async def series(
+        self,
+        report: str,
+        metric: str,
+        window: DateWindow,
+        dimension: str = ""
+    ) -> List[Tuple[str, Any]]:
+        """Daily values of one metric as (ISO day, value) pairs."""
+        return [
+            (row["day"], row.get(metric))
+            for row in await self.rows(report, window, dimension)
+        ]
+
+    async def final_days(self, report: str, window: DateWindow) -> List[date]:
+        """Days in the window whose snapshot was taken after GA settled them."""
+        records = await self._run(lambda connection: connection.execute(
+            "SELECT DISTINCT day, fetched_on FROM snapshots "
+            "WHERE property_id = ? AND report = ? AND day BETWEEN ? AND ?",
+            (self.property_id, report, window.start.isoformat(), window.end.isoformat())
+        ).fetchall())
+        days = []
+        for day, fetched_on in records:
+            day = date.fromisoformat(day)
+            if (date.fromisoformat(fetched_on) - day).days >= self.settle_days:
+                days.append(day)
+        return sorted(set(days))
+
+    async def close(self):
+        """Close the database connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    async def _run(self, operation, commit: bool = False):
+        def run():
+            with self._lock:
+                connection = self._connect()
+                result = operation(connection)
+                if commit:
+                    connection.commit()
+                return result
+        return await asyncio.to_thread(run)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            if self.path != ":memory:":
+                # Lets other worker processes read while one writes
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(self._schema())
+        return self._connection
+
+    def _schema(self) -> str:
+        return _SCHEMA
+
+
+async def capture_snapshot(
+    deps: Any,
+    store: HistoryStore,
+    day: date,
+    reports: Iterable[str] = tuple(SNAPSHOT_REPORTS)
+) -> Dict[str, int]:
+    """
+    Fetch single-day reports and record them in the history store.
+
+    Args:
+        deps: GAAnalyticsDependencies used for the requests
+        store: Destination store
+        day: Day to capture
+        reports: Keys of ``SNAPSHOT_REPORTS`` to capture
+
+    Returns:
+        Number of rows stored per report
+    """
+    reports = list(reports)
+    day_params = {"startDate": day.isoformat(), "endDate": day.isoformat()}
+    payloads = await asyncio.gather(*[
+        deps.fetch_ga_data(SNAPSHOT_REPORTS[report].endpoint, {**dict(SNAPSHOT_REPORTS[report].params), **day_params})
+        for report in reports
+    ])
+    return {
+        report: await store.record(report, day, payload)
+        for report, payload in zip(reports, payloads)
+    }
+
+
+async def backfill_history(
+    deps: Any,
+    store: HistoryStore,
+    window: DateWindow,
+    reports: Iterable[str] = tuple(SNAPSHOT_REPORTS)
+) -> List[date]:
+    """
+    Capture every day in the window that has no settled snapshot yet.
+
+    Days are captured one at a time; requests still go through the
+    dependencies' cache, rate limiter and circuit breaker.
+
+    Returns:
+        Days captured
+    """
+    reports = list(reports)
+    final = None
+    for report in reports:
+        days = set(await store.final_days(report, window))
+        final = days if final is None else final & days
+
+    captured = []
+    day = window.start
+    while day <= window.end:
+        if day not in (final or set()):
+            await capture_snapshot(deps, store, day, reports)
+            captured.append(day)
+        day += timedelta(days=1)
+    return captured
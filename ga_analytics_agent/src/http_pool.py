@@ -0,0 +1,136 @@
+"""Process-wide pooled HTTP clients for GA MCP server requests."""
+
+import asyncio
+import importlib.util
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+import httpx
+from .settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HTTPClientPool:
+    """
+    Shared keep-alive connection pool for the GA MCP server.
+
+    One ``httpx.AsyncClient`` is kept per base URL so every dependencies
+    instance, including ``with_session`` copies, reuses warm TCP/TLS
+    connections instead of opening a new client per query. Clients are
+    bound to the event loop they were created on and are recreated if
+    the pool is used from a different loop.
+    """
+
+    max_connections: int = field(default_factory=lambda: settings.http_max_connections)
+    max_keepalive_connections: int = field(
+        default_factory=lambda: settings.http_max_keepalive_connections
+    )
+    keepalive_expiry: float = field(default_factory=lambda: settings.http_keepalive_expiry)
+    http2: bool = field(default_factory=lambda: settings.http2_enabled)
+    timeout: float = field(default_factory=lambda: settings.timeout_seconds)
+
+    _clients: Dict[str, Tuple[httpx.AsyncClient, Optional[asyncio.AbstractEventLoop]]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    @property
+    def limits(self) -> httpx.Limits:
+        """Connection limits applied to every pooled client."""
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+    def get_client(self, base_url: str) -> httpx.AsyncClient:
+        """
+        Get the pooled client for a base URL, creating it on first use.
+
+        Args:
+            base_url: GA MCP server URL
+
+        Returns:
+            Shared httpx.AsyncClient
+        """
+        loop = _running_loop()
+        pooled = self._clients.get(base_url)
+        if pooled is not None:
+            client, client_loop = pooled
+            if not client.is_closed and client_loop is loop:
+                return client
+
+        client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=httpx.Timeout(self.timeout),
+            limits=self.limits,
+            http2=self.http2 and _http2_available(),
+            headers={"Content-Type": "application/json"}
+        )
+        self._clients[base_url] = (client, loop)
+        return client
+
+    async def aclose(self):
+        """Close every pooled client owned by the running event loop."""
+        loop = _running_loop()
+        clients, self._clients = self._clients, {}
+        for client, client_loop in clients.values():
+            if client_loop is loop and not client.is_closed:
+                await client.aclose()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _http2_available() -> bool:
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+# Process-wide pool shared by every dependencies instance
+_http_pool: Optional[HTTPClientPool] = None
+
+
+def get_http_pool() -> HTTPClientPool:
+    """Get the process-wide HTTP client pool, creating it on first use."""
+    global _http_pool
+    if _http_pool is None:
+        _http_pool = HTTPClientPool()
+    return _http_pool
+
+
+async def startup_http_pool(base_url: Optional[str] = None) -> HTTPClientPool:
+    """
+    Create the shared pool and its client ahead of the first query.
+
+    Call from application startup (e.g. a FastAPI lifespan handler) so the
+    first chat turn does not pay for client construction.
+
+    Args:
+        base_url: GA MCP server URL to pre-create a client for
+
+    Returns:
+        The process-wide HTTPClientPool
+    """
+    pool = get_http_pool()
+    pool.get_client(base_url or settings.ga_mcp_server_url)
+    return pool
+
+
+async def shutdown_http_pool():
+    """Close all pooled connections. Call from application shutdown."""
+    global _http_pool
+    if _http_pool is not None:
+        await _http_pool.aclose()
+        _http_pool = None
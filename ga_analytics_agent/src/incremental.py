@@ -0,0 +1,203 @@
+"""Incremental fetching of date-dimension GA reports."""
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from .cache import make_cache_key
+from .date_ranges import DateWindow, normalize_date_params, utc_today
+from .settings import settings
+
+
+# Default date-dimension report and the metrics it returns per day
+DAILY_TRAFFIC_ENDPOINT = "/api/daily-traffic"
+DAILY_METRICS = ("users", "pageViews", "sessions")
+
+# Unique-visitor counts; summing them across days counts returning visitors twice
+UNIQUE_METRICS = frozenset({"users", "activeUsers", "totalUsers"})
+
+
+def row_date(row: Dict[str, Any]) -> Optional[date]:
+    """Read the day of a report row from its ``rawDate`` (YYYYMMDD)."""
+    raw = str(row.get("rawDate") or "")
+    try:
+        return datetime.strptime(raw, "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+def empty_row(day: date, metrics: Tuple[str, ...] = DAILY_METRICS) -> Dict[str, Any]:
+    """Row for a day GA returned nothing for, i.e. a day without traffic."""
+    row: Dict[str, Any] = {
+        "date": f"{day:%b} {day.day}",
+        "rawDate": day.strftime("%Y%m%d"),
+    }
+    row.update({metric: 0 for metric in metrics})
+    return row
+
+
+@dataclass
+class _StoredRow:
+    row: Dict[str, Any]
+    fetched_on: date
+
+
+@dataclass
+class DailyRowStore:
+    """
+    Per-day rows of date-dimension reports, kept between requests.
+
+    Rows are stored per series (endpoint plus non-date parameters) and
+    day. A row is final once it was fetched at least ``settle_days``
+    after the day it describes; GA may still revise younger rows, so they
+    are fetched again.
+    """
+
+    settle_days: int = field(default_factory=lambda: settings.ga_data_settle_days)
+    _series: Dict[str, Dict[date, _StoredRow]] = field(default_factory=dict, init=False, repr=False)
+
+    def missing_days(self, series: str, window: DateWindow) -> List[date]:
+        """Days in the window with no final row for the series."""
+        rows = self._series.get(series, {})
+        missing = []
+        day = window.start
+        while day <= window.end:
+            stored = rows.get(day)
+            if stored is None or not self._is_final(day, stored.fetched_on):
+                missing.append(day)
+            day += timedelta(days=1)
+        return missing
+
+    def store(
+        self,
+        series: str,
+        window: DateWindow,
+        rows: List[Dict[str, Any]],
+        fetched_on: date,
+        metrics: Tuple[str, ...] = DAILY_METRICS
+    ) -> int:
+        """
+        Store the rows of a fetched span, recording days without rows as zero.
+
+        Returns:
+            Number of days stored
+        """
+        by_day = {row_date(row): row for row in rows}
+        stored = self._series.setdefault(series, {})
+        day = window.start
+        while day <= window.end:
+            stored[day] = _StoredRow(by_day.get(day) or empty_row(day, metrics), fetched_on)
+            day += timedelta(days=1)
+        return window.days
+
+    def rows(self, series: str, window: DateWindow) -> List[Dict[str, Any]]:
+        """Stored rows for the window in date order."""
+        stored = self._series.get(series, {})
+        return [
+            stored[day].row
+            for day in sorted(stored)
+            if window.includes(day)
+        ]
+
+    def clear(self):
+        """Drop all stored rows."""
+        self._series.clear()
+
+    def __len__(self) -> int:
+        return sum(len(rows) for rows in self._series.values())
+
+    def _is_final(self, day: date, fetched_on: date) -> bool:
+        return (fetched_on - day).days >= self.settle_days
+
+
+def missing_spans(days: List[date], merge_gap: int = 7) -> List[DateWindow]:
+    """
+    Group sorted days into contiguous windows to fetch.
+
+    Runs separated by at most ``merge_gap`` stored days are merged, trading
+    a few refetched days for fewer GA requests.
+    """
+    spans: List[DateWindow] = []
+    for day in days:
+        if spans and (day - spans[-1].end).days <= merge_gap + 1:
+            spans[-1] = DateWindow(spans[-1].start, day)
+        else:
+            spans.append(DateWindow(day, day))
+    return spans
+
+
+# Process-wide row store shared by every dependencies instance
+_daily_row_store: Optional[DailyRowStore] = None
+
+
+def get_daily_row_store() -> DailyRowStore:
+    """Get the process-wide daily row store, creating it on first use."""
+    global _daily_row_store
+    if _daily_row_store is None:
+        _daily_row_store = DailyRowStore()
+    return _daily_row_store
+
+
+async def fetch_daily_window(
+    deps: Any,
+    date_range: Optional[str] = "30days",
+    endpoint: str = DAILY_TRAFFIC_ENDPOINT,
+    params: Optional[Dict] = None,
+    store: Optional[DailyRowStore] = None,
+    metrics: Tuple[str, ...] = DAILY_METRICS,
+    today: Optional[date] = None
+) -> Dict[str, Any]:
+    """
+    Fetch a rolling window of daily rows, requesting only days not stored yet.
+
+    Settled days are reused from the row store; only missing or still
+    revisable days (typically the last ``settle_days``) are requested
+    from the MCP server, each contiguous span as one request.
+
+    Args:
+        deps: GAAnalyticsDependencies used for the span requests
+        date_range: Date range alias or explicit pair
+        endpoint: Date-dimension report endpoint
+        params: Additional, non-date report parameters
+        store: Row store; defaults to the process-wide store
+        metrics: Daily metrics of the report
+        today: Reference date; defaults to today in UTC
+
+    Returns:
+        Dictionary with ``dateRange``, ``dailyData``, ``totals`` (sums of
+        daily values, leaving out ``UNIQUE_METRICS``, whose window totals
+        only ``/api/summary`` can give) and ``incremental`` request
+        statistics
+    """
+    today = today or utc_today()
+    store = store if store is not None else get_daily_row_store()
+    extra = dict(params or {})
+    requested = normalize_date_params(endpoint, {**extra, "dateRange": date_range}, today)
+    window = DateWindow.from_params(requested)
+    series = make_cache_key(endpoint, {key: value for key, value in requested.items()
+                                       if key not in ("startDate", "endDate")})
+
+    spans = missing_spans(store.missing_days(series, window))
+    responses = await asyncio.gather(*[
+        deps.fetch_ga_data(endpoint, {**extra, **span.to_params()})
+        for span in spans
+    ])
+    for span, response in zip(spans, responses):
+        store.store(series, span, response.get("dailyData") or [], today, metrics)
+
+    rows = store.rows(series, window)
+    fetched_days = sum(span.days for span in spans)
+    return {
+        "dateRange": window.to_params(),
+        "dailyData": rows,
+        "totals": {
+            metric: sum(row.get(metric) or 0 for row in rows)
+            for metric in metrics
+            if metric not in UNIQUE_METRICS
+        },
+        "incremental": {
+            "requests": len(spans),
+            "fetched_days": fetched_days,
+            "reused_days": window.days - fetched_days,
+        },
+    }
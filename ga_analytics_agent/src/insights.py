@@ -0,0 +1,289 @@
+"""Declarative insight rules, indexed by the data sections they read."""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from .columnar import ColumnarReport
+from .metric_engine import HIGH_BOUNCE_PAGE_RATE
+
+
+# Sentinel for field paths that do not resolve
+_MISSING = object()
+
+RuleCheck = Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+
+@dataclass(frozen=True)
+class InsightRule:
+    """
+    One insight check and the inputs it needs.
+
+    ``fields`` are dotted paths starting with the section name, e.g.
+    ``"devices.desktop.conversion_rate"``. For list and ``ColumnarReport``
+    sections the path after the section names a row field. The rule is
+    only evaluated when every field resolves.
+    """
+    name: str
+    fields: Tuple[str, ...]
+    check: RuleCheck
+    sections: Tuple[str, ...] = ()
+    paths: Tuple[Tuple[str, ...], ...] = field(default=(), repr=False)
+
+    @classmethod
+    def compile(cls, name: str, fields: Tuple[str, ...], check: RuleCheck) -> "InsightRule":
+        """Build a rule with its sections and split field paths precomputed."""
+        if not fields:
+            raise ValueError(f"Insight rule {name} must declare at least one field")
+        paths = tuple(tuple(path.split(".")) for path in fields)
+        sections = tuple(dict.fromkeys(path[0] for path in paths))
+        return cls(name=name, fields=fields, check=check, sections=sections, paths=paths)
+
+    def applies_to(self, data: Dict[str, Any]) -> bool:
+        """Whether every declared field is present in the data."""
+        return all(_resolve(data, path) is not _MISSING for path in self.paths)
+
+
+@dataclass
+class RuleStats:
+    """Evaluation timings of one rule."""
+    calls: int = 0
+    fired: int = 0
+    total_ms: float = 0.0
+    last_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "fired": self.fired,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "last_ms": round(self.last_ms, 3),
+        }
+
+
+@dataclass
+class InsightRuleSet:
+    """
+    Registry of insight rules indexed by data section.
+
+    Rules are compiled when registered. ``evaluate`` only looks at rules
+    indexed under sections present in the data, so adding rules for other
+    sections does not slow a call down.
+    """
+
+    _rules: Dict[str, InsightRule] = field(default_factory=dict, init=False, repr=False)
+    _by_section: Dict[str, List[InsightRule]] = field(default_factory=dict, init=False, repr=False)
+    _stats: Dict[str, RuleStats] = field(default_factory=dict, init=False, repr=False)
+    _order: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+
+    def register(self, name: str, fields: Tuple[str, ...], check: RuleCheck) -> InsightRule:
+        """
+        Add a rule, replacing any rule with the same name.
+
+        Args:
+            name: Unique rule name
+            fields: Dotted field paths the rule reads
+            check: Returns ``InsightGeneration`` fields, or None when the rule does not fire
+
+        Returns:
+            The compiled rule
+        """
+        if name in self._rules:
+            self.unregister(name)
+        rule = InsightRule.compile(name, tuple(fields), check)
+        self._rules[name] = rule
+        # Index under the first section; the rest are checked by applies_to
+        self._by_section.setdefault(rule.sections[0], []).append(rule)
+        self._stats[name] = RuleStats()
+        self._order[name] = len(self._order)
+        return rule
+
+    def rule(self, name: str, fields: Tuple[str, ...]) -> Callable[[RuleCheck], RuleCheck]:
+        """Decorator form of ``register``."""
+        def decorator(check: RuleCheck) -> RuleCheck:
+            self.register(name, fields, check)
+            return check
+        return decorator
+
+    def unregister(self, name: str):
+        """Remove a rule by name."""
+        rule = self._rules.pop(name)
+        self._by_section[rule.sections[0]].remove(rule)
+        self._stats.pop(name, None)
+        self._order.pop(name, None)
+
+    def candidates(self, data: Dict[str, Any]) -> List[InsightRule]:
+        """Rules indexed under sections present in the data, in registration order."""
+        rules = [
+            rule
+            for section in data
+            for rule in self._by_section.get(section, ())
+        ]
+        return sorted(rules, key=lambda rule: self._order[rule.name])
+
+    def evaluate(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Run every rule whose inputs are present.
+
+        Args:
+            data: Analytics data keyed by section
+
+        Returns:
+            ``InsightGeneration`` field dicts of the rules that fired
+        """
+        results = []
+        for rule in self.candidates(data):
+            if not rule.applies_to(data):
+                continue
+            started = time.perf_counter()
+            result = rule.check(data)
+            elapsed = (time.perf_counter() - started) * 1000
+
+            stats = self._stats[rule.name]
+            stats.calls += 1
+            stats.total_ms += elapsed
+            stats.last_ms = elapsed
+            if result is not None:
+                stats.fired += 1
+                results.append(result)
+        return results
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-rule evaluation counts and timings."""
+        return {name: stats.to_dict() for name, stats in self._stats.items()}
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+
+def _resolve(data: Any, path: Tuple[str, ...]) -> Any:
+    value = data
+    for key in path:
+        if isinstance(value, dict):
+            value = value.get(key, _MISSING)
+        elif isinstance(value, ColumnarReport):
+            return value[key] if key in value else _MISSING
+        elif isinstance(value, list):
+            # Row key of a list section: present if any row has it
+            return next((row[key] for row in value if isinstance(row, dict) and key in row), _MISSING)
+        else:
+            return _MISSING
+        if value is _MISSING:
+            return value
+    return value
+
+
+# Built-in rules used by tools.generate_insights
+DEFAULT_RULES = InsightRuleSet()
+
+
+@DEFAULT_RULES.rule("high_direct_traffic", fields=("traffic.direct_traffic_percentage",))
+def _high_direct_traffic(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if data["traffic"]["direct_traffic_percentage"] <= 50:
+        return None
+    return {
+        "insight_type": "opportunity",
+        "title": "High Direct Traffic Attribution",
+        "description": "Over 50% of traffic is attributed to direct sources, indicating potential tracking issues.",
+        "impact": "Missing attribution data for marketing campaigns",
+        "action_items": [
+            "Implement UTM parameters for all campaigns",
+            "Review tracking code implementation",
+            "Set up campaign tracking dashboard"
+        ],
+        "priority": "high",
+    }
+
+
+def _page_bounce_rates(pages: Any) -> np.ndarray:
+    """
+    Bounce rate per page as a fraction.
+
+    GA rows carry ``bounceRate`` as a 0-1 fraction; rows written as
+    ``bounce_rate`` are in percent. Pages with neither are left out.
+    """
+    if isinstance(pages, ColumnarReport):
+        if "bounceRate" in pages:
+            rates = pages["bounceRate"].astype(float)
+        elif "bounce_rate" in pages:
+            rates = pages["bounce_rate"].astype(float) / 100
+        else:
+            return np.empty(0)
+        return rates[~np.isnan(rates)]
+    rates = []
+    for page in pages:
+        if not isinstance(page, dict):
+            continue
+        if page.get("bounceRate") is not None:
+            rates.append(float(page["bounceRate"]))
+        elif page.get("bounce_rate") is not None:
+            rates.append(float(page["bounce_rate"]) / 100)
+    return np.asarray(rates, dtype=float)
+
+
+# Declared on the section: pages carry either the GA field or the percent one
+@DEFAULT_RULES.rule("high_bounce_pages", fields=("pages",))
+def _high_bounce_pages(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    high_bounce_pages = int(np.count_nonzero(_page_bounce_rates(data["pages"]) > HIGH_BOUNCE_PAGE_RATE))
+    if not high_bounce_pages:
+        return None
+    return {
+        "insight_type": "anomaly",
+        "title": "High Bounce Rate Pages Detected",
+        "description": f"{high_bounce_pages} pages have bounce rates above {HIGH_BOUNCE_PAGE_RATE:.0%}",
+        "impact": "Poor user engagement and conversion potential",
+        "action_items": [
+            "Review page content relevance",
+            "Improve page load speed",
+            "Add clear calls-to-action",
+            "Test different content formats"
+        ],
+        "priority": "medium",
+    }
+
+
+@DEFAULT_RULES.rule("declining_conversions", fields=("conversions.trend",))
+def _declining_conversions(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if data["conversions"]["trend"] != "declining":
+        return None
+    return {
+        "insight_type": "trend",
+        "title": "Declining Conversion Rate Trend",
+        "description": "Conversion rates have decreased over the past period",
+        "impact": "Reduced ROI on marketing efforts",
+        "action_items": [
+            "A/B test landing pages",
+            "Review conversion funnel for drop-offs",
+            "Optimize form fields",
+            "Implement exit-intent offers"
+        ],
+        "priority": "high",
+    }
+
+
+@DEFAULT_RULES.rule("mobile_conversion_gap", fields=("devices.desktop.conversion_rate",))
+def _mobile_conversion_gap(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    devices = data["devices"]
+    mobile_conversion = devices.get("mobile", {}).get("conversion_rate", 0)
+    desktop_conversion = devices["desktop"]["conversion_rate"]
+    if not (desktop_conversion > 0 and mobile_conversion < desktop_conversion * 0.5):
+        return None
+    return {
+        "insight_type": "opportunity",
+        "title": "Mobile Conversion Rate Optimization Needed",
+        "description": "Mobile conversion rate is less than 50% of desktop rate",
+        "impact": "Missing conversions from mobile traffic",
+        "action_items": [
+            "Optimize mobile user experience",
+            "Simplify mobile forms",
+            "Improve mobile page speed",
+            "Test mobile-specific CTAs"
+        ],
+        "priority": "high",
+    }
+
+
+def get_insight_rules() -> InsightRuleSet:
+    """Get the process-wide insight rule set."""
+    return DEFAULT_RULES
@@ -0,0 +1,254 @@
+"""Deterministic answers for simple metric lookups, without the LLM."""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple
+from .answer_cache import normalize_query
+from .date_ranges import DateWindow, parse_date_range
+
+
+logger = logging.getLogger(__name__)
+
+# Summary metric of each spoken name, longest names matched first
+METRIC_SYNONYMS: Dict[str, str] = {
+    "sessions": "sessions",
+    "visits": "sessions",
+    "users": "activeUsers",
+    "active users": "activeUsers",
+    "visitors": "activeUsers",
+    "new users": "newUsers",
+    "new visitors": "newUsers",
+    "page views": "pageViews",
+    "pageviews": "pageViews",
+    "views": "pageViews",
+    "bounce rate": "bounceRate",
+    "engagement rate": "engagementRate",
+    "average session duration": "avgSessionDuration",
+    "avg session duration": "avgSessionDuration",
+    "session duration": "avgSessionDuration",
+}
+
+# Display name and number format of each summary metric
+METRIC_FORMATS: Dict[str, Tuple[str, str]] = {
+    "sessions": ("Sessions", "{:,.0f}"),
+    "activeUsers": ("Active users", "{:,.0f}"),
+    "newUsers": ("New users", "{:,.0f}"),
+    "pageViews": ("Page views", "{:,.0f}"),
+    "bounceRate": ("Bounce rate", "{:.1%}"),
+    "engagementRate": ("Engagement rate", "{:.1%}"),
+    "avgSessionDuration": ("Average session duration", "{:,.0f}s"),
+}
+
+# Fixed period phrases and the MCP server alias they mean, as in its query prompt
+PERIOD_ALIASES: Dict[str, str] = {
+    "today": "today",
+    "yesterday": "yesterday",
+    "past week": "7days",
+    "past month": "30days",
+    "past year": "12months",
+    "all time": "alltime",
+}
+
+# Calendar periods, passed on as spoken: parse_date_range resolves "last month"
+# to the previous calendar month rather than the last 30 days
+CALENDAR_PERIODS = r"(?:this|last) (?:week|month|quarter|year)"
+
+# Default when a lookup names no period, matching the MCP server
+DEFAULT_PERIOD = "30days"
+
+_METRIC = "|".join(sorted(map(re.escape, METRIC_SYNONYMS), key=len, reverse=True))
+_PERIOD = (
+    "|".join(sorted(map(re.escape, PERIOD_ALIASES), key=len, reverse=True))
+    + rf"|{CALENDAR_PERIODS}"
+    + r"|(?:last|past|previous) \d+ (?:days?|weeks?|months?|years?)"
+)
+_PERIOD_SUFFIX = rf"(?:,? (?:for |in |over |during |from )?(?:the )?(?P<period>{_PERIOD}))?"
+_ASK = r"(?:(?:what (?:is|was|were|are)|how many|show(?: me)?|get|give me|tell me) )?(?:the |our |my )?"
+
+
+@dataclass(frozen=True)
+class RoutedQuery:
+    """A question recognized as a direct lookup."""
+    intent: str
+    endpoint: str
+    period: str
+    metric: Optional[str] = None
+    limit: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class Intent:
+    """A compiled pattern and how its matches become a lookup."""
+    name: str
+    endpoint: str
+    pattern: Pattern[str]
+    metric: Optional[str] = None  # Fixed metric; otherwise the "metric" group
+    default_limit: Optional[int] = None
+
+    def route(self, query: str) -> Optional[RoutedQuery]:
+        match = self.pattern.fullmatch(query)
+        if match is None:
+            return None
+        groups = match.groupdict()
+        limit = None
+        if self.default_limit is not None:
+            limit = int(groups.get("limit") or self.default_limit)
+        return RoutedQuery(
+            intent=self.name,
+            endpoint=self.endpoint,
+            period=_period_alias(groups.get("period")),
+            metric=self.metric or METRIC_SYNONYMS.get(groups.get("metric") or ""),
+            limit=limit,
+        )
+
+
+# Lookups answered without the agent; anything else falls through
+INTENTS: List[Intent] = [
+    Intent(
+        "summary_metric",
+        "/api/summary",
+        re.compile(rf"{_ASK}(?:total |number of )?(?P<metric>{_METRIC}){_PERIOD_SUFFIX}"),
+    ),
+    Intent(
+        "top_pages",
+        "/api/pages",
+        re.compile(
+            rf"{_ASK}(?:top|most (?:viewed|visited|popular)) (?:(?P<limit>\d+) )?pages(?: by views)?{_PERIOD_SUFFIX}"
+        ),
+        metric="views",
+        default_limit=10,
+    ),
+    Intent(
+        "top_sources",
+        "/api/traffic",
+        re.compile(
+            rf"{_ASK}top (?:(?P<limit>\d+) )?(?:traffic )?(?:sources|channels)(?: by sessions)?{_PERIOD_SUFFIX}"
+        ),
+        metric="sessions",
+        default_limit=10,
+    ),
+]
+
+
+def route_query(query: str) -> Optional[RoutedQuery]:
+    """
+    Match a question against the intent table.
+
+    Args:
+        query: User's question
+
+    Returns:
+        RoutedQuery for a direct lookup, or None for open-ended questions
+    """
+    normalized = normalize_query(query)
+    for intent in INTENTS:
+        routed = intent.route(normalized)
+        if routed is not None:
+            return routed
+    return None
+
+
+_PERIOD_MENTION = re.compile(rf"\b(?:{_PERIOD})\b")
+
+
+def find_period(query: str) -> Optional[str]:
+    """
+    Date range alias of the first period phrase anywhere in a question.
+
+    Args:
+        query: User's question
+
+    Returns:
+        Alias such as "7days", "last 30 days" or "last month", or None if no period is named
+    """
+    match = _PERIOD_MENTION.search(normalize_query(query))
+    return _period_alias(match.group(0)) if match else None
+
+
+def _period_alias(phrase: Optional[str]) -> str:
+    if not phrase:
+        return DEFAULT_PERIOD
+    return PERIOD_ALIASES.get(phrase, phrase)
+
+
+def _describe(window: DateWindow) -> str:
+    if window.start == window.end:
+        return window.start.isoformat()
+    return f"{window.start.isoformat()} to {window.end.isoformat()}"
+
+
+def _summary_answer(routed: RoutedQuery, data: Dict[str, Any], window: DateWindow) -> str:
+    value = (data.get("metrics") or {}).get(routed.metric)
+    label, number = METRIC_FORMATS[routed.metric]
+    if value is None:
+        return f"{label} is not available for {_describe(window)}."
+    return f"{label} ({_describe(window)}): {number.format(value)}."
+
+
+def _ranked_answer(
+    rows_key: str,
+    label_key: str,
+    noun: str,
+    details: Callable[[Dict[str, Any]], str]
+) -> Callable[[RoutedQuery, Dict[str, Any], DateWindow], str]:
+    def answer(routed: RoutedQuery, data: Dict[str, Any], window: DateWindow) -> str:
+        rows = (data.get(rows_key) or [])[:routed.limit]
+        if not rows:
+            return f"No {noun} data for {_describe(window)}."
+        lines = [f"Top {len(rows)} {noun} ({_describe(window)}):"]
+        lines.extend(
+            f"{rank}. {row.get(label_key) or '(not set)'}: {details(row)}"
+            for rank, row in enumerate(rows, start=1)
+        )
+        return "\n".join(lines)
+    return answer
+
+
+# Templated answer of each intent
+_ANSWERS: Dict[str, Callable[[RoutedQuery, Dict[str, Any], DateWindow], str]] = {
+    "summary_metric": _summary_answer,
+    "top_pages": _ranked_answer(
+        "pages", "path", "pages",
+        lambda row: f"{row.get('views', 0):,} views, {row.get('users', 0):,} users"
+    ),
+    "top_sources": _ranked_answer(
+        "sources", "source", "traffic sources",
+        lambda row: f"{row.get('sessions', 0):,} sessions, {row.get('users', 0):,} users"
+    ),
+}
+
+
+async def answer_routed(deps: Any, routed: RoutedQuery) -> str:
+    """
+    Fetch the data for a routed lookup and fill in its answer template.
+
+    Args:
+        deps: GAAnalyticsDependencies used for the request
+        routed: Lookup from ``route_query``
+
+    Returns:
+        Answer text
+    """
+    window = parse_date_range(routed.period)
+    params: Dict[str, Any] = window.to_params()
+    if routed.limit is not None:
+        params["limit"] = routed.limit
+    data = await deps.fetch_ga_data(routed.endpoint, params)
+    return _ANSWERS[routed.intent](routed, data, window)
+
+
+async def try_fast_answer(deps: Any, query: str) -> Optional[str]:
+    """
+    Answer a simple lookup directly, or return None to use the agent.
+
+    Failures also return None so the agent can still handle the question.
+    """
+    routed = route_query(query)
+    if routed is None:
+        return None
+    try:
+        return await answer_routed(deps, routed)
+    except Exception as e:
+        logger.warning("Fast path for %r failed, falling back to the agent: %s", query, e)
+        return None
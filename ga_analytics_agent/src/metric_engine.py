@@ -0,0 +1,173 @@
+"""Vectorized metric analysis for large batches of GA metrics."""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Union
+import numpy as np
+
+
+# Change percentages beyond this magnitude mark a trend
+TREND_THRESHOLD = 5.0
+
+TRENDS = np.array(["stable", "up", "down"], dtype=object)
+SEVERITIES = np.array(["normal", "warning", "critical"], dtype=object)
+
+# Severity thresholds and the recommendation for each rule's metric; rates are in percent
+BOUNCE_RATE_LIMIT = 70.0
+CONVERSION_DROP_LIMIT = -15.0
+SESSIONS_DROP_LIMIT = -20.0
+RECOMMENDATIONS = {
+    "bounce_rate": "High bounce rate detected. Review page content and user experience.",
+    "conversion_rate": "Significant drop in conversion rate. Investigate recent changes.",
+    "sessions": "Notable decrease in traffic. Check marketing campaigns and SEO.",
+}
+
+# GA report fields returned as fractions (0-1), scaled to percent before analysis
+FRACTION_METRICS = frozenset({"bounceRate", "engagementRate"})
+
+# Page bounce rate, as a GA fraction, above which a page counts as high-bounce
+HIGH_BOUNCE_PAGE_RATE = 0.8
+
+ArrayLike = Union[Sequence[Any], np.ndarray]
+
+
+@dataclass
+class MetricBatch:
+    """
+    Column-oriented analysis results.
+
+    ``change_percentage`` is NaN where no change could be computed.
+    ``trend`` and ``severity`` hold indexes into ``TRENDS`` and
+    ``SEVERITIES``.
+    """
+    names: np.ndarray
+    labels: np.ndarray
+    current: np.ndarray
+    previous: np.ndarray
+    change_percentage: np.ndarray
+    trend: np.ndarray
+    severity: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def flagged(self) -> np.ndarray:
+        """Row indexes with a non-normal severity."""
+        return np.flatnonzero(self.severity != 0)
+
+    def trends(self) -> np.ndarray:
+        """Trend labels per row."""
+        return TRENDS[self.trend]
+
+    def severities(self) -> np.ndarray:
+        """Severity labels per row."""
+        return SEVERITIES[self.severity]
+
+    def records(self, include_normal: bool = False) -> List[Dict[str, Any]]:
+        """
+        Build ``MetricAnalysis`` field dicts.
+
+        Args:
+            include_normal: Also include rows with normal severity
+
+        Returns:
+            One dict per row, non-normal rows only by default
+        """
+        indexes = range(len(self)) if include_normal else self.flagged
+        trends, severities = self.trends(), self.severities()
+        records = []
+        for index in indexes:
+            previous = self.previous[index]
+            change = self.change_percentage[index]
+            severity = severities[index]
+            records.append({
+                "metric_name": self.labels[index],
+                "current_value": float(self.current[index]),
+                "previous_value": None if np.isnan(previous) else float(previous),
+                "change_percentage": None if np.isnan(change) else float(change),
+                "trend": trends[index],
+                "severity": severity,
+                "recommendation": RECOMMENDATIONS[self.names[index]] if severity != "normal" else None,
+            })
+        return records
+
+
+def analyze_metrics_batch(
+    names: ArrayLike,
+    current: ArrayLike,
+    previous: Optional[ArrayLike] = None,
+    labels: Optional[ArrayLike] = None
+) -> MetricBatch:
+    """
+    Compute change, trend and severity for many metrics in one pass.
+
+    Applies the same rules as ``tools.analyze_metrics``: no change is
+    computed when the previous value is missing or zero, changes beyond
+    +/-5% are trends, and the bounce rate, conversion rate and sessions
+    thresholds set the severity. Rates are expected in percent; GA
+    payloads report some as fractions (see ``FRACTION_METRICS``).
+
+    Args:
+        names: Metric name per row, e.g. "sessions" or "bounce_rate"
+        current: Current value per row
+        previous: Previous value per row; None or NaN where unknown
+        labels: Display name per row (e.g. "/pricing sessions"); defaults to ``names``
+
+    Returns:
+        MetricBatch with per-row results
+    """
+    names = np.asarray(names, dtype=object)
+    current = np.asarray(current, dtype=float)
+    if previous is None:
+        previous = np.full(current.shape, np.nan)
+    elif isinstance(previous, np.ndarray):
+        previous = previous.astype(float)
+    else:
+        previous = np.array([np.nan if value is None else value for value in previous], dtype=float)
+    if not (len(names) == len(current) == len(previous)):
+        raise ValueError("names, current and previous must have the same length")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        comparable = ~np.isnan(previous) & (previous != 0)
+        change = np.where(comparable, (current - previous) / np.where(comparable, previous, 1) * 100, np.nan)
+
+    trend = np.zeros(len(names), dtype=np.int8)
+    trend[change > TREND_THRESHOLD] = 1
+    trend[change < -TREND_THRESHOLD] = 2
+
+    severity = np.select(
+        [
+            (names == "bounce_rate") & (current > BOUNCE_RATE_LIMIT),
+            (names == "conversion_rate") & (change < CONVERSION_DROP_LIMIT),
+            (names == "sessions") & (change < SESSIONS_DROP_LIMIT),
+        ],
+        [1, 2, 1],
+        default=0
+    ).astype(np.int8)
+
+    return MetricBatch(
+        names=names,
+        labels=names if labels is None else np.asarray(labels, dtype=object),
+        current=current,
+        previous=previous,
+        change_percentage=change,
+        trend=trend,
+        severity=severity,
+    )
+
+
+def metrics_to_columns(metrics: Dict[str, Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """
+    Convert the ``analyze_metrics`` dict input to batch columns.
+
+    Args:
+        metrics: Mapping of metric name to {"value", "previous_value"}
+
+    Returns:
+        Dict with ``names``, ``current`` and ``previous`` lists
+    """
+    return {
+        "names": list(metrics),
+        "current": [data.get("value", 0) for data in metrics.values()],
+        "previous": [data.get("previous_value") for data in metrics.values()],
+    }
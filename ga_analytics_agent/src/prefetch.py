@@ -0,0 +1,139 @@
+"""Speculative prefetch of the GA reports a question is likely to need."""
+
+import asyncio
+import logging
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from .concurrency import PRIORITY_BACKGROUND
+from .intent_router import find_period
+from .settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Words suggesting the agent will fetch each endpoint, in prefetch order
+ENDPOINT_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "/api/summary": (
+        "overview", "summary", "overall", "performance", "sessions", "users",
+        "visitors", "bounce", "engagement", "pageviews", "how did", "how is",
+        "how are", "doing",
+    ),
+    "/api/pages": ("page", "content", "landing", "url", "blog", "article", "post"),
+    "/api/traffic": (
+        "traffic", "source", "channel", "referral", "referrer", "organic",
+        "social", "campaign", "search", "direct",
+    ),
+    "/api/devices": ("device", "mobile", "desktop", "tablet", "browser", "phone"),
+}
+
+# Endpoints prefetched when a question names none, e.g. open-ended reviews
+DEFAULT_ENDPOINTS = ("/api/summary",)
+
+# Default date range of the fetch_analytics_data tool
+DEFAULT_PREFETCH_RANGE = "last7days"
+
+# Keywords match at the start of a word, so "page" also matches "pages"
+_KEYWORD_PATTERNS = {
+    endpoint: re.compile(r"\b(?:" + "|".join(map(re.escape, keywords)) + ")")
+    for endpoint, keywords in ENDPOINT_KEYWORDS.items()
+}
+
+
+@dataclass(frozen=True)
+class PrefetchPlan:
+    """Endpoints and date range a question is expected to read."""
+    endpoints: Tuple[str, ...]
+    date_range: str
+
+    def requests(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Endpoint and parameters of each request, as the fetch tool builds them."""
+        return [(endpoint, {"dateRange": self.date_range}) for endpoint in self.endpoints]
+
+
+def classify_query(query: str, max_endpoints: Optional[int] = None) -> PrefetchPlan:
+    """
+    Guess which GA endpoints and date range a question will need.
+
+    Args:
+        query: User's question
+        max_endpoints: Most endpoints to return; defaults to
+            ``prefetch_max_endpoints``
+
+    Returns:
+        PrefetchPlan; endpoints is empty when ``max_endpoints`` is 0
+    """
+    if max_endpoints is None:
+        max_endpoints = settings.prefetch_max_endpoints
+    text = query.lower()
+    endpoints = tuple(
+        endpoint for endpoint, pattern in _KEYWORD_PATTERNS.items() if pattern.search(text)
+    ) or DEFAULT_ENDPOINTS
+    return PrefetchPlan(
+        endpoints=endpoints[:max(max_endpoints, 0)],
+        date_range=find_period(query) or DEFAULT_PREFETCH_RANGE,
+    )
+
+
+@dataclass
+class Prefetch:
+    """Fetches started for a plan while the model decides on its tool calls."""
+    plan: PrefetchPlan
+    tasks: List["asyncio.Task[Any]"] = field(default_factory=list)
+
+    def cancel(self):
+        """Stop waiting for unfinished fetches; shared in-flight requests still complete."""
+        for task in self.tasks:
+            if not task.done():
+                task.cancel()
+
+
+def start_prefetch(deps: Any, query: str, max_endpoints: Optional[int] = None) -> Prefetch:
+    """
+    Start fetching the reports a question is likely to need, without waiting.
+
+    Requests go through the dependencies at background priority. When the
+    agent's tool asks for the same report it joins the in-flight request
+    (promoting it to interactive priority) or reads the cached response,
+    so GA latency overlaps with the first model call.
+
+    Args:
+        deps: GAAnalyticsDependencies used for the requests
+        query: User's question
+        max_endpoints: Most endpoints to prefetch; defaults to
+            ``prefetch_max_endpoints``
+
+    Returns:
+        Prefetch holding the started tasks
+    """
+    plan = classify_query(query, max_endpoints)
+    prefetch = Prefetch(plan)
+    for endpoint, params in plan.requests():
+        prefetch.tasks.append(asyncio.ensure_future(_prefetch_one(deps, endpoint, params)))
+    return prefetch
+
+
+@contextmanager
+def speculative_prefetch(deps: Any, query: str) -> Iterator[Prefetch]:
+    """
+    Prefetch for a question for the duration of an agent run.
+
+    Enter this before ``record_data_reads`` so that prefetched reports are
+    only recorded when a tool actually uses them.
+    """
+    prefetch = start_prefetch(deps, query)
+    try:
+        yield prefetch
+    finally:
+        prefetch.cancel()
+
+
+async def _prefetch_one(deps: Any, endpoint: str, params: Dict[str, Any]):
+    try:
+        await deps.fetch_ga_data(endpoint, params, priority=PRIORITY_BACKGROUND)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        # A wrong guess or failure only costs the speculation; the tool retries
+        logger.debug("Prefetch of %s failed: %s", endpoint, e)
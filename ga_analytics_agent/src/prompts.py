@@ -54,6 +54,7 @@ PROACTIVE_INSIGHTS_PROMPT = """You are in proactive monitoring mode. Continuousl
 3. Trend Alerts: Emerging patterns requiring attention
 
 Alert Triggers:
+- Days flagged by find_traffic_anomalies (deviations from the weekday baseline)
 - Traffic drops >20% week-over-week
 - Conversion rate changes >15%
 - New high-performing content opportunities
@@ -75,6 +76,26 @@ Always include appropriate charts or tables to support your analysis.
 Generate visualizations that clearly communicate the key insight."""
 
 
+# Instructions added to the system prompt for each operation mode
+MODE_PROMPTS = {
+    "proactive": PROACTIVE_INSIGHTS_PROMPT,
+    "conversational": CONVERSATIONAL_PROMPT,
+}
+
+
+async def get_mode_instructions(ctx: RunContext[GAAnalyticsDependencies]) -> str:
+    """
+    Get the instructions for the run's operation mode.
+    
+    Args:
+        ctx: Runtime context with dependencies
+        
+    Returns:
+        Mode prompt, or an empty string in the default mode
+    """
+    return MODE_PROMPTS.get(ctx.deps.mode, "")
+
+
 async def get_marketing_context(ctx: RunContext[GAAnalyticsDependencies]) -> str:
     """
     Generate context-aware instructions for marketing focus areas.
@@ -82,23 +103,36 @@ async def get_marketing_context(ctx: RunContext[GAAnalyticsDependencies]) -> str
     Args:
         ctx: Runtime context with dependencies
         
+    Returns:
+        Marketing context string for dynamic prompting
+    """
+    return build_marketing_context(ctx.deps)
+
+
+def build_marketing_context(deps: GAAnalyticsDependencies) -> str:
+    """
+    Build the marketing context string from dependencies, outside an agent run.
+    
+    Args:
+        deps: Agent dependencies
+        
     Returns:
         Marketing context string for dynamic prompting
     """
     context_parts = []
     
     # Time period context
-    if ctx.deps.date_range:
-        context_parts.append(f"Analyzing data for: {ctx.deps.date_range}")
+    if deps.date_range:
+        context_parts.append(f"Analyzing data for: {deps.date_range}")
     
     # Marketing campaign context
-    if ctx.deps.active_campaigns:
-        campaigns = ", ".join(ctx.deps.active_campaigns)
+    if deps.active_campaigns:
+        campaigns = ", ".join(deps.active_campaigns)
         context_parts.append(f"Active campaigns: {campaigns}")
     
     # Priority metrics context
-    if ctx.deps.focus_metrics:
-        metrics = ", ".join(ctx.deps.focus_metrics)
+    if deps.focus_metrics:
+        metrics = ", ".join(deps.focus_metrics)
         context_parts.append(f"Priority metrics: {metrics}")
     
     return " ".join(context_parts) if context_parts else "Focus on overall marketing performance trends."
@@ -114,9 +148,4 @@ def get_prompt_for_mode(mode: str) -> str:
     Returns:
         Appropriate system prompt
     """
-    prompts = {
-        "proactive": PROACTIVE_INSIGHTS_PROMPT,
-        "conversational": CONVERSATIONAL_PROMPT,
-        "default": SYSTEM_PROMPT
-    }
-    return prompts.get(mode, SYSTEM_PROMPT)
\ No newline at end of file
+    return MODE_PROMPTS.get(mode, SYSTEM_PROMPT)
\ No newline at end of file
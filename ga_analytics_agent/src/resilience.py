@@ -0,0 +1,390 @@
+"""Failure handling for GA MCP server requests: error classification, retries and circuit breaking."""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+import httpx
+from .settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class GAFetchError(ValueError):
+    """
+    GA MCP server request failure with enough detail to classify it.
+
+    Subclasses ValueError so existing callers that catch ValueError keep
+    working.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        endpoint: Optional[str] = None,
+        kind: str = "error",
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None
+    ):
+        super().__init__(message)
+        self.endpoint = endpoint
+        self.kind = kind  # "timeout", "connection", "http", "circuit_open" or "error"
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        """Whether retrying the same request could succeed."""
+        if self.kind in ("timeout", "connection"):
+            return True
+        if self.kind == "http" and self.status_code is not None:
+            return self.status_code == 429 or self.status_code >= 500
+        return False
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header given in seconds or as an HTTP date.
+
+    Returns:
+        Seconds to wait, or None if the header is missing or invalid
+    """
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Classify an exception as transient.
+
+    Timeouts, connection errors, HTTP 429 and 5xx responses are retryable;
+    validation errors and other 4xx responses are not.
+    """
+    if isinstance(error, GAFetchError):
+        return error.retryable
+    if isinstance(error, (httpx.TimeoutException, httpx.TransportError, asyncio.TimeoutError)):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return False
+
+
+def retry_after_of(error: BaseException) -> Optional[float]:
+    """Get the server-requested retry delay carried by an error, if any."""
+    if isinstance(error, GAFetchError):
+        return error.retry_after
+    if isinstance(error, httpx.HTTPStatusError):
+        return parse_retry_after(error.response.headers.get("Retry-After"))
+    return None
+
+
+@dataclass
+class RetryBudget:
+    """Total time a single query may spend backing off between retries."""
+
+    max_seconds: float = field(default_factory=lambda: settings.retry_budget_seconds)
+    spent: float = field(default=0.0, init=False)
+
+    @property
+    def remaining(self) -> float:
+        """Seconds of backoff still available."""
+        return max(0.0, self.max_seconds - self.spent)
+
+    def consume(self, delay: float) -> bool:
+        """
+        Reserve ``delay`` seconds of backoff.
+
+        Returns:
+            False if the delay does not fit in the remaining budget
+        """
+        if delay > self.remaining:
+            return False
+        self.spent += delay
+        return True
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Capped exponential backoff with full jitter.
+
+    Only transient failures are retried. A server-provided Retry-After
+    is honoured as a minimum delay, and every delay is charged against
+    the query's ``RetryBudget``.
+    """
+
+    max_retries: int = field(default_factory=lambda: settings.max_retries)
+    base_delay: float = field(default_factory=lambda: settings.retry_base_delay)
+    max_delay: float = field(default_factory=lambda: settings.retry_max_delay)
+    random: Callable[[], float] = field(default=random.random, repr=False)
+    sleep: Callable[[float], Awaitable[Any]] = field(default=asyncio.sleep, repr=False)
+
+    def backoff(self, retry: int) -> float:
+        """Jittered delay before retry number ``retry`` (0-based)."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** retry))
+        return ceiling * self.random()
+
+    def delay_for(self, retry: int, error: BaseException) -> float:
+        """Delay before retrying after ``error``, honouring Retry-After."""
+        delay = self.backoff(retry)
+        retry_after = retry_after_of(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    async def run(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        budget: Optional[RetryBudget] = None
+    ) -> Any:
+        """
+        Call ``fn`` until it succeeds or retrying is pointless.
+
+        Args:
+            fn: Zero-argument coroutine function performing the request
+            budget: Optional per-query backoff budget
+
+        Returns:
+            Result of the first successful call
+
+        Raises:
+            The original error if it is not retryable, otherwise a
+            GAFetchError once retries or the budget are exhausted
+        """
+        attempts = 0
+        started = time.monotonic()
+        while True:
+            attempts += 1
+            try:
+                return await fn()
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+
+                retry = attempts - 1
+                if retry >= self.max_retries:
+                    raise _exhausted(e, attempts, started) from e
+
+                delay = self.delay_for(retry, e)
+                if budget is not None and not budget.consume(delay):
+                    raise _exhausted(e, attempts, started, budget_exhausted=True) from e
+
+                await self.sleep(delay)
+
+
+def _exhausted(
+    error: BaseException,
+    attempts: int,
+    started: float,
+    budget_exhausted: bool = False
+) -> GAFetchError:
+    reason = " (retry budget exhausted)" if budget_exhausted else ""
+    elapsed = time.monotonic() - started
+    return GAFetchError(
+        f"Failed to fetch GA data after {attempts} attempts in {elapsed:.1f}s{reason}: {error}",
+        endpoint=getattr(error, "endpoint", None),
+        kind=getattr(error, "kind", "error"),
+        status_code=getattr(error, "status_code", None),
+        retry_after=retry_after_of(error)
+    )
+
+
+class CircuitOpenError(GAFetchError):
+    """Raised without contacting the MCP server while the circuit is open."""
+
+    def __init__(self, message: str, endpoint: Optional[str] = None, retry_after: Optional[float] = None):
+        super().__init__(message, endpoint=endpoint, kind="circuit_open", retry_after=retry_after)
+
+
+# Circuit breaker states
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+@dataclass
+class CircuitBreaker:
+    """
+    Circuit breaker driven by rolling error rate and latency.
+
+    Outcomes are kept for ``window_seconds``. Once at least
+    ``minimum_calls`` were seen, the circuit opens when the failure rate
+    or the share of calls slower than ``slow_call_seconds`` reaches its
+    threshold. While open, requests fail fast. After ``open_seconds`` the
+    circuit goes half-open and lets ``half_open_max_calls`` probes
+    through: a successful probe closes it, a failed one reopens it.
+
+    Only transient failures (see ``is_retryable``) count as failures; a
+    4xx response means the server is healthy.
+    """
+
+    name: str = "ga-mcp"
+    failure_rate_threshold: float = field(default_factory=lambda: settings.circuit_failure_rate)
+    slow_call_seconds: float = field(default_factory=lambda: settings.circuit_slow_call_seconds)
+    slow_call_rate_threshold: float = field(default_factory=lambda: settings.circuit_slow_call_rate)
+    window_seconds: float = field(default_factory=lambda: settings.circuit_window_seconds)
+    minimum_calls: int = field(default_factory=lambda: settings.circuit_minimum_calls)
+    open_seconds: float = field(default_factory=lambda: settings.circuit_open_seconds)
+    half_open_max_calls: int = 1
+    clock: Callable[[], float] = field(default=time.monotonic, repr=False)
+
+    state: str = field(default=CIRCUIT_CLOSED, init=False)
+    transitions: Deque[Dict[str, Any]] = field(
+        default_factory=lambda: deque(maxlen=50), init=False, repr=False
+    )
+    rejected: int = field(default=0, init=False)
+    _outcomes: Deque[Tuple[float, bool, bool]] = field(default_factory=deque, init=False, repr=False)
+    _opened_at: float = field(default=0.0, init=False, repr=False)
+    _half_open_calls: int = field(default=0, init=False, repr=False)
+    _listeners: List[Callable[[str, str, str, str], Any]] = field(
+        default_factory=list, init=False, repr=False
+    )
+
+    def add_listener(self, listener: Callable[[str, str, str, str], Any]):
+        """Register ``listener(name, old_state, new_state, reason)`` for state changes."""
+        self._listeners.append(listener)
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a probe through."""
+        if self.state != CIRCUIT_OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.open_seconds - self.clock())
+
+    def allow_request(self) -> bool:
+        """
+        Decide whether a request may reach the MCP server.
+
+        Returns:
+            False if the request should fail fast
+        """
+        if self.state == CIRCUIT_OPEN:
+            if self.retry_after > 0:
+                self.rejected += 1
+                return False
+            self._transition(CIRCUIT_HALF_OPEN, "open timeout elapsed")
+
+        if self.state == CIRCUIT_HALF_OPEN:
+            if self._half_open_calls >= self.half_open_max_calls:
+                self.rejected += 1
+                return False
+            self._half_open_calls += 1
+
+        return True
+
+    def record_success(self, latency: float):
+        """Record a completed request and its latency in seconds."""
+        slow = latency >= self.slow_call_seconds
+        if self.state == CIRCUIT_HALF_OPEN:
+            if slow:
+                self._transition(CIRCUIT_OPEN, f"slow probe ({latency:.1f}s)")
+            else:
+                self._transition(CIRCUIT_CLOSED, "probe succeeded")
+            return
+        self._record(False, slow)
+
+    def record_failure(self, latency: float):
+        """Record a transient failure and its latency in seconds."""
+        if self.state == CIRCUIT_HALF_OPEN:
+            self._transition(CIRCUIT_OPEN, "probe failed")
+            return
+        self._record(True, latency >= self.slow_call_seconds)
+
+    def release(self):
+        """Return an admitted request's slot without an outcome, e.g. on cancellation."""
+        if self.state == CIRCUIT_HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def stats_snapshot(self) -> Dict[str, Any]:
+        """Get breaker state and rolling-window rates for monitoring."""
+        calls, failure_rate, slow_rate = self._rates()
+        return {
+            "name": self.name,
+            "state": self.state,
+            "calls_in_window": calls,
+            "failure_rate": round(failure_rate, 4),
+            "slow_call_rate": round(slow_rate, 4),
+            "rejected": self.rejected,
+            "retry_after": round(self.retry_after, 3),
+            "transitions": list(self.transitions),
+        }
+
+    def _record(self, failed: bool, slow: bool):
+        self._outcomes.append((self.clock(), failed, slow))
+        calls, failure_rate, slow_rate = self._rates()
+        if self.state != CIRCUIT_CLOSED or calls < self.minimum_calls:
+            return
+        if failure_rate >= self.failure_rate_threshold:
+            self._transition(CIRCUIT_OPEN, f"failure rate {failure_rate:.0%} over {calls} calls")
+        elif slow_rate >= self.slow_call_rate_threshold:
+            self._transition(CIRCUIT_OPEN, f"slow call rate {slow_rate:.0%} over {calls} calls")
+
+    def _rates(self) -> Tuple[int, float, float]:
+        cutoff = self.clock() - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+        calls = len(self._outcomes)
+        if not calls:
+            return 0, 0.0, 0.0
+        failures = sum(1 for _, failed, _ in self._outcomes if failed)
+        slow = sum(1 for _, _, is_slow in self._outcomes if is_slow)
+        return calls, failures / calls, slow / calls
+
+    def _transition(self, new_state: str, reason: str):
+        old_state, self.state = self.state, new_state
+        if new_state == CIRCUIT_OPEN:
+            self._opened_at = self.clock()
+        if new_state == CIRCUIT_HALF_OPEN:
+            self._half_open_calls = 0
+        if new_state == CIRCUIT_CLOSED:
+            self._outcomes.clear()
+
+        self.transitions.append({
+            "at": datetime.now(timezone.utc).isoformat(),
+            "from": old_state,
+            "to": new_state,
+            "reason": reason,
+        })
+        logger.warning("Circuit %s: %s -> %s (%s)", self.name, old_state, new_state, reason)
+        for listener in self._listeners:
+            try:
+                listener(self.name, old_state, new_state, reason)
+            except Exception:
+                logger.exception("Circuit breaker listener failed")
+
+
+# Breakers keyed by GA MCP server URL
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(server_url: str) -> Optional[CircuitBreaker]:
+    """
+    Get the breaker shared by every dependencies instance for a server.
+
+    Returns:
+        CircuitBreaker, or None when circuit breaking is disabled
+    """
+    if not settings.circuit_breaker_enabled:
+        return None
+    if server_url not in _circuit_breakers:
+        _circuit_breakers[server_url] = CircuitBreaker(name=server_url)
+    return _circuit_breakers[server_url]
@@ -0,0 +1,297 @@
+"""Weekly and monthly rollups of the daily snapshot history."""
+
+import json
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .date_ranges import DateWindow
+from .history import SNAPSHOT_REPORTS, HistoryStore, aggregate_rows
+from .settings import settings
+
+
+# Rollup levels, coarsest first
+ROLLUP_LEVELS = ("month", "week")
+
+_ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    property_id TEXT NOT NULL,
+    report TEXT NOT NULL,
+    level TEXT NOT NULL,
+    period_start TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    metrics TEXT NOT NULL,
+    days INTEGER NOT NULL,
+    PRIMARY KEY (property_id, report, level, period_start, dimension)
+) WITHOUT ROWID;
+"""
+
+
+def bucket_for(day: date, level: str) -> DateWindow:
+    """
+    Get the week (Monday to Sunday) or calendar month containing a day.
+
+    Args:
+        day: Any day
+        level: "week" or "month"
+
+    Returns:
+        DateWindow of the bucket
+    """
+    if level == "week":
+        start = day - timedelta(days=day.weekday())
+        return DateWindow(start, start + timedelta(days=6))
+    if level == "month":
+        start = day.replace(day=1)
+        next_month = (start + timedelta(days=32)).replace(day=1)
+        return DateWindow(start, next_month - timedelta(days=1))
+    raise ValueError(f"Unknown rollup level: {level}. Must be one of {ROLLUP_LEVELS}")
+
+
+def decompose(window: DateWindow, levels: Tuple[str, ...] = ROLLUP_LEVELS) -> List[Tuple[str, DateWindow]]:
+    """
+    Cover a window with the fewest buckets, coarsest level first.
+
+    Full months are used where they fit, then full weeks, then single
+    days at the edges.
+
+    Returns:
+        (level, bucket) pairs in date order; level is "day" for single days
+    """
+    if not levels:
+        return [
+            ("day", DateWindow(window.start + timedelta(days=offset), window.start + timedelta(days=offset)))
+            for offset in range(window.days)
+        ]
+
+    level, finer = levels[0], levels[1:]
+    pieces: List[Tuple[str, DateWindow]] = []
+    cursor = window.start
+    pending_start: Optional[date] = None
+    while cursor <= window.end:
+        bucket = bucket_for(cursor, level)
+        if bucket.start == cursor and bucket.end <= window.end:
+            if pending_start is not None:
+                pieces.extend(decompose(DateWindow(pending_start, cursor - timedelta(days=1)), finer))
+                pending_start = None
+            pieces.append((level, bucket))
+            cursor = bucket.end + timedelta(days=1)
+        else:
+            if pending_start is None:
+                pending_start = cursor
+            cursor = min(bucket.end, window.end) + timedelta(days=1)
+    if pending_start is not None:
+        pieces.extend(decompose(DateWindow(pending_start, window.end), finer))
+    return pieces
+
+
+@dataclass
+class RollupStore(HistoryStore):
+    """
+    History store that maintains weekly and monthly aggregates.
+
+    Each recorded day refreshes only the week and month buckets containing
+    it, so rollups stay current without rescanning history. Long-range
+    aggregates are served from complete month and week buckets, reading
+    daily rows only for partial edges and incomplete buckets.
+    """
+
+    async def record(self, report: str, day: date, payload: Dict[str, Any], fetched_on: Optional[date] = None) -> int:
+        """Store a day's snapshot and refresh the rollups containing it."""
+        stored = await super().record(report, day, payload, fetched_on)
+        await self.refresh_rollups(report, [day])
+        return stored
+
+    async def refresh_rollups(self, report: str, days: Iterable[date]):
+        """
+        Recompute the week and month buckets containing the given days.
+
+        Args:
+            report: Key of ``SNAPSHOT_REPORTS``
+            days: Days whose snapshots changed
+        """
+        buckets = {(level, bucket_for(day, level)) for day in days for level in ROLLUP_LEVELS}
+        weight = SNAPSHOT_REPORTS[report].weight
+        for level, bucket in sorted(buckets, key=lambda item: (item[0], item[1].start)):
+            rows = await self.rows(report, bucket)
+            by_dimension: Dict[str, List[Dict[str, Any]]] = {}
+            for row in rows:
+                by_dimension.setdefault(row["dimension"], []).append(row)
+            recorded_days = len({row["day"] for row in rows})
+            values = [
+                (self.property_id, report, level, bucket.start.isoformat(), dimension,
+                 json.dumps(aggregate_rows(dimension_rows, weight)), recorded_days)
+                for dimension, dimension_rows in by_dimension.items()
+            ]
+            await self._run(
+                lambda connection, level=level, bucket=bucket, values=values: self._write_bucket(
+                    connection, report, level, bucket, values
+                ),
+                commit=True
+            )
+
+    async def rebuild_rollups(self, report: str, window: DateWindow):
+        """Recompute every bucket overlapping a window, e.g. after a bulk import."""
+        await self.refresh_rollups(
+            report,
+            [window.start + timedelta(days=offset) for offset in range(window.days)]
+        )
+
+    async def rollup_rows(
+        self,
+        report: str,
+        level: str,
+        window: DateWindow,
+        dimension: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Read stored buckets starting within a window.
+
+        Returns:
+            Rows with ``period_start``, ``days``, ``dimension`` and metrics
+        """
+        query = (
+            "SELECT period_start, dimension, metrics, days FROM rollups "
+            "WHERE property_id = ? AND report = ? AND level = ? AND period_start BETWEEN ? AND ?"
+        )
+        args: List[Any] = [self.property_id, report, level, window.start.isoformat(), window.end.isoformat()]
+        if dimension is not None:
+            query += " AND dimension = ?"
+            args.append(dimension)
+        query += " ORDER BY period_start, dimension"
+
+        records = await self._run(lambda connection: connection.execute(query, args).fetchall())
+        return [
+            {"period_start": start, "days": days, "dimension": dim, **json.loads(metrics)}
+            for start, dim, metrics, days in records
+        ]
+
+    async def aggregate(
+        self,
+        report: str,
+        window: DateWindow,
+        dimension: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Aggregate a period per dimension value from the coarsest complete buckets.
+
+        Returns:
+            Mapping of dimension key to combined metrics
+        """
+        parts = await self._covering_rows(report, window, dimension)
+        weight = SNAPSHOT_REPORTS[report].weight
+        by_dimension: Dict[str, List[Dict[str, Any]]] = {}
+        for row in parts:
+            by_dimension.setdefault(row["dimension"], []).append(row)
+        return {key: aggregate_rows(rows, weight) for key, rows in by_dimension.items()}
+
+    async def bucketed(
+        self,
+        report: str,
+        window: DateWindow,
+        level: str = "month",
+        dimension: str = ""
+    ) -> List[Dict[str, Any]]:
+        """
+        Aggregate a window per week or month for coarse-grained trends.
+
+        Edge buckets only partly inside the window are aggregated from
+        their daily rows within the window.
+
+        Returns:
+            One row per bucket with ``period_start``, ``days`` and metrics
+        """
+        weight = SNAPSHOT_REPORTS[report].weight
+        stored = {
+            row["period_start"]: row
+            for row in await self.rollup_rows(report, level, window, dimension)
+        }
+        results = []
+        cursor = bucket_for(window.start, level)
+        while cursor.start <= window.end:
+            inside = DateWindow(max(cursor.start, window.start), min(cursor.end, window.end))
+            row = stored.get(cursor.start.isoformat())
+            if row is not None and inside == cursor and row["days"] == cursor.days:
+                results.append(row)
+            else:
+                days = await self.rows(report, inside, dimension)
+                if days:
+                    results.append({
+                        "period_start": cursor.start.isoformat(),
+                        "days": len({day["day"] for day in days}),
+                        "dimension": dimension,
+                        **aggregate_rows(days, weight),
+                    })
+            cursor = bucket_for(cursor.end + timedelta(days=1), level)
+        return results
+
+    async def _covering_rows(
+        self,
+        report: str,
+        window: DateWindow,
+        dimension: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """Rollup rows for complete buckets plus daily rows for everything else."""
+        pieces = decompose(window)
+        rows: List[Dict[str, Any]] = []
+        daily: List[DateWindow] = []
+        for level in ROLLUP_LEVELS:
+            buckets = [bucket for piece_level, bucket in pieces if piece_level == level]
+            if not buckets:
+                continue
+            span = DateWindow(buckets[0].start, buckets[-1].start)
+            by_start: Dict[str, List[Dict[str, Any]]] = {}
+            for row in await self.rollup_rows(report, level, span, dimension):
+                by_start.setdefault(row["period_start"], []).append(row)
+            for bucket in buckets:
+                bucket_rows = by_start.get(bucket.start.isoformat(), [])
+                if bucket_rows and bucket_rows[0]["days"] == bucket.days:
+                    rows.extend(
+                        {key: value for key, value in row.items() if key != "days"}
+                        for row in bucket_rows
+                    )
+                else:
+                    daily.append(bucket)
+        daily.extend(bucket for level, bucket in pieces if level == "day")
+
+        for span in _merge_adjacent(daily):
+            rows.extend(await self.rows(report, span, dimension))
+        return rows
+
+    def _schema(self) -> str:
+        return super()._schema() + _ROLLUP_SCHEMA
+
+    def _write_bucket(self, connection, report: str, level: str, bucket: DateWindow, values: List[Tuple]):
+        connection.execute(
+            "DELETE FROM rollups WHERE property_id = ? AND report = ? AND level = ? AND period_start = ?",
+            (self.property_id, report, level, bucket.start.isoformat())
+        )
+        connection.executemany("INSERT INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?)", values)
+
+
+def _merge_adjacent(windows: List[DateWindow]) -> List[DateWindow]:
+    merged: List[DateWindow] = []
+    for window in sorted(windows, key=lambda item: item.start):
+        if merged and window.start <= merged[-1].end + timedelta(days=1):
+            merged[-1] = DateWindow(merged[-1].start, max(merged[-1].end, window.end))
+        else:
+            merged.append(window)
+    return merged
+
+
+# Process-wide stores keyed by database path
+_rollup_stores: Dict[str, RollupStore] = {}
+
+
+def get_history_store(path: Optional[str] = None) -> Optional[RollupStore]:
+    """
+    Get the shared history store, with rollups, for a database path.
+
+    Returns:
+        RollupStore, or None when no history database is configured
+    """
+    path = path or settings.history_db_path
+    if not path:
+        return None
+    if path not in _rollup_stores:
+        _rollup_stores[path] = RollupStore(path=path)
+    return _rollup_stores[path]
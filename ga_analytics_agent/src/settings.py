@@ -32,6 +32,11 @@ class GAAnalyticsSettings(BaseSettings):
     )
     ga_mcp_timeout: int = Field(default=30, description="Request timeout in seconds")
     
+    dashboard_section_timeout: float = Field(
+        default=10.0,
+        description="Deadline in seconds for each dashboard section fetch"
+    )
+    
     # Chart Generation Settings
     chart_width: int = Field(default=800, description="Default chart width")
     chart_height: int = Field(default=600, description="Default chart height")
@@ -43,13 +48,98 @@ class GAAnalyticsSettings(BaseSettings):
     debug: bool = Field(default=False, description="Debug mode")
     max_retries: int = Field(default=3, description="Maximum API retry attempts")
     timeout_seconds: int = Field(default=30, description="Default timeout")
+    retry_base_delay: float = Field(default=0.5, description="Initial retry backoff in seconds")
+    retry_max_delay: float = Field(default=8.0, description="Maximum retry backoff in seconds")
+    retry_budget_seconds: float = Field(
+        default=15.0,
+        description="Total retry backoff allowed per query in seconds"
+    )
+    
+    # Circuit Breaker
+    circuit_breaker_enabled: bool = Field(default=True, description="Fail fast when the MCP server is unhealthy")
+    circuit_failure_rate: float = Field(default=0.5, description="Failure rate that opens the circuit")
+    circuit_slow_call_seconds: float = Field(default=10.0, description="Latency counted as a slow call")
+    circuit_slow_call_rate: float = Field(default=0.8, description="Slow call rate that opens the circuit")
+    circuit_window_seconds: float = Field(default=60.0, description="Rolling window for error and latency rates")
+    circuit_minimum_calls: int = Field(default=5, description="Calls needed in the window before tripping")
+    circuit_open_seconds: float = Field(default=30.0, description="Seconds open before a half-open probe")
+    
+    # HTTP Connection Pool
+    http_max_connections: int = Field(default=20, description="Maximum pooled connections")
+    http_max_keepalive_connections: int = Field(
+        default=10,
+        description="Maximum idle keep-alive connections"
+    )
+    http_keepalive_expiry: float = Field(
+        default=30.0,
+        description="Seconds an idle keep-alive connection is kept open"
+    )
+    http2_enabled: bool = Field(default=False, description="Use HTTP/2 when h2 is installed")
     
     # Optional Caching and Rate Limiting
     redis_url: Optional[str] = Field(None, description="Redis URL for caching")
+    redis_key_prefix: str = Field(default="ga-agent:", description="Prefix for Redis cache keys")
+    redis_timeout: float = Field(default=0.5, description="Redis socket timeout in seconds")
+    redis_retry_interval: float = Field(
+        default=30.0,
+        description="Seconds to skip Redis after a connection failure"
+    )
     cache_ttl: int = Field(default=300, description="Cache TTL in seconds")
+    cache_max_staleness: int = Field(
+        default=3600,
+        description="Seconds an expired response is kept for stale serving"
+    )
+    cache_realtime_ttl: int = Field(default=15, description="Cache TTL in seconds for realtime data")
+    cache_recent_ttl: int = Field(
+        default=3600,
+        description="Cache TTL in seconds for past ranges GA may still be revising"
+    )
+    cache_historical_ttl: int = Field(
+        default=604800,
+        description="Cache TTL in seconds for settled historical ranges"
+    )
+    ga_data_settle_days: int = Field(
+        default=3,
+        description="Days after which GA stops revising a day's data"
+    )
+    cache_stale_while_revalidate: int = Field(
+        default=600,
+        description="Seconds past expiry a dashboard response is served while refreshing; 0 disables"
+    )
+    cache_max_entries: int = Field(default=512, description="Maximum cached GA responses")
+    cache_max_bytes: int = Field(
+        default=32 * 1024 * 1024,
+        description="Maximum total size of cached GA responses in bytes"
+    )
     api_rate_limit: int = Field(default=100, description="API rate limit per hour")
     api_rate_window: int = Field(default=3600, description="Rate limit window in seconds")
     
+    # Intent Router
+    intent_router_enabled: bool = Field(
+        default=True,
+        description="Answer simple metric and top-list lookups from GA data without the LLM"
+    )
+    
+    # Prefetch
+    prefetch_max_endpoints: int = Field(
+        default=2,
+        description="GA endpoints fetched speculatively while the model plans its first tool call; 0 disables"
+    )
+    
+    # Answer Cache
+    answer_cache_ttl: int = Field(
+        default=3600,
+        description="Seconds an agent answer is reused for the same question and data; 0 disables"
+    )
+    answer_cache_max_entries: int = Field(default=256, description="Maximum cached agent answers")
+    
+    # Local History
+    history_db_path: Optional[str] = Field(
+        None,
+        description="SQLite file for daily GA snapshots; history is disabled when unset"
+    )
+    ga_property_id: str = Field(default="default", description="GA4 property the history belongs to")
+    
     # Production Deployment
     vercel_url: Optional[str] = Field(None, description="Vercel deployment URL")
     node_env: str = Field(default="development", description="Node environment")
@@ -0,0 +1,364 @@
+"""One-pass, bounded-memory processing of large report row lists."""
+
+import bisect
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+from .history import RATE_METRICS
+from .metric_engine import HIGH_BOUNCE_PAGE_RATE
+
+
+# Threshold checks counted by default: name -> (metric, limit); rows above the limit are hits
+DEFAULT_PAGE_THRESHOLDS: Dict[str, Tuple[str, float]] = {
+    "high_bounce": ("bounceRate", HIGH_BOUNCE_PAGE_RATE),
+}
+
+
+@dataclass
+class TopK:
+    """
+    The ``k`` largest (or smallest) items seen, kept in a bounded heap.
+
+    Each push is O(log k), so ranking n rows costs O(n log k) time and
+    O(k) memory.
+    """
+
+    k: int = 10
+    largest: bool = True
+    _heap: List[Tuple[float, int, Any]] = field(default_factory=list, init=False, repr=False)
+    _sequence: Iterator[int] = field(default_factory=itertools.count, init=False, repr=False)
+
+    def push(self, score: float, item: Any):
+        """Offer an item; it is kept if it ranks among the best ``k``."""
+        if self.k <= 0:
+            return
+        # Min-heap of the kept items; the root is the first to drop
+        entry = (score if self.largest else -score, -next(self._sequence), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> List[Tuple[float, Any]]:
+        """Kept (score, item) pairs, best first; ties keep arrival order."""
+        ranked = sorted(self._heap, key=lambda entry: entry[:2], reverse=True)
+        return [(entry[0] if self.largest else -entry[0], entry[2]) for entry in ranked]
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+@dataclass
+class P2Quantile:
+    """
+    Streaming quantile estimate with the P-squared algorithm.
+
+    Tracks five markers whose heights approximate the minimum, q/2, q,
+    (1+q)/2 quantiles and the maximum, adjusting them with piecewise
+    parabolic interpolation as values arrive. Memory is constant and
+    the first five values give exact results.
+    """
+
+    q: float = 0.5
+    count: int = field(default=0, init=False)
+    _heights: List[float] = field(default_factory=list, init=False, repr=False)
+    _positions: List[int] = field(default_factory=lambda: [0, 1, 2, 3, 4], init=False, repr=False)
+    _desired: List[float] = field(default_factory=list, init=False, repr=False)
+    _increments: List[float] = field(default_factory=list, init=False, repr=False)
+
+    def __post_init__(self):
+        if not 0 < self.q < 1:
+            raise ValueError(f"Quantile must be between 0 and 1, got {self.q}")
+        q = self.q
+        self._desired = [0, 2 * q, 4 * q, 2 + 2 * q, 4]
+        self._increments = [0, q / 2, q, (1 + q) / 2, 1]
+
+    def add(self, value: float):
+        """Fold one value into the estimate."""
+        self.count += 1
+        heights, positions = self._heights, self._positions
+        if len(heights) < 5:
+            bisect.insort(heights, value)
+            return
+
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = bisect.bisect_right(heights, value) - 1
+        for index in range(cell + 1, 5):
+            positions[index] += 1
+        for index in range(5):
+            self._desired[index] += self._increments[index]
+
+        for index in (1, 2, 3):
+            offset = self._desired[index] - positions[index]
+            if (offset >= 1 and positions[index + 1] - positions[index] > 1) or \
+                    (offset <= -1 and positions[index - 1] - positions[index] < -1):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(index, step)
+                if not heights[index - 1] < height < heights[index + 1]:
+                    height = heights[index] + step * (heights[index + step] - heights[index]) / (
+                        positions[index + step] - positions[index]
+                    )
+                heights[index] = height
+                positions[index] += step
+
+    def value(self) -> Optional[float]:
+        """Current estimate, or None before any value."""
+        heights = self._heights
+        if not heights:
+            return None
+        if self.count <= 5:
+            # Exact, interpolated between the closest ranks
+            rank = self.q * (len(heights) - 1)
+            lower = int(rank)
+            upper = min(lower + 1, len(heights) - 1)
+            return heights[lower] + (heights[upper] - heights[lower]) * (rank - lower)
+        return heights[2]
+
+    def _parabolic(self, index: int, step: int) -> float:
+        heights, positions = self._heights, self._positions
+        below = positions[index] - positions[index - 1]
+        above = positions[index + 1] - positions[index]
+        return heights[index] + step / (positions[index + 1] - positions[index - 1]) * (
+            (below + step) * (heights[index + 1] - heights[index]) / above
+            + (above - step) * (heights[index] - heights[index - 1]) / below
+        )
+
+
+@dataclass
+class PageStats:
+    """
+    Counts, totals, threshold hits and top pages from one pass over rows.
+
+    Rows are consumed one at a time from any iterable or async iterable;
+    only the ``top_k`` best rows are retained. Count metrics are summed;
+    rate and average metrics (``RATE_METRICS``) are reported as means
+    weighted by ``weight``, since their sums mean nothing.
+    """
+
+    top_k: int = 10
+    rank_by: str = "views"
+    weight: str = "views"
+    thresholds: Dict[str, Tuple[str, float]] = field(default_factory=lambda: dict(DEFAULT_PAGE_THRESHOLDS))
+
+    count: int = field(default=0, init=False)
+    totals: Dict[str, float] = field(default_factory=dict, init=False)
+    hits: Dict[str, int] = field(default_factory=dict, init=False)
+    _top: TopK = field(init=False, repr=False)
+    _weighted: Dict[str, float] = field(default_factory=dict, init=False, repr=False)
+    _weights: Dict[str, float] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self):
+        self._top = TopK(self.top_k)
+        self.hits = {name: 0 for name in self.thresholds}
+
+    def add(self, row: Dict[str, Any]):
+        """Fold one row into the statistics."""
+        self.count += 1
+        row_weight = row.get(self.weight) or 0
+        for metric, value in row.items():
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            if metric in RATE_METRICS:
+                self._weighted[metric] = self._weighted.get(metric, 0.0) + value * row_weight
+                self._weights[metric] = self._weights.get(metric, 0.0) + row_weight
+            else:
+                self.totals[metric] = self.totals.get(metric, 0) + value
+        for name, (metric, limit) in self.thresholds.items():
+            if (row.get(metric) or 0) > limit:
+                self.hits[name] += 1
+        self._top.push(row.get(self.rank_by) or 0, row)
+
+    def consume(self, rows: Iterable[Dict[str, Any]]) -> "PageStats":
+        """Fold every row of an iterable; returns self for chaining."""
+        for row in rows:
+            self.add(row)
+        return self
+
+    async def aconsume(self, rows: AsyncIterator[Dict[str, Any]]) -> "PageStats":
+        """Fold every row of an async iterator; returns self for chaining."""
+        async for row in rows:
+            self.add(row)
+        return self
+
+    def means(self) -> Dict[str, Optional[float]]:
+        """Weighted mean per rate metric; None when no row had weight."""
+        return {
+            metric: self._weighted[metric] / weight if weight else None
+            for metric, weight in self._weights.items()
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-friendly summary of the pass."""
+        return {
+            "count": self.count,
+            "totals": self.totals,
+            "means": self.means(),
+            "thresholdHits": self.hits,
+            "top": [row for _, row in self._top.items()],
+        }
+
+
+def iter_rows(payload: Optional[Dict[str, Any]], rows_key: str) -> Iterator[Dict[str, Any]]:
+    """Yield the rows of a report payload without copying the list."""
+    yield from (payload or {}).get(rows_key) or ()
+
+
+async def iter_report_rows(
+    deps: Any,
+    endpoint: str = "/api/pages",
+    rows_key: str = "pages",
+    params: Optional[Dict[str, Any]] = None,
+    page_size: int = 1000,
+    max_rows: Optional[int] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream report rows page by page using ``limit``/``offset``.
+
+    The scan itself holds one page of rows at a time, but each page goes
+    through ``deps.fetch_ga_data`` and so also lands in the response
+    cache, which ``cache_max_bytes`` bounds. Pages also pass the rate
+    limiter and circuit breaker.
+
+    Args:
+        deps: GAAnalyticsDependencies used for the requests
+        endpoint: Paginated report endpoint
+        rows_key: Key of the row list in each payload
+        params: Additional report parameters, e.g. ``dateRange``
+        page_size: Rows per request
+        max_rows: Stop after this many rows
+
+    Yields:
+        Report rows in server order
+    """
+    if page_size <= 0:
+        raise ValueError("page_size must be positive")
+    offset = 0
+    while max_rows is None or offset < max_rows:
+        limit = page_size if max_rows is None else min(page_size, max_rows - offset)
+        payload = await deps.fetch_ga_data(endpoint, {**(params or {}), "limit": limit, "offset": offset})
+        count = 0
+        for row in iter_rows(payload, rows_key):
+            count += 1
+            yield row
+        if count < limit:
+            return
+        offset += count
+
+
+@dataclass(frozen=True)
+class RankingReport:
+    """A list report that can be ranked locally."""
+    endpoint: str
+    rows_key: str
+    label: str
+    metrics: Tuple[str, ...]
+    limit: int  # Rows fetched once and ranked locally
+    weight: Optional[str] = None  # Volume metric used to ignore tiny rows in rate rankings
+
+
+# Reports ranked locally by rank_report and RankingSummary.for_report
+RANKING_REPORTS: Dict[str, RankingReport] = {
+    "pages": RankingReport(
+        "/api/pages", "pages", "path", ("views", "users", "avgDuration", "bounceRate"), 1000, weight="views"
+    ),
+    "traffic": RankingReport(
+        "/api/traffic", "sources", "source", ("sessions", "users", "engagedSessions", "engagementRate"), 100,
+        weight="sessions"
+    ),
+    "geography": RankingReport("/api/geography", "countries", "country", ("users", "percentage"), 250),
+}
+
+
+@dataclass
+class RankingSummary:
+    """
+    Top-k, bottom-k and quantiles for several metrics in one pass.
+
+    Answers "top pages", "worst bounce pages" and similar questions from
+    one fetched report in O(n log k) time, keeping only labels and values.
+    Rows whose ``weight`` metric is below ``min_weight`` are left out of
+    rate-metric rankings, so a page with one view and a 100% bounce rate
+    does not top the list.
+    """
+
+    metrics: Tuple[str, ...]
+    label: str = "path"
+    k: int = 5
+    quantiles: Tuple[float, ...] = (0.5, 0.9)
+    weight: Optional[str] = None
+    min_weight: float = 0
+
+    count: int = field(default=0, init=False)
+    _top: Dict[str, TopK] = field(default_factory=dict, init=False, repr=False)
+    _bottom: Dict[str, TopK] = field(default_factory=dict, init=False, repr=False)
+    _quantiles: Dict[str, List[P2Quantile]] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self):
+        for metric in self.metrics:
+            self._top[metric] = TopK(self.k)
+            self._bottom[metric] = TopK(self.k, largest=False)
+            self._quantiles[metric] = [P2Quantile(q) for q in self.quantiles]
+
+    @classmethod
+    def for_report(cls, report: str, **kwargs) -> "RankingSummary":
+        """Summarizer configured for a key of ``RANKING_REPORTS``."""
+        if report not in RANKING_REPORTS:
+            raise ValueError(f"Invalid report: {report}. Must be one of {list(RANKING_REPORTS)}")
+        spec = RANKING_REPORTS[report]
+        kwargs.setdefault("metrics", spec.metrics)
+        return cls(label=spec.label, weight=spec.weight, **kwargs)
+
+    def add(self, row: Dict[str, Any]):
+        """Fold one row into every ranking."""
+        self.count += 1
+        label = row.get(self.label)
+        small = self.weight is not None and (row.get(self.weight) or 0) < self.min_weight
+        for metric in self.metrics:
+            value = row.get(metric)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            for estimator in self._quantiles[metric]:
+                estimator.add(value)
+            if small and metric in RATE_METRICS:
+                continue
+            self._top[metric].push(value, label)
+            self._bottom[metric].push(value, label)
+
+    def consume(self, rows: Iterable[Dict[str, Any]]) -> "RankingSummary":
+        """Fold every row of an iterable; returns self for chaining."""
+        for row in rows:
+            self.add(row)
+        return self
+
+    async def aconsume(self, rows: AsyncIterator[Dict[str, Any]]) -> "RankingSummary":
+        """Fold every row of an async iterator; returns self for chaining."""
+        async for row in rows:
+            self.add(row)
+        return self
+
+    def summary(self) -> Dict[str, Any]:
+        """Rankings and quantiles per metric."""
+        def ranked(top: TopK) -> List[Dict[str, Any]]:
+            return [{self.label: label, "value": value} for value, label in top.items()]
+
+        return {
+            "count": self.count,
+            "metrics": {
+                metric: {
+                    "top": ranked(self._top[metric]),
+                    "bottom": ranked(self._bottom[metric]),
+                    "quantiles": {
+                        f"p{estimator.q * 100:g}": estimator.value()
+                        for estimator in self._quantiles[metric]
+                    },
+                }
+                for metric in self.metrics
+            },
+        }
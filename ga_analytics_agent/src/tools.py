@@ -1,11 +1,22 @@
 """Tools for GA Analytics Agent."""
 
-from typing import Dict, List, Optional, Any
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
 import json
 from datetime import datetime, timedelta
 from pydantic_ai import RunContext
 from pydantic import BaseModel, Field
+from .anomaly import SeasonalEWMADetector, baseline_window, settled_before
+from .columnar import ColumnarReport
+from .comparison import comparison_window, fetch_comparison, metric_name
+from .date_ranges import DateWindow, parse_date_range, utc_today
 from .dependencies import GAAnalyticsDependencies
+from .history import SNAPSHOT_REPORTS
+from .insights import get_insight_rules
+from .incremental import fetch_daily_window
+from .metric_engine import analyze_metrics_batch, metrics_to_columns
+from .resilience import RetryPolicy
+from .streaming import RANKING_REPORTS, PageStats, iter_report_rows
 
 
 class GADataRequest(BaseModel):
@@ -36,6 +47,16 @@ class InsightGeneration(BaseModel):
     priority: str  # "high", "medium", "low"
 
 
+async def _with_retries(ctx: RunContext[GAAnalyticsDependencies], request: Callable[[], Awaitable[Any]]) -> Any:
+    """Run a GA request under the query's retry policy and retry budget."""
+    retry_policy = RetryPolicy(
+        max_retries=ctx.deps.max_retries,
+        base_delay=ctx.deps.retry_base_delay,
+        max_delay=ctx.deps.retry_max_delay
+    )
+    return await retry_policy.run(request, budget=ctx.deps.retry_budget)
+
+
 async def fetch_ga_data(
     ctx: RunContext[GAAnalyticsDependencies],
     endpoint: str,
@@ -45,10 +66,16 @@ async def fetch_ga_data(
     """
     Fetch data from GA MCP server endpoints.
     
+    Transient failures (timeouts, connection errors, 429 and 5xx) are
+    retried with capped exponential backoff and jitter, honouring
+    Retry-After, within the query's retry budget. Other errors are
+    raised immediately.
+    
     Args:
         ctx: Runtime context with dependencies
         endpoint: API endpoint path (e.g., '/api/summary', '/api/pages')
-        date_range: Date range for data
+        date_range: Date range alias (e.g. '7days', 'last30days', '12months')
+            or explicit 'YYYY-MM-DD..YYYY-MM-DD' pair
         filters: Optional filters for data
         
     Returns:
@@ -64,95 +91,329 @@ async def fetch_ga_data(
     if filters:
         params.update(filters)
     
-    try:
-        # Fetch data from GA MCP server
-        data = await ctx.deps.fetch_ga_data(endpoint, params)
+    # Fetch data from GA MCP server
+    data = await _with_retries(ctx, lambda: ctx.deps.fetch_ga_data(endpoint, params))
+    
+    # Log in debug mode
+    if ctx.deps.debug:
+        print(f"Fetched GA data from {endpoint}: {len(data)} records")
+    
+    return data
+
+
+async def fetch_daily_traffic(
+    ctx: RunContext[GAAnalyticsDependencies],
+    date_range: Optional[str] = "30days"
+) -> Dict:
+    """
+    Fetch daily users, page views and sessions for a window.
+    
+    Days already fetched and settled are reused from the local row store,
+    so rolling windows only request the newly closed days.
+    
+    Args:
+        ctx: Runtime context with dependencies
+        date_range: Date range alias or explicit 'YYYY-MM-DD..YYYY-MM-DD' pair
+        
+    Returns:
+        Daily rows plus window totals of page views and sessions; daily
+        users do not add up to the window's unique users
+    """
+    data = await _with_retries(ctx, lambda: fetch_daily_window(ctx.deps, date_range))
+    
+    if ctx.deps.debug:
+        incremental = data["incremental"]
+        print(
+            f"Daily traffic {date_range}: fetched {incremental['fetched_days']} days "
+            f"in {incremental['requests']} requests, reused {incremental['reused_days']}"
+        )
+    
+    return data
+
+
+async def detect_traffic_anomalies(
+    ctx: RunContext[GAAnalyticsDependencies],
+    date_range: Optional[str] = "90days"
+) -> Dict:
+    """
+    Flag days whose users, page views or sessions deviate from their weekday baseline.
+    
+    The requested window and the ``BASELINE_DAYS`` before it are fetched
+    incrementally and replayed through a fresh seasonal detector, so the
+    same window always gets the same answer. Days GA may still revise are
+    scored but do not update the baseline.
+    
+    Args:
+        ctx: Runtime context with dependencies
+        date_range: Window to scan
         
-        # Log in debug mode
-        if ctx.deps.debug:
-            print(f"Fetched GA data from {endpoint}: {len(data)} records")
+    Returns:
+        Anomalies among the days of the requested window
+    """
+    window = parse_date_range(date_range)
+    span = baseline_window(window)
+    data = await fetch_daily_traffic(ctx, f"{span.start}..{span.end}")
+    detector = SeasonalEWMADetector()
+    anomalies = [
+        anomaly
+        for anomaly in detector.detect(data["dailyData"], settled_before(utc_today()))
+        if window.includes(anomaly.day)
+    ]
+    
+    if ctx.deps.debug:
+        print(f"Anomaly scan {date_range}: {len(anomalies)} flagged, baseline from {span.start}")
+    
+    return {
+        "dateRange": window.to_params(),
+        "baselineFrom": span.start.isoformat(),
+        "anomalies": [anomaly.to_dict() for anomaly in anomalies],
+    }
+
+
+async def summarize_pages(
+    ctx: RunContext[GAAnalyticsDependencies],
+    date_range: Optional[str] = "30days",
+    top_k: int = 10,
+    page_size: int = 1000,
+    max_rows: Optional[int] = None
+) -> Dict:
+    """
+    Summarize every page of a site in one streaming pass.
+    
+    Pages are requested in chunks of ``page_size`` and folded into counts,
+    totals, views-weighted rates, threshold hits and the top pages by
+    views as they arrive. The fold keeps only the top pages; fetched
+    chunks are still kept in the response cache, up to ``cache_max_bytes``.
+    
+    Args:
+        ctx: Runtime context with dependencies
+        date_range: Date range alias or explicit pair
+        top_k: Number of top pages to keep
+        page_size: Rows per MCP server request
+        max_rows: Optional cap on the rows scanned
+        
+    Returns:
+        Page count, count totals, rate means, threshold hit counts and top pages
+    """
+    # A retried scan starts over with fresh statistics
+    stats = await _with_retries(ctx, lambda: PageStats(top_k=top_k).aconsume(iter_report_rows(
+        ctx.deps,
+        "/api/pages",
+        "pages",
+        {"dateRange": date_range},
+        page_size=page_size,
+        max_rows=max_rows
+    )))
+    
+    if ctx.deps.debug:
+        print(f"Summarized {stats.count} pages for {date_range}")
+    
+    return stats.summary()
+
+
+async def rank_report(
+    ctx: RunContext[GAAnalyticsDependencies],
+    report: str = "pages",
+    date_range: Optional[str] = "30days",
+    k: int = 5,
+    metrics: Optional[List[str]] = None,
+    min_weight: float = 0
+) -> Dict:
+    """
+    Rank pages, traffic sources or countries locally from one fetched report.
+    
+    A single large report is fetched into columns and every requested
+    metric gets its top-k, bottom-k and median/p90 with NumPy, instead of
+    asking GA again with a different ordering or sending the whole list
+    to the model.
+    
+    Args:
+        ctx: Runtime context with dependencies
+        report: One of 'pages', 'traffic', 'geography'
+        date_range: Date range alias or explicit pair
+        k: Rows per ranking
+        metrics: Metrics to rank; defaults to all of the report's metrics
+        min_weight: Minimum views/sessions for a row to appear in rate rankings
         
-        return data
-    
-    except Exception as e:
-        # Retry logic
-        for attempt in range(ctx.deps.max_retries):
-            try:
-                data = await ctx.deps.fetch_ga_data(endpoint, params)
-                return data
-            except Exception:
-                if attempt == ctx.deps.max_retries - 1:
-                    raise ValueError(f"Failed to fetch GA data after {ctx.deps.max_retries} attempts: {str(e)}")
-                continue
+    Returns:
+        Row count plus top, bottom and quantiles per metric
+    """
+    if report not in RANKING_REPORTS:
+        raise ValueError(f"Invalid report: {report}. Must be one of {list(RANKING_REPORTS)}")
+    spec = RANKING_REPORTS[report]
+    data = await _with_retries(ctx, lambda: ctx.deps.fetch_ga_data(spec.endpoint, {"dateRange": date_range, "limit": spec.limit}))
+    rows = ColumnarReport.from_payload(data, spec.rows_key)
+    ranking = rows.ranking(
+        metrics or spec.metrics, spec.label, k, weight=spec.weight, min_weight=min_weight
+    )
+    ranking["report"] = report
+    ranking["dateRange"] = rows.meta.get("dateRange")
+    return ranking
+
+
+async def get_metric_history(
+    ctx: RunContext[GAAnalyticsDependencies],
+    report: str = "summary",
+    date_range: Optional[str] = "30days",
+    dimension: Optional[str] = None,
+    granularity: Optional[str] = None
+) -> Dict:
+    """
+    Read a period and the period before it from the local snapshot history.
+    
+    No GA requests are made; days missing from the history are reported
+    so callers can fall back to ``fetch_ga_data``. Long periods are read
+    from weekly and monthly rollups.
+    
+    Args:
+        ctx: Runtime context with dependencies
+        report: One of 'summary', 'pages', 'traffic', 'devices'
+        date_range: Date range alias or explicit pair
+        dimension: Optional dimension value, e.g. a page path
+        granularity: Optional 'week' or 'month' to add a per-bucket series
         
-        raise ValueError(f"Failed to fetch GA data: {str(e)}")
+    Returns:
+        Aggregated metrics for both periods, per dimension value
+    """
+    store = ctx.deps.history
+    if store is None:
+        raise ValueError("History store is not configured. Set HISTORY_DB_PATH to enable it.")
+    if report not in SNAPSHOT_REPORTS:
+        raise ValueError(f"Invalid report: {report}. Must be one of {list(SNAPSHOT_REPORTS)}")
+    
+    window = parse_date_range(date_range)
+    previous = comparison_window(window)
+    current_data, previous_data, recorded = await _with_retries(ctx, lambda: asyncio.gather(
+        store.aggregate(report, window, dimension),
+        store.aggregate(report, previous, dimension),
+        store.rows(report, DateWindow(previous.start, window.end), dimension)
+    ))
+    recorded_days = {row["day"] for row in recorded}
+    
+    history = {
+        "report": report,
+        "dateRange": window.to_params(),
+        "previousRange": previous.to_params(),
+        "current": current_data,
+        "previous": previous_data,
+        "missingDays": (window.days + previous.days) - len(recorded_days),
+    }
+    if granularity:
+        history["series"] = await store.bucketed(report, window, granularity, dimension or "")
+    return history
 
 
 async def analyze_metrics(
     ctx: RunContext[GAAnalyticsDependencies],
     metrics: Dict[str, Any],
-    comparison_period: Optional[str] = "previous_period"
+    comparison_period: Optional[str] = "previous_period",
+    date_range: Optional[str] = None
 ) -> List[MetricAnalysis]:
     """
     Analyze GA metrics for anomalies and trends.
     
+    When ``date_range`` is given, metrics without a ``previous_value``
+    that name a summary metric (e.g. ``sessions`` or ``bounce_rate``) are
+    analyzed from the GA summaries of that range and its comparison
+    window, fetched together, so callers do not need a separate tool call
+    for baselines. Both values then come from GA at the same scale; the
+    caller's value for such metrics is not used. Other metrics are
+    analyzed as given.
+    
     Args:
         ctx: Runtime context with dependencies
         metrics: Metrics data to analyze
-        comparison_period: Period for comparison
+        comparison_period: 'previous_period', 'same_period_last_year' or a
+            custom 'YYYY-MM-DD..YYYY-MM-DD' range
+        date_range: Period the metric values cover
         
     Returns:
         List of metric analysis results
     """
-    analyses = []
+    columns = metrics_to_columns(metrics)
+    if date_range and any(previous is None for previous in columns["previous"]):
+        comparison = await _with_retries(
+            ctx, lambda: fetch_comparison(ctx.deps, "/api/summary", date_range, comparison_period)
+        )
+        fetched = {
+            name: (current, previous)
+            for name, current, previous in zip(
+                comparison.batch.names, comparison.batch.current.tolist(), comparison.batch.previous.tolist()
+            )
+        }
+        for index, (name, previous) in enumerate(zip(columns["names"], columns["previous"])):
+            if previous is None and metric_name(name) in fetched:
+                columns["current"][index], columns["previous"][index] = fetched[metric_name(name)]
     
-    for metric_name, metric_data in metrics.items():
-        # Extract current and previous values
-        current_value = metric_data.get("value", 0)
-        previous_value = metric_data.get("previous_value")
-        
-        # Calculate change percentage
-        change_percentage = None
-        if previous_value and previous_value != 0:
-            change_percentage = ((current_value - previous_value) / previous_value) * 100
-        
-        # Determine trend
-        trend = "stable"
-        if change_percentage:
-            if change_percentage > 5:
-                trend = "up"
-            elif change_percentage < -5:
-                trend = "down"
-        
-        # Assess severity based on thresholds
-        severity = "normal"
-        recommendation = None
-        
-        # Check for critical thresholds
-        if metric_name == "bounce_rate" and current_value > 70:
-            severity = "warning"
-            recommendation = "High bounce rate detected. Review page content and user experience."
-        elif metric_name == "conversion_rate" and change_percentage and change_percentage < -15:
-            severity = "critical"
-            recommendation = "Significant drop in conversion rate. Investigate recent changes."
-        elif metric_name == "sessions" and change_percentage and change_percentage < -20:
-            severity = "warning"
-            recommendation = "Notable decrease in traffic. Check marketing campaigns and SEO."
+    # Same rules as the batch engine, keeping a model for every metric
+    batch = analyze_metrics_batch(**columns)
+    return [MetricAnalysis(**record) for record in batch.records(include_normal=True)]
+
+
+async def compare_periods(
+    ctx: RunContext[GAAnalyticsDependencies],
+    endpoint: str = "/api/summary",
+    date_range: Optional[str] = "30days",
+    comparison_period: Optional[str] = "previous_period",
+    limit: int = 10
+) -> Dict:
+    """
+    Compare a report with its baseline period in one call.
+    
+    The current and baseline reports are fetched concurrently (or served
+    from cache) and deltas for every metric are computed in one batch.
+    
+    Args:
+        ctx: Runtime context with dependencies
+        endpoint: One of '/api/summary', '/api/pages', '/api/traffic', '/api/devices'
+        date_range: Current period
+        comparison_period: 'previous_period', 'same_period_last_year' or a
+            custom 'YYYY-MM-DD..YYYY-MM-DD' range
+        limit: Rows per period for list reports
         
-        # Create analysis
-        analysis = MetricAnalysis(
-            metric_name=metric_name,
-            current_value=current_value,
-            previous_value=previous_value,
-            change_percentage=change_percentage,
-            trend=trend,
-            severity=severity,
-            recommendation=recommendation
-        )
+    Returns:
+        Both date ranges and a change/trend/severity record per metric
+    """
+    params = None if endpoint in ("/api/summary", "/api/devices") else {"limit": limit}
+    comparison = await _with_retries(
+        ctx, lambda: fetch_comparison(ctx.deps, endpoint, date_range, comparison_period, params)
+    )
+    
+    if ctx.deps.debug:
+        print(f"Compared {len(comparison.batch)} metrics for {endpoint}, {len(comparison.batch.flagged)} flagged")
+    
+    return comparison.to_dict()
+
+
+async def analyze_metric_columns(
+    ctx: RunContext[GAAnalyticsDependencies],
+    names: List[str],
+    current: List[float],
+    previous: Optional[List[Optional[float]]] = None,
+    labels: Optional[List[str]] = None
+) -> List[MetricAnalysis]:
+    """
+    Analyze many metrics at once, e.g. one row per page or channel.
+    
+    Change, trend and severity are computed column-wise with NumPy; models
+    are only built for rows with a non-normal severity.
+    
+    Args:
+        ctx: Runtime context with dependencies
+        names: Metric name per row (e.g., 'sessions', 'bounce_rate')
+        current: Current value per row
+        previous: Previous value per row, None where unknown
+        labels: Display name per row, defaults to the metric name
         
-        analyses.append(analysis)
+    Returns:
+        Analysis results for flagged rows only
+    """
+    batch = analyze_metrics_batch(names, current, previous, labels)
     
-    return analyses
+    if ctx.deps.debug:
+        print(f"Analyzed {len(batch)} metrics, {len(batch.flagged)} flagged")
+    
+    return [MetricAnalysis(**record) for record in batch.records()]
 
 
 async def generate_insights(
@@ -171,90 +432,12 @@ async def generate_insights(
     Returns:
         List of generated insights
     """
-    insights = []
+    rules = get_insight_rules()
+    insights = [InsightGeneration(**fields) for fields in rules.evaluate(analytics_data)]
     
-    # Analyze traffic patterns
-    if "traffic" in analytics_data:
-        traffic_data = analytics_data["traffic"]
-        
-        # Check for traffic source issues
-        if traffic_data.get("direct_traffic_percentage", 0) > 50:
-            insights.append(InsightGeneration(
-                insight_type="opportunity",
-                title="High Direct Traffic Attribution",
-                description="Over 50% of traffic is attributed to direct sources, indicating potential tracking issues.",
-                impact="Missing attribution data for marketing campaigns",
-                action_items=[
-                    "Implement UTM parameters for all campaigns",
-                    "Review tracking code implementation",
-                    "Set up campaign tracking dashboard"
-                ],
-                priority="high"
-            ))
-    
-    # Analyze page performance
-    if "pages" in analytics_data:
-        pages_data = analytics_data["pages"]
-        
-        # Check for high-bounce pages
-        high_bounce_pages = [p for p in pages_data if p.get("bounce_rate", 0) > 80]
-        if high_bounce_pages:
-            insights.append(InsightGeneration(
-                insight_type="anomaly",
-                title="High Bounce Rate Pages Detected",
-                description=f"{len(high_bounce_pages)} pages have bounce rates above 80%",
-                impact="Poor user engagement and conversion potential",
-                action_items=[
-                    "Review page content relevance",
-                    "Improve page load speed",
-                    "Add clear calls-to-action",
-                    "Test different content formats"
-                ],
-                priority="medium"
-            ))
-    
-    # Analyze conversion opportunities
-    if "conversions" in analytics_data:
-        conversion_data = analytics_data["conversions"]
-        
-        # Check conversion rate trends
-        if conversion_data.get("trend") == "declining":
-            insights.append(InsightGeneration(
-                insight_type="trend",
-                title="Declining Conversion Rate Trend",
-                description="Conversion rates have decreased over the past period",
-                impact="Reduced ROI on marketing efforts",
-                action_items=[
-                    "A/B test landing pages",
-                    "Review conversion funnel for drop-offs",
-                    "Optimize form fields",
-                    "Implement exit-intent offers"
-                ],
-                priority="high"
-            ))
-    
-    # Device-specific insights
-    if "devices" in analytics_data:
-        device_data = analytics_data["devices"]
-        
-        # Check mobile performance
-        mobile_conversion = device_data.get("mobile", {}).get("conversion_rate", 0)
-        desktop_conversion = device_data.get("desktop", {}).get("conversion_rate", 0)
-        
-        if desktop_conversion > 0 and mobile_conversion < desktop_conversion * 0.5:
-            insights.append(InsightGeneration(
-                insight_type="opportunity",
-                title="Mobile Conversion Rate Optimization Needed",
-                description="Mobile conversion rate is less than 50% of desktop rate",
-                impact="Missing conversions from mobile traffic",
-                action_items=[
-                    "Optimize mobile user experience",
-                    "Simplify mobile forms",
-                    "Improve mobile page speed",
-                    "Test mobile-specific CTAs"
-                ],
-                priority="high"
-            ))
+    if ctx.deps.debug:
+        for name, stats in rules.stats().items():
+            print(f"Insight rule {name}: {stats['calls']} calls, {stats['avg_ms']}ms avg")
     
     # Sort insights by priority
     priority_order = {"high": 0, "medium": 1, "low": 2}
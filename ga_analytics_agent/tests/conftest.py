@@ -12,10 +12,23 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from agent import ga_analytics_agent
+from cache import ResponseCache
+from concurrency import SingleFlight
 from dependencies import GAAnalyticsDependencies
+from resilience import CircuitBreaker
 from settings import GAAnalyticsSettings
 
 
+class FakeClock:
+    """Manually advanced monotonic clock for TTL tests."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
 @pytest.fixture
 def test_settings():
     """Create test settings."""
@@ -41,6 +54,39 @@ def mock_dependencies(test_settings):
     return deps
 
 
+@pytest.fixture
+def isolated_deps():
+    """
+    Factory for real dependencies that share no process-wide state.
+
+    Each call builds dependencies with their own response cache,
+    single-flight group and circuit breaker, no rate limit, a mocked
+    ``cleanup`` and a mocked ``_request_ga_data`` transport returning a
+    small summary. ``transport`` replaces the transport's behaviour and
+    other keywords override dependency fields.
+    """
+    def make(cache=None, shared_cache=None, transport=None, **overrides):
+        overrides.setdefault("api_rate_limit", 0)
+        deps = GAAnalyticsDependencies(**overrides)
+        deps._cache_client = cache if cache is not None else ResponseCache(max_entries=16, max_bytes=1024 * 1024)
+        deps._shared_cache_client = shared_cache
+        deps._single_flight = SingleFlight()
+        deps._circuit_breaker = CircuitBreaker(minimum_calls=4, open_seconds=30)
+        if transport is None:
+            deps._request_ga_data = AsyncMock(return_value={"metrics": {"sessions": 1000}})
+        else:
+            deps._request_ga_data = AsyncMock(side_effect=transport)
+        deps.cleanup = AsyncMock()
+        return deps
+    return make
+
+
+@pytest.fixture
+def fake_clock():
+    """Monotonic clock that only moves when a test advances ``now``."""
+    return FakeClock()
+
+
 @pytest.fixture
 def test_agent():
     """Create agent with TestModel for testing."""
@@ -0,0 +1,133 @@
+"""Test seasonal anomaly detection over daily traffic."""
+
+import pytest
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from anomaly import SeasonalEWMADetector
+from incremental import DailyRowStore
+from resilience import RetryBudget
+from tools import detect_traffic_anomalies
+
+
+def weekly_rows(start, days, overrides=None):
+    """Daily rows with busy weekdays and quiet weekends."""
+    overrides = overrides or {}
+    rows = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        sessions = 1000 + (offset % 3) * 20 if day.weekday() < 5 else 300 + (offset % 2) * 10
+        sessions = overrides.get(day, sessions)
+        rows.append({"rawDate": day.strftime("%Y%m%d"), "users": sessions // 2, "pageViews": sessions * 3, "sessions": sessions})
+    return rows
+
+
+@pytest.mark.unit
+def test_weekday_seasonality_is_not_flagged():
+    """Weekend dips match their own weekday baseline and are not anomalies."""
+    detector = SeasonalEWMADetector()
+    assert detector.detect(weekly_rows(date(2024, 1, 1), 56)) == []
+    assert detector.last_day == date(2024, 2, 25)
+
+
+@pytest.mark.unit
+def test_spike_and_drop_are_flagged_for_all_series():
+    """Deviations from the weekday baseline are flagged per metric with direction and severity."""
+    start = date(2024, 1, 1)
+    drop_day = date(2024, 2, 19)  # Monday
+    spike_day = date(2024, 2, 24)  # Saturday
+    rows = weekly_rows(start, 56, {drop_day: 400, spike_day: 900})
+    anomalies = SeasonalEWMADetector().detect(rows)
+
+    flagged = {(anomaly.day, anomaly.metric): anomaly for anomaly in anomalies}
+    assert set(flagged) == {(day, metric) for day in (drop_day, spike_day) for metric in ("users", "pageViews", "sessions")}
+    assert flagged[(drop_day, "sessions")].direction == "drop"
+    assert flagged[(spike_day, "sessions")].direction == "spike"
+    assert flagged[(spike_day, "sessions")].severity == "critical"
+    assert flagged[(drop_day, "sessions")].expected == pytest.approx(1000, rel=0.05)
+
+
+@pytest.mark.unit
+def test_updates_are_incremental_and_skip_unsettled_days():
+    """Replayed days are ignored, and unsettled days are scored without moving the baseline."""
+    detector = SeasonalEWMADetector()
+    rows = weekly_rows(date(2024, 1, 1), 63, {date(2024, 3, 3): 5000})
+    detector.detect(rows[:56])
+    baseline = detector.mean.copy()
+
+    # Same window again plus a week; only the new days are processed
+    anomalies = detector.detect(rows, settled_before=date(2024, 3, 2))
+    assert [(anomaly.day, anomaly.metric) for anomaly in anomalies if anomaly.metric == "sessions"] == [
+        (date(2024, 3, 3), "sessions")
+    ]
+    assert detector.last_day == date(2024, 3, 1)
+    assert not (detector.mean == baseline).all()
+
+    # Unsettled days are reported again until they settle
+    again = detector.detect(rows, settled_before=date(2024, 3, 2))
+    assert [anomaly.day for anomaly in again] == [date(2024, 3, 3)] * 3
+
+
+@pytest.mark.unit
+def test_outliers_barely_move_the_baseline():
+    """Clipped residuals keep a single outlier from inflating the expected value."""
+    detector = SeasonalEWMADetector(metrics=("sessions",))
+    monday = date(2024, 1, 1)
+    for week in range(8):
+        detector.update(monday + timedelta(weeks=week), [1000])
+    detector.update(monday + timedelta(weeks=8), [100000])
+    z, expected = detector.score(monday + timedelta(weeks=9), [1000])
+    assert expected[0] < 1200
+    assert abs(z[0]) < 3
+
+
+class DailyTrafficDeps:
+    """Serves the weekly pattern for any requested span, with one spike day."""
+
+    max_retries = 0
+    retry_base_delay = 0.0
+    retry_max_delay = 0.0
+    debug = False
+
+    def __init__(self, spike_day):
+        self.spike_day = spike_day
+        self.retry_budget = RetryBudget(max_seconds=1.0)
+
+    async def fetch_ga_data(self, endpoint, params=None):
+        start = date.fromisoformat(params["startDate"])
+        end = date.fromisoformat(params["endDate"])
+        rows = weekly_rows(start, (end - start).days + 1, {self.spike_day: 5000})
+        return {"dailyData": rows}
+
+
+async def scan(deps, date_range):
+    ctx = MagicMock()
+    ctx.deps = deps
+    result = await detect_traffic_anomalies(ctx, date_range)
+    return [(anomaly["date"], anomaly["metric"]) for anomaly in result["anomalies"]]
+
+
+@pytest.mark.asyncio
+async def test_repeated_scans_return_the_same_anomalies():
+    """Scanning the same window twice flags the same days."""
+    deps = DailyTrafficDeps(spike_day=date(2024, 3, 20))
+    with patch('incremental._daily_row_store', DailyRowStore(settle_days=0)):
+        first = await scan(deps, "2024-01-01..2024-03-31")
+        second = await scan(deps, "2024-01-01..2024-03-31")
+    assert first == [("2024-03-20", metric) for metric in ("users", "pageViews", "sessions")]
+    assert second == first
+
+
+@pytest.mark.asyncio
+async def test_short_scan_does_not_hide_anomalies_from_a_longer_one():
+    """A short window is scanned against a warmed-up baseline and leaves later scans unaffected."""
+    deps = DailyTrafficDeps(spike_day=date(2024, 3, 20))
+    expected = [("2024-03-20", metric) for metric in ("users", "pageViews", "sessions")]
+    with patch('incremental._daily_row_store', DailyRowStore(settle_days=0)):
+        assert await scan(deps, "2024-03-18..2024-03-24") == expected
+        assert await scan(deps, "2024-01-01..2024-03-31") == expected
+        assert await scan(deps, "2024-01-01..2024-02-29") == []
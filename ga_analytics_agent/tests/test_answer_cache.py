@@ -0,0 +1,79 @@
+"""Test the agent answer cache."""
+
+import pytest
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agent import ga_analytics_agent, run_analytics_query
+from answer_cache import AnswerCache, normalize_query
+from dependencies import record_data_reads
+
+
+@pytest.mark.unit
+def test_key_normalizes_question_and_includes_context():
+    """Spacing, case and trailing punctuation do not change the key; mode, context and day do."""
+    cache = AnswerCache()
+    today = date(2024, 6, 10)
+    assert normalize_query("  How did   traffic do last week?? ") == "how did traffic do last week"
+    key = cache.key("How did traffic do last week?", "conversational", "ctx", today)
+    assert key == cache.key("how did traffic  do last week", "conversational", "ctx", today)
+    assert key != cache.key("How did traffic do last week?", "proactive", "ctx", today)
+    assert key != cache.key("How did traffic do last week?", "conversational", "other", today)
+    assert key != cache.key("How did traffic do last week?", "conversational", "ctx", date(2024, 6, 11))
+
+
+@pytest.mark.asyncio
+async def test_answers_are_invalidated_when_data_changes(isolated_deps, fake_clock):
+    """Recorded GA reads are refetched on lookup; changed data or expiry drops the answer."""
+    clock = fake_clock
+    cache = AnswerCache(ttl=60, max_entries=2, clock=clock)
+    deps = isolated_deps()
+
+    with record_data_reads() as reads:
+        await deps.fetch_ga_data("/api/summary", {"startDate": "2024-06-01", "endDate": "2024-06-07"})
+    assert list(reads) == ['/api/summary?{"endDate":"2024-06-07","startDate":"2024-06-01"}']
+    cache.set("k", "Traffic was flat.", reads)
+
+    assert await cache.get("k", deps) == (True, "Traffic was flat.")
+    assert deps._request_ga_data.await_count == 1  # Revalidated from the response cache
+
+    deps.cache.clear()
+    deps._request_ga_data.return_value = {"metrics": {"sessions": 1500}}
+    assert await cache.get("k", deps) == (False, None)
+    assert cache.stats.invalidations == 1
+
+    cache.set("k", "Traffic grew.", {})
+    clock.now += 61
+    assert await cache.get("k", deps) == (False, None)
+    assert cache.stats_snapshot()["expirations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_run_analytics_query_reuses_answers(isolated_deps):
+    """A repeated question is answered from the cache until its data changes."""
+    deps = isolated_deps()
+    cache = AnswerCache(ttl=3600)
+
+    async def fake_run(user_prompt, *, deps, **kwargs):
+        data = await deps.fetch_ga_data("/api/summary", {"dateRange": "7days"})
+        result = MagicMock()
+        result.data = f"{data['metrics']['sessions']} sessions"
+        return result
+
+    with patch('agent.GAAnalyticsDependencies.from_settings', return_value=deps), \
+            patch('agent.get_answer_cache', return_value=cache), \
+            patch.object(ga_analytics_agent, 'run', side_effect=fake_run) as mock_run:
+        assert await run_analytics_query("How did traffic do last week?") == "1000 sessions"
+        assert await run_analytics_query("how did traffic do last week") == "1000 sessions"
+        assert mock_run.call_count == 1
+        assert await run_analytics_query("How did traffic do last week?", mode="proactive") == "1000 sessions"
+        assert mock_run.call_count == 2
+
+        deps.cache.clear()
+        deps._request_ga_data.return_value = {"metrics": {"sessions": 1500}}
+        assert await run_analytics_query("How did traffic do last week?") == "1500 sessions"
+        assert mock_run.call_count == 3
@@ -0,0 +1,91 @@
+"""Test the columnar GA report representation."""
+
+import pytest
+import numpy as np
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from columnar import ColumnarReport
+from insights import DEFAULT_RULES
+from streaming import RankingSummary
+
+
+PAGES_PAYLOAD = {
+    "dateRange": {"startDate": "2024-06-01", "endDate": "2024-06-30"},
+    "pages": [
+        {"path": "/", "title": "Home", "views": 5000, "users": 3000, "bounceRate": 0.30},
+        {"path": "/pricing", "title": "Pricing", "views": 800, "users": 500, "bounceRate": 0.85},
+        {"path": "/blog/a", "title": "A", "views": 300, "users": 250, "bounceRate": 0.60},
+        {"path": "/typo", "title": "Typo", "views": 1, "users": 1, "bounceRate": 1.0},
+        {"path": "/new", "title": "New", "views": 300, "users": None, "bounceRate": 0.40},
+    ],
+}
+
+
+@pytest.mark.unit
+def test_columns_are_typed_arrays():
+    """Integer, float, gapped and text fields map to typed arrays; meta keeps the rest."""
+    report = ColumnarReport.from_payload(PAGES_PAYLOAD, "pages")
+    assert len(report) == 5
+    assert report.fields == ["path", "title", "views", "users", "bounceRate"]
+    assert report["views"].dtype == np.int64
+    assert report["bounceRate"].dtype == np.float64
+    assert report["users"].dtype == np.float64 and np.isnan(report["users"][4])
+    assert report["path"].dtype == object
+    assert report.meta == {"dateRange": PAGES_PAYLOAD["dateRange"]}
+    assert next(report.rows()) == PAGES_PAYLOAD["pages"][0]
+
+    top = report.top("views", 3)
+    assert top["path"].tolist() == ["/", "/pricing", "/blog/a"]  # Tie with /new keeps row order
+    assert report.take(report["bounceRate"] > 0.8)["path"].tolist() == ["/pricing", "/typo"]
+
+
+@pytest.mark.unit
+def test_ranking_answers_several_rankings_at_once():
+    """Top, bottom and quantiles per metric; tiny pages are left out of rate rankings."""
+    report = ColumnarReport.from_payload(PAGES_PAYLOAD, "pages")
+    ranking = report.ranking(("views", "bounceRate"), "path", k=2, weight="views", min_weight=10)
+
+    assert ranking["count"] == 5
+    views = ranking["metrics"]["views"]
+    assert views["top"] == [{"path": "/", "value": 5000}, {"path": "/pricing", "value": 800}]
+    assert views["bottom"] == [{"path": "/typo", "value": 1}, {"path": "/blog/a", "value": 300}]
+    bounce = ranking["metrics"]["bounceRate"]
+    assert [row["path"] for row in bounce["top"]] == ["/pricing", "/blog/a"]
+    assert [row["path"] for row in bounce["bottom"]] == ["/", "/new"]
+    assert bounce["quantiles"] == {"p50": pytest.approx(0.6), "p90": pytest.approx(0.94)}
+
+
+
+@pytest.mark.unit
+def test_ranking_matches_streaming_summary():
+    """The vectorized ranking returns what the streaming summarizer computes."""
+    report = ColumnarReport.from_payload(PAGES_PAYLOAD, "pages")
+    metrics = ("views", "bounceRate")
+    columnar = report.ranking(metrics, "path", k=2, quantiles=(0.5,), weight="views", min_weight=10)
+    streamed = RankingSummary(
+        metrics=metrics, label="path", k=2, quantiles=(0.5,), weight="views", min_weight=10
+    ).consume(PAGES_PAYLOAD["pages"]).summary()
+    assert columnar == streamed
+
+@pytest.mark.unit
+def test_insight_rules_accept_columnar_sections():
+    """The high-bounce rule reads GA fractions from columnar sections and row lists alike."""
+    pages = ColumnarReport.from_payload(PAGES_PAYLOAD, "pages")
+    results = DEFAULT_RULES.evaluate({"pages": pages})
+    assert [result["description"] for result in results] == ["2 pages have bounce rates above 80%"]
+    assert DEFAULT_RULES.evaluate({"pages": PAGES_PAYLOAD["pages"]}) == results
+    assert DEFAULT_RULES.evaluate({"pages": ColumnarReport.from_rows([{"path": "/a"}])}) == []
+
+
+@pytest.mark.unit
+def test_pandas_conversion_shares_memory():
+    """Numeric columns are handed to pandas without copying."""
+    pytest.importorskip("pandas")
+    report = ColumnarReport.from_payload(PAGES_PAYLOAD, "pages")
+    frame = report.to_pandas()
+    assert frame["views"].tolist() == [5000, 800, 300, 1, 300]
+    assert np.shares_memory(frame["views"].to_numpy(), report["views"])
+    assert frame.attrs["dateRange"] == PAGES_PAYLOAD["dateRange"]
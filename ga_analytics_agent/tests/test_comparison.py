@@ -0,0 +1,128 @@
+"""Test period-over-period comparisons."""
+
+import httpx
+import pytest
+from datetime import date
+from unittest.mock import MagicMock
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from comparison import comparison_window, fetch_comparison
+from date_ranges import DateWindow
+from resilience import RetryBudget
+from tools import analyze_metrics, compare_periods
+
+
+class PeriodDeps:
+    """Serves a summary and pages per requested start date."""
+
+    max_retries = 2
+    retry_base_delay = 0.0
+    retry_max_delay = 0.0
+
+    def __init__(self, periods, failures=0):
+        self.periods = periods
+        self.requests = []
+        self.failures = failures
+        self.retry_budget = RetryBudget(max_seconds=1.0)
+
+    async def fetch_ga_data(self, endpoint, params=None):
+        if self.failures:
+            self.failures -= 1
+            raise httpx.ConnectTimeout("timed out")
+        self.requests.append((endpoint, params))
+        sessions = self.periods[params["startDate"]]
+        if endpoint == "/api/pages":
+            return {"pages": [{"path": "/", "title": "Home", "views": sessions * 2, "users": sessions}]}
+        return {"metrics": {"sessions": sessions, "activeUsers": sessions // 2, "bounceRate": 0.45}}
+
+
+@pytest.mark.unit
+def test_comparison_windows():
+    """Previous period, same period last year and custom ranges resolve to absolute windows."""
+    june = DateWindow(date(2024, 6, 1), date(2024, 6, 30))
+    assert comparison_window(june) == DateWindow(date(2024, 5, 2), date(2024, 5, 31))
+    assert comparison_window(june, "same_period_last_year") == DateWindow(date(2023, 6, 1), date(2023, 6, 30))
+    leap = DateWindow(date(2024, 2, 1), date(2024, 2, 29))
+    assert comparison_window(leap, "same_period_last_year") == DateWindow(date(2023, 2, 1), date(2023, 2, 28))
+    assert comparison_window(june, "2024-01-01..2024-01-31") == DateWindow(date(2024, 1, 1), date(2024, 1, 31))
+    with pytest.raises(ValueError):
+        comparison_window(june, "last_quarter_or_so")
+
+
+@pytest.mark.asyncio
+async def test_fetch_comparison_batches_deltas():
+    """Both periods are fetched with explicit dates and every metric gets a delta."""
+    deps = PeriodDeps({"2024-06-01": 750, "2023-06-01": 1000})
+    comparison = await fetch_comparison(
+        deps, "/api/summary", "2024-06-01..2024-06-30", "same_period_last_year"
+    )
+    records = {record["metric_name"]: record for record in comparison.to_dict()["metrics"]}
+    assert records["sessions"]["change_percentage"] == -25.0
+    assert records["sessions"]["severity"] == "warning"
+    assert records["bounceRate"]["trend"] == "stable"
+    assert {params["startDate"] for _, params in deps.requests} == {"2024-06-01", "2023-06-01"}
+
+    deps = PeriodDeps({"2024-06-01": 110, "2024-05-02": 100})
+    pages = await fetch_comparison(deps, "/api/pages", "2024-06-01..2024-06-30", params={"limit": 5})
+    assert [record["metric_name"] for record in pages.to_dict()["metrics"]] == ["/ views", "/ users"]
+    assert deps.requests[0][1]["limit"] == 5
+    with pytest.raises(ValueError):
+        await fetch_comparison(deps, "/api/realtime")
+
+
+@pytest.mark.asyncio
+async def test_fractional_rates_trigger_percent_thresholds():
+    """GA's 0-1 bounce rate is scaled to percent, so the 70% limit applies to real payloads."""
+    class SummaryDeps:
+        async def fetch_ga_data(self, endpoint, params=None):
+            bounce = 0.756 if params["startDate"] == "2024-06-01" else 0.52
+            return {
+                "dateRange": params,
+                "metrics": {
+                    "activeUsers": 1200, "sessions": 1500, "pageViews": 4200,
+                    "bounceRate": bounce, "avgSessionDuration": 95.2, "newUsers": 800,
+                },
+            }
+
+    comparison = await fetch_comparison(SummaryDeps(), "/api/summary", "2024-06-01..2024-06-30")
+    records = {record["metric_name"]: record for record in comparison.to_dict()["metrics"]}
+    assert records["bounceRate"]["current_value"] == pytest.approx(75.6)
+    assert records["bounceRate"]["previous_value"] == pytest.approx(52.0)
+    assert records["bounceRate"]["severity"] == "warning"
+    assert records["avgSessionDuration"]["current_value"] == 95.2
+
+
+@pytest.mark.asyncio
+async def test_analyze_metrics_fetches_missing_baselines():
+    """Metrics without a baseline are analyzed from both fetched summaries, with retries."""
+    mock_ctx = MagicMock()
+    mock_ctx.deps = PeriodDeps({"2024-06-01": 700, "2024-05-02": 1000}, failures=1)
+    analyses = await analyze_metrics(
+        mock_ctx,
+        {
+            "sessions": {"value": 123},
+            "bounce_rate": {"value": 50, "previous_value": 40},
+            "conversion_rate": {"value": 2.5},
+        },
+        date_range="2024-06-01..2024-06-30"
+    )
+    by_name = {analysis.metric_name: analysis for analysis in analyses}
+    assert (by_name["sessions"].current_value, by_name["sessions"].previous_value) == (700, 1000)
+    assert by_name["sessions"].severity == "warning"
+    assert by_name["bounce_rate"].previous_value == 40
+    assert by_name["conversion_rate"].previous_value is None
+    assert {params["startDate"] for _, params in mock_ctx.deps.requests} == {"2024-05-02", "2024-06-01"}
+
+
+@pytest.mark.asyncio
+async def test_compare_periods_retries_transient_failures():
+    """A timed-out request is retried under the query's retry policy."""
+    mock_ctx = MagicMock()
+    mock_ctx.deps = PeriodDeps({"2024-06-01": 700, "2024-05-02": 1000}, failures=1)
+    mock_ctx.deps.debug = False
+    result = await compare_periods(mock_ctx, "/api/summary", "2024-06-01..2024-06-30")
+    records = {record["metric_name"]: record for record in result["metrics"]}
+    assert records["sessions"]["change_percentage"] == -30.0
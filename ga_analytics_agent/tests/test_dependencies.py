@@ -0,0 +1,568 @@
+"""Test GA Analytics Agent dependency layer: caching, pooling and request handling."""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from datetime import date, datetime, timezone
+
+from cache import FreshnessPolicy, RedisCacheTier, ResponseCache, decode_payload, encode_payload, make_cache_key
+from concurrency import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, SingleFlight, TokenBucketRateLimiter
+from date_ranges import DateWindow, normalize_date_params, parse_date_range, resolve_date_range
+from dependencies import GAAnalyticsDependencies, drain_background_refreshes
+from resilience import CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN, CircuitBreaker, CircuitOpenError, GAFetchError
+from http_pool import HTTPClientPool
+
+
+@pytest.mark.unit
+def test_cache_key_normalizes_params():
+    """Equivalent params in a different order share a cache key."""
+    key_a = make_cache_key("/api/pages", {"dateRange": "7days", "limit": 10, "filter": None})
+    key_b = make_cache_key("/api/pages/", {"limit": "10", "dateRange": "7days"})
+    assert key_a == key_b
+    assert key_a != make_cache_key("/api/pages", {"dateRange": "30days", "limit": 10})
+
+
+@pytest.mark.unit
+def test_response_cache_ttl_expiry(fake_clock):
+    """Entries expire after their TTL and count as misses."""
+    clock = fake_clock
+    cache = ResponseCache(max_entries=4, max_bytes=1024, max_stale=0, clock=clock)
+
+    cache.set("a", {"sessions": 1}, ttl=60)
+    assert cache.get("a") == (True, {"sessions": 1})
+
+    clock.now += 61
+    assert cache.get("a") == (False, None)
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+    assert cache.stats.expirations == 1
+    assert len(cache) == 0
+
+
+@pytest.mark.unit
+def test_response_cache_lru_eviction_by_count_and_bytes():
+    """Least recently used entries are evicted when a bound is exceeded."""
+    cache = ResponseCache(max_entries=2, max_bytes=1024)
+    cache.set("a", {"v": 1}, ttl=60)
+    cache.set("b", {"v": 2}, ttl=60)
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", {"v": 3}, ttl=60)
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a")[0] and cache.get("c")[0]
+    assert cache.stats.evictions == 1
+
+    byte_bound = ResponseCache(max_entries=10, max_bytes=40)
+    byte_bound.set("x", {"payload": "x" * 10}, ttl=60)
+    byte_bound.set("y", {"payload": "y" * 10}, ttl=60)
+    assert len(byte_bound) == 1
+    assert byte_bound.total_bytes <= 40
+    assert not byte_bound.set("huge", {"payload": "z" * 100}, ttl=60)
+
+
+@pytest.mark.asyncio
+async def test_cached_payloads_cannot_be_changed_by_callers(isolated_deps):
+    """Every read decodes its own copy, so mutating a result leaves the cache intact."""
+    cache = ResponseCache(max_entries=4, max_bytes=1024)
+    cache.set("a", {"pages": [{"path": "/"}]}, ttl=60)
+    hit, value = cache.get("a")
+    value["pages"].append({"path": "/changed"})
+    assert cache.get("a") == (True, {"pages": [{"path": "/"}]})
+    assert cache.get_stale("a")[1] is not cache.get_stale("a")[1]
+
+    deps = isolated_deps(cache_ttl=300)
+    first = await deps.fetch_ga_data("/api/summary", {"dateRange": "7days"})
+    first["metrics"]["sessions"] = 0
+    second = await deps.fetch_ga_data("/api/summary", {"dateRange": "7days"})
+    assert second == {"metrics": {"sessions": 1000}}
+    assert deps._request_ga_data.call_count == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_fetch_ga_data_serves_repeat_requests_from_cache(isolated_deps):
+    """Repeated identical fetches only reach the MCP server once."""
+    deps = isolated_deps(cache_ttl=300)
+
+    first = await deps.fetch_ga_data("/api/summary", {"dateRange": "7days"})
+    second = await deps.fetch_ga_data("/api/summary", {"dateRange": "7days"})
+    await deps.fetch_ga_data("/api/summary", {"dateRange": "30days"})
+
+    assert first == second
+    assert deps._request_ga_data.call_count == 2
+    stats = deps.cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_fetch_ga_data_cache_disabled_with_zero_ttl(isolated_deps):
+    """A cache_ttl of 0 bypasses the cache entirely."""
+    deps = isolated_deps(cache_ttl=0)
+
+    await deps.fetch_ga_data("/api/summary")
+    await deps.fetch_ga_data("/api/summary")
+
+    assert deps._request_ga_data.call_count == 2
+    assert len(deps.cache) == 0
+
+
+@pytest.mark.unit
+def test_with_session_shares_cache(isolated_deps):
+    """Session copies reuse the parent's response cache."""
+    deps = isolated_deps()
+    session_deps = deps.with_session("session-1")
+    assert session_deps.cache is deps.cache
+
+
+@pytest.mark.unit
+def test_shared_cache_payload_round_trip():
+    """Large payloads are compressed and decode back to the same value."""
+    small = {"metrics": {"sessions": 10}}
+    large = {"pages": [{"path": f"/page-{i}", "views": i} for i in range(200)]}
+
+    small_blob = encode_payload(small, expires_at=123.0)
+    large_blob = encode_payload(large, expires_at=456.0)
+
+    assert small_blob.startswith(b"j")
+    assert large_blob.startswith(b"z")
+    assert decode_payload(small_blob) == (small, 123.0)
+    assert decode_payload(large_blob) == (large, 456.0)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_shared_cache_serves_other_workers(isolated_deps):
+    """A response fetched by one worker is served to another from Redis."""
+    fakeredis = pytest.importorskip("fakeredis")
+    redis_client = fakeredis.FakeAsyncRedis()
+    shared = RedisCacheTier(url="redis://fake", client=redis_client)
+
+    worker_a = isolated_deps(shared_cache=shared, cache_ttl=300)
+    worker_b = isolated_deps(shared_cache=shared, cache_ttl=300)
+
+    await worker_a.fetch_ga_data("/api/pages", {"dateRange": "7days"})
+    data = await worker_b.fetch_ga_data("/api/pages", {"dateRange": "7days"})
+
+    assert data == {"metrics": {"sessions": 1000}}
+    worker_b._request_ga_data.assert_not_called()
+    assert shared.hits == 1
+    assert 0 < await redis_client.pttl("ga-agent:" + make_cache_key("/api/pages", normalize_date_params("/api/pages", {"dateRange": "7days"}))) <= 300_000
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_shared_cache_unreachable_falls_back(isolated_deps):
+    """Redis errors fall back to the in-process path and back off."""
+    failing_client = AsyncMock()
+    failing_client.get.side_effect = ConnectionError("connection refused")
+    shared = RedisCacheTier(url="redis://unreachable", client=failing_client, retry_interval=60)
+
+    deps = isolated_deps(shared_cache=shared, cache_ttl=300)
+    data = await deps.fetch_ga_data("/api/summary")
+    await deps.fetch_ga_data("/api/summary", {"dateRange": "7days"})
+
+    assert data == {"metrics": {"sessions": 1000}}
+    assert deps._request_ga_data.call_count == 2
+    assert shared.errors == 1
+    assert failing_client.get.call_count == 1  # Backing off after the first failure
+    assert not shared.available
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_http_pool_reuses_client_across_dependencies():
+    """Every dependencies instance and session copy shares one pooled client."""
+    import http_pool
+
+    pool = HTTPClientPool(max_connections=5, max_keepalive_connections=2, keepalive_expiry=10, http2=False)
+    original_pool = http_pool._http_pool
+    http_pool._http_pool = pool
+    try:
+        deps_a = GAAnalyticsDependencies(ga_server_url="http://localhost:3000")
+        deps_b = GAAnalyticsDependencies.from_settings(ga_server_url="http://localhost:3000")
+        session_deps = deps_a.with_session("session-1")
+
+        client = deps_a.http_client
+        assert deps_b.http_client is client
+        assert session_deps.http_client is client
+        assert len(pool) == 1
+
+        # Cleanup leaves the shared pool open for the next query
+        await deps_a.cleanup()
+        assert not client.is_closed
+
+        await pool.aclose()
+        assert client.is_closed
+        assert deps_b.http_client is not client
+    finally:
+        await pool.aclose()
+        http_pool._http_pool = original_pool
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_http_pool_lifecycle_hooks():
+    """Startup pre-creates the client and shutdown closes it."""
+    import http_pool
+
+    original_pool = http_pool._http_pool
+    http_pool._http_pool = None
+    try:
+        pool = await http_pool.startup_http_pool("http://localhost:3000")
+        client = pool.get_client("http://localhost:3000")
+        assert pool.limits.max_connections == pool.max_connections
+
+        await http_pool.shutdown_http_pool()
+        assert client.is_closed
+        assert http_pool._http_pool is None
+    finally:
+        http_pool._http_pool = original_pool
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_single_flight_coalesces_identical_fetches(isolated_deps):
+    """Concurrent identical fetches share one MCP request."""
+    import asyncio
+
+    deps = isolated_deps(cache_ttl=0)
+    release = asyncio.Event()
+
+    async def slow_request(endpoint, params=None):
+        await release.wait()
+        return {"endpoint": endpoint, "params": params}
+
+    deps._request_ga_data = AsyncMock(side_effect=slow_request)
+
+    callers = [
+        asyncio.ensure_future(deps.fetch_ga_data("/api/summary", {"dateRange": "7days"}))
+        for _ in range(5)
+    ]
+    other = asyncio.ensure_future(deps.fetch_ga_data("/api/pages", {"dateRange": "7days"}))
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*callers, other)
+
+    assert all(result == results[0] for result in results[:5])
+    assert deps._request_ga_data.call_count == 2
+    stats = deps.request_stats()["single_flight"]
+    assert stats == {"executions": 2, "coalesced": 4, "in_flight": 0}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_single_flight_survives_caller_cancellation():
+    """Cancelling the first caller does not cancel the shared request."""
+    import asyncio
+
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return "done"
+
+    leader = asyncio.ensure_future(flight.do("key", work))
+    follower = asyncio.ensure_future(flight.do("key", work))
+    await asyncio.sleep(0)
+    leader.cancel()
+    release.set()
+
+    assert await follower == "done"
+    assert flight.executions == 1
+    assert flight.coalesced == 1
+    assert not flight.in_flight("key")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_rate_limiter_queues_instead_of_failing():
+    """Requests beyond the quota wait for a refill rather than erroring."""
+    limiter = TokenBucketRateLimiter(rate_limit=2, window=0.2)
+
+    assert await limiter.acquire() == 0.0
+    assert await limiter.acquire() == 0.0
+    waited = await limiter.acquire()
+
+    assert waited > 0.05
+    stats = limiter.stats_snapshot()
+    assert stats["acquired"] == 3
+    assert stats["queued"] == 1
+    assert stats["max_wait"] == pytest.approx(waited, abs=0.01)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_rate_limiter_serves_interactive_before_background():
+    """Queued cache-miss traffic is released ahead of background traffic."""
+    import asyncio
+
+    limiter = TokenBucketRateLimiter(rate_limit=1, window=0.05)
+    await limiter.acquire()
+    order = []
+
+    async def request(name, priority, key=None):
+        await limiter.acquire(priority, key=key)
+        order.append(name)
+
+    background = asyncio.ensure_future(request("background", PRIORITY_BACKGROUND))
+    promoted = asyncio.ensure_future(request("promoted", PRIORITY_BACKGROUND, key="k"))
+    await asyncio.sleep(0)
+    interactive = asyncio.ensure_future(request("interactive", PRIORITY_INTERACTIVE))
+    await asyncio.sleep(0)
+    assert limiter.promote("k")
+    await asyncio.gather(background, promoted, interactive)
+
+    assert order == ["promoted", "interactive", "background"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_fetch_ga_data_reports_rate_limit_wait(isolated_deps):
+    """Each outbound request records its rate limiter wait time."""
+    deps = isolated_deps(cache_ttl=0, api_rate_limit=1, api_rate_window=1)
+    limiter = TokenBucketRateLimiter(rate_limit=1, window=0.1)
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(type(deps), "rate_limiter", property(lambda self: limiter))
+        await deps.fetch_ga_data("/api/summary")
+        await deps.fetch_ga_data("/api/pages")
+
+    assert [endpoint for endpoint, _ in deps.rate_limit_waits] == ["/api/summary", "/api/pages"]
+    assert deps.rate_limit_waits[0][1] == 0.0
+    assert deps.rate_limit_waits[1][1] > 0
+    assert deps._request_ga_data.call_count == 2
+
+
+@pytest.mark.unit
+def test_circuit_breaker_opens_on_failure_rate_and_recovers(fake_clock):
+    """The circuit opens on a high failure rate, then closes after a successful probe."""
+    clock = fake_clock
+    breaker = CircuitBreaker(
+        failure_rate_threshold=0.5, minimum_calls=4, open_seconds=30, slow_call_seconds=5, clock=clock
+    )
+    changes = []
+    breaker.add_listener(lambda name, old, new, reason: changes.append((old, new)))
+
+    breaker.record_success(0.1)
+    breaker.record_failure(0.1)
+    breaker.record_failure(0.1)
+    assert breaker.state == CIRCUIT_CLOSED  # Below minimum_calls
+    breaker.record_success(0.1)
+    assert breaker.state == CIRCUIT_OPEN
+    assert not breaker.allow_request()
+    assert breaker.retry_after == 30
+
+    clock.now += 30
+    assert breaker.allow_request()
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    assert not breaker.allow_request()  # Only one probe at a time
+    breaker.record_success(0.2)
+
+    assert breaker.state == CIRCUIT_CLOSED
+    assert changes == [
+        (CIRCUIT_CLOSED, CIRCUIT_OPEN),
+        (CIRCUIT_OPEN, CIRCUIT_HALF_OPEN),
+        (CIRCUIT_HALF_OPEN, CIRCUIT_CLOSED),
+    ]
+    assert breaker.stats_snapshot()["rejected"] == 2
+
+
+@pytest.mark.unit
+def test_circuit_breaker_opens_on_slow_calls(fake_clock):
+    """Mostly slow successes open the circuit, and a slow probe reopens it."""
+    clock = fake_clock
+    breaker = CircuitBreaker(
+        slow_call_seconds=2, slow_call_rate_threshold=0.75, minimum_calls=4, open_seconds=10, clock=clock
+    )
+    for latency in (3, 3, 3, 0.1):
+        breaker.record_success(latency)
+    assert breaker.state == CIRCUIT_OPEN
+
+    clock.now += 10
+    assert breaker.allow_request()
+    breaker.record_success(4)
+    assert breaker.state == CIRCUIT_OPEN
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_or_serves_stale(isolated_deps, fake_clock):
+    """While the circuit is open, requests skip the server and use stale data if any."""
+    clock = fake_clock
+    cache = ResponseCache(max_entries=16, max_bytes=1024 * 1024, max_stale=600, clock=clock)
+    deps = isolated_deps(cache=cache, cache_ttl=60)
+    await deps.fetch_ga_data("/api/summary", {"dateRange": "7days"})
+
+    deps._request_ga_data.side_effect = GAFetchError("unavailable", endpoint="/api/pages", kind="http", status_code=503)
+    for _ in range(4):
+        with pytest.raises(GAFetchError):
+            await deps.fetch_ga_data("/api/pages", {"dateRange": "7days"})
+    assert deps.circuit_breaker.state == CIRCUIT_OPEN
+    calls = deps._request_ga_data.await_count
+
+    with pytest.raises(CircuitOpenError) as exc_info:
+        await deps.fetch_ga_data("/api/pages", {"dateRange": "7days"})
+    assert exc_info.value.retry_after > 0
+    assert not exc_info.value.retryable
+
+    clock.now += 120  # Summary entry is now expired but within max_stale
+    result = await deps.fetch_ga_data("/api/summary", {"dateRange": "7days"})
+    assert result == {"metrics": {"sessions": 1000}}
+    assert deps._request_ga_data.await_count == calls
+    assert deps.request_stats()["circuit_breaker"]["state"] == CIRCUIT_OPEN
+
+
+@pytest.mark.asyncio
+async def test_client_errors_do_not_open_circuit(isolated_deps):
+    """4xx responses mean the server is healthy and do not count as failures."""
+    deps = isolated_deps()
+    deps._request_ga_data.side_effect = GAFetchError("bad request", endpoint="/api/pages", kind="http", status_code=400)
+    for _ in range(6):
+        with pytest.raises(GAFetchError):
+            await deps.fetch_ga_data("/api/pages", {"dateRange": "7days"})
+    assert deps.circuit_breaker.state == CIRCUIT_CLOSED
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_serves_stale_and_refreshes_once(isolated_deps, fake_clock):
+    """Expired dashboard entries are returned immediately and refreshed in one background task."""
+    clock = fake_clock
+    cache = ResponseCache(max_entries=16, max_bytes=1024 * 1024, max_stale=3600, clock=clock)
+    deps = isolated_deps(cache=cache, cache_ttl=60, stale_while_revalidate=300)
+    await deps.fetch_ga_data("/api/summary", {"dateRange": "7days"})
+
+    release = asyncio.Event()
+
+    async def slow_refresh(endpoint, params=None):
+        await release.wait()
+        return {"metrics": {"sessions": 2000}}
+
+    deps._request_ga_data = AsyncMock(side_effect=slow_refresh)
+    clock.now += 120
+    results = await asyncio.gather(*[
+        deps.fetch_ga_data("/api/summary", {"dateRange": "7days"}) for _ in range(3)
+    ])
+
+    assert results == [{"metrics": {"sessions": 1000}}] * 3
+    assert deps.request_stats()["background_refreshes"] == 1
+
+    release.set()
+    await drain_background_refreshes()
+    assert deps._request_ga_data.await_count == 1
+    assert await deps.fetch_ga_data("/api/summary", {"dateRange": "7days"}) == {"metrics": {"sessions": 2000}}
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_respects_bound_and_endpoint(isolated_deps, fake_clock):
+    """Entries past the staleness bound, and non-dashboard endpoints, wait for fresh data."""
+    clock = fake_clock
+    cache = ResponseCache(max_entries=16, max_bytes=1024 * 1024, max_stale=3600, clock=clock)
+    deps = isolated_deps(cache=cache, cache_ttl=60, stale_while_revalidate=300)
+    await deps.fetch_ga_data("/api/traffic", {"dateRange": "7days"})
+    await deps.fetch_ga_data("/api/realtime")
+
+    deps._request_ga_data = AsyncMock(return_value={"fresh": True})
+    clock.now += 120
+    assert await deps.fetch_ga_data("/api/realtime") == {"fresh": True}
+
+    clock.now += 600
+    assert await deps.fetch_ga_data("/api/traffic", {"dateRange": "7days"}) == {"fresh": True}
+    assert deps._request_ga_data.await_count == 2
+
+
+@pytest.mark.unit
+def test_resolve_date_range_matches_server_aliases():
+    """Aliases resolve to the same absolute dates as the MCP server."""
+    today = date(2024, 2, 29)
+    assert resolve_date_range("today", today) == resolve_date_range("TODAY", today)
+    assert resolve_date_range("yesterday", today).start == date(2024, 2, 28)
+    assert resolve_date_range("7days", today).start == date(2024, 2, 22)
+    assert resolve_date_range("12months", today).start == date(2023, 3, 1)
+    assert resolve_date_range("alltime", today).start == date(2020, 1, 1)
+    assert resolve_date_range("bogus", today) == resolve_date_range("30days", today)
+    assert resolve_date_range(None, today).days == 31
+
+
+@pytest.mark.unit
+def test_freshness_policy_ttl_tiers():
+    """TTL depends on whether the requested window can still change."""
+    policy = FreshnessPolicy(
+        live_ttl=300,
+        realtime_ttl=5,
+        recent_ttl=3600,
+        historical_ttl=604800,
+        settle_days=0,
+        now=lambda: datetime(2024, 6, 10, 6, 0, tzinfo=timezone.utc)
+    )
+    assert policy.ttl_for("/api/realtime") == 5
+    assert policy.ttl_for("/api/summary", {"dateRange": "2years"}) == 300
+    # Closed ranges keyed by alias expire when the alias shifts at midnight UTC
+    assert policy.ttl_for("/api/summary", {"dateRange": "yesterday"}) == 18 * 3600
+
+    policy.settle_days = 3
+    policy.now = lambda: datetime(2024, 6, 10, 23, 0, tzinfo=timezone.utc)
+    assert policy.ttl_for("/api/summary", {"dateRange": "yesterday"}) == 3600
+
+
+@pytest.mark.unit
+def test_parse_date_range_canonicalizes_spellings():
+    """Alias spellings and explicit pairs resolve to one window; unknown ranges raise."""
+    today = date(2024, 6, 10)
+    seven_days = parse_date_range("7days", today)
+    for spelling in ("last7days", "past_7_days", "Last 7 Days", "7d", "1 week", "2024-06-03..2024-06-10"):
+        assert parse_date_range(spelling, today) == seven_days
+    assert parse_date_range("6months", today).start == date(2023, 12, 10)
+    assert parse_date_range("all_time", today) == parse_date_range("alltime", today)
+
+    with pytest.raises(ValueError):
+        parse_date_range("lastfortnight", today)
+    with pytest.raises(ValueError):
+        parse_date_range("2024-06-10..2024-06-01", today)
+
+
+@pytest.mark.unit
+def test_parse_date_range_resolves_calendar_periods():
+    """Calendar periods cover whole weeks, months, quarters and years, not rolling windows."""
+    today = date(2024, 5, 16)  # Thursday
+    assert parse_date_range("this week", today) == DateWindow(date(2024, 5, 13), today)
+    assert parse_date_range("last week", today) == DateWindow(date(2024, 5, 6), date(2024, 5, 12))
+    assert parse_date_range("this month", today) == DateWindow(date(2024, 5, 1), today)
+    assert parse_date_range("last_month", today) == DateWindow(date(2024, 4, 1), date(2024, 4, 30))
+    assert parse_date_range("last quarter", today) == DateWindow(date(2024, 1, 1), date(2024, 3, 31))
+    assert parse_date_range("this year", today) == DateWindow(date(2024, 1, 1), today)
+    assert parse_date_range("previous year", today) == DateWindow(date(2023, 1, 1), date(2023, 12, 31))
+    assert parse_date_range("last month", date(2024, 1, 5)) == DateWindow(date(2023, 12, 1), date(2023, 12, 31))
+
+
+@pytest.mark.unit
+def test_normalize_date_params_uses_endpoint_defaults():
+    """Params carry absolute dates, with per-endpoint defaults and no dates for realtime."""
+    today = date(2024, 6, 10)
+    assert normalize_date_params("/api/pages", {"dateRange": "last7days", "limit": 5}, today) == {
+        "startDate": "2024-06-03", "endDate": "2024-06-10", "limit": 5
+    }
+    assert normalize_date_params("/api/daily-traffic", None, today)["startDate"] == "2024-05-27"
+    assert normalize_date_params("/api/summary", {}, today)["startDate"] == "2024-05-11"
+    assert normalize_date_params("/api/realtime", {"dateRange": "7days"}, today) == {}
+    with pytest.raises(ValueError):
+        normalize_date_params("/api/summary", {"startDate": "2024-06-01"}, today)
+
+
+@pytest.mark.asyncio
+async def test_equivalent_date_ranges_share_one_fetch(isolated_deps):
+    """"last7days", "7days" and the equivalent explicit pair hit GA once."""
+    deps = isolated_deps(cache_ttl=300)
+    window = parse_date_range("7days")
+
+    await deps.fetch_ga_data("/api/summary", {"dateRange": "last7days"})
+    await deps.fetch_ga_data("/api/summary", {"dateRange": "7days"})
+    await deps.fetch_ga_data("/api/summary", window.to_params())
+
+    deps._request_ga_data.assert_awaited_once_with("/api/summary", window.to_params())
@@ -0,0 +1,154 @@
+"""Test the local GA snapshot history store."""
+
+import pytest
+from datetime import date, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agent import update_history
+from date_ranges import DateWindow
+from history import HistoryStore, aggregate_rows, backfill_history, split_rows
+from rollups import RollupStore, decompose
+
+
+def day_payloads(sessions):
+    """MCP server payloads for one day, keyed by endpoint."""
+    return {
+        "/api/summary": {"metrics": {"sessions": sessions, "activeUsers": sessions // 2, "bounceRate": 40.0}},
+        "/api/pages": {"pages": [
+            {"path": "/", "title": "Home", "views": sessions * 2, "users": sessions, "avgDuration": 30.0, "bounceRate": 50.0},
+        ]},
+        "/api/traffic": {"sources": [{"source": "Organic Search", "medium": "channel_group", "sessions": sessions}]},
+        "/api/devices": {"devices": [
+            {"deviceCategory": "mobile", "operatingSystem": "iOS", "browser": "Safari", "sessions": sessions},
+        ]},
+    }
+
+
+@pytest.mark.unit
+def test_split_and_aggregate_rows():
+    """Rows are keyed by dimension; counts sum and rates are weighted."""
+    rows = split_rows("devices", day_payloads(10)["/api/devices"])
+    assert rows == {"mobile|iOS|Safari": {"sessions": 10}}
+
+    combined = aggregate_rows([
+        {"sessions": 100, "bounceRate": 20.0},
+        {"sessions": 300, "bounceRate": 60.0},
+    ])
+    assert combined == {"sessions": 400, "bounceRate": 50.0}
+
+
+@pytest.mark.asyncio
+async def test_history_store_range_queries(tmp_path):
+    """Snapshots are read back by date range and dimension, and replaced on re-record."""
+    store = HistoryStore(path=str(tmp_path / "history.sqlite"), property_id="123", settle_days=2)
+    for day, sessions in ((date(2024, 6, 1), 100), (date(2024, 6, 2), 300), (date(2024, 6, 3), 50)):
+        await store.record("summary", day, day_payloads(sessions)["/api/summary"], fetched_on=date(2024, 6, 4))
+    await store.record("summary", date(2024, 6, 3), day_payloads(70)["/api/summary"], fetched_on=date(2024, 6, 5))
+
+    window = DateWindow(date(2024, 6, 1), date(2024, 6, 2))
+    assert await store.series("summary", "sessions", window) == [("2024-06-01", 100), ("2024-06-02", 300)]
+    assert (await store.aggregate("summary", window))[""]["sessions"] == 400
+
+    full = DateWindow(date(2024, 6, 1), date(2024, 6, 3))
+    assert (await store.aggregate("summary", full))[""]["sessions"] == 470
+    assert await store.final_days("summary", full) == [date(2024, 6, 1), date(2024, 6, 2), date(2024, 6, 3)]
+
+    other_property = HistoryStore(path=str(tmp_path / "history.sqlite"), property_id="456")
+    assert await other_property.rows("summary", full) == []
+    await store.close()
+    await other_property.close()
+
+
+@pytest.mark.asyncio
+async def test_backfill_history_captures_only_missing_days(tmp_path):
+    """Backfill fetches single-day reports for days without a settled snapshot."""
+    store = HistoryStore(path=str(tmp_path / "history.sqlite"), settle_days=0)
+    deps = AsyncMock()
+    deps.fetch_ga_data.side_effect = lambda endpoint, params: day_payloads(10)[endpoint]
+    window = DateWindow(date(2024, 6, 1), date(2024, 6, 3))
+
+    await store.record("summary", date(2024, 6, 2), day_payloads(10)["/api/summary"])
+    captured = await backfill_history(deps, store, window, reports=["summary", "pages"])
+    assert captured == [date(2024, 6, 1), date(2024, 6, 2), date(2024, 6, 3)]  # Jun 2 lacks pages
+
+    assert await backfill_history(deps, store, window, reports=["summary", "pages"]) == []
+    deps.fetch_ga_data.assert_any_await("/api/pages", {"limit": 100, "startDate": "2024-06-01", "endDate": "2024-06-01"})
+    pages = await store.aggregate("pages", window, dimension="/")
+    assert pages["/"]["views"] == 60
+    await store.close()
+
+
+
+@pytest.mark.asyncio
+async def test_update_history_backfills_and_captures(tmp_path):
+    """The history command fills the store the get_metric_history tool reads."""
+    store = HistoryStore(path=str(tmp_path / "history.sqlite"), settle_days=0)
+    deps = MagicMock()
+    deps.history = store
+    deps.fetch_ga_data = AsyncMock(side_effect=lambda endpoint, params: day_payloads(10)[endpoint])
+    deps.cleanup = AsyncMock()
+
+    with patch('agent.GAAnalyticsDependencies.from_settings', return_value=deps):
+        result = await update_history("backfill", "2024-06-01..2024-06-03")
+        assert result["captured"] == ["2024-06-01", "2024-06-02", "2024-06-03"]
+        assert (await update_history("backfill", "2024-06-01..2024-06-03"))["captured"] == []
+        assert (await update_history("capture", "2024-06-02..2024-06-02"))["captured"] == ["2024-06-02"]
+        with pytest.raises(ValueError):
+            await update_history("purge", "7days")
+
+    window = DateWindow(date(2024, 6, 1), date(2024, 6, 3))
+    assert (await store.aggregate("summary", window))[""]["sessions"] == 30
+    assert deps.cleanup.await_count == 3
+    await store.close()
+
+    deps.history = None
+    with patch('agent.GAAnalyticsDependencies.from_settings', return_value=deps):
+        with pytest.raises(ValueError, match="HISTORY_DB_PATH"):
+            await update_history()
+
+
+@pytest.mark.unit
+def test_decompose_uses_coarsest_buckets():
+    """Windows are covered by full months, then full weeks, then edge days."""
+    pieces = decompose(DateWindow(date(2024, 1, 30), date(2024, 3, 12)))
+    assert [(level, bucket.start.isoformat(), bucket.days) for level, bucket in pieces] == [
+        ("day", "2024-01-30", 1),
+        ("day", "2024-01-31", 1),
+        ("month", "2024-02-01", 29),
+        ("day", "2024-03-01", 1),
+        ("day", "2024-03-02", 1),
+        ("day", "2024-03-03", 1),
+        ("week", "2024-03-04", 7),
+        ("day", "2024-03-11", 1),
+        ("day", "2024-03-12", 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_rollups_serve_long_ranges_and_update_incrementally(tmp_path):
+    """Aggregates from rollups match daily data and follow newly recorded days."""
+    store = RollupStore(path=str(tmp_path / "history.sqlite"))
+    day = date(2024, 1, 1)
+    while day <= date(2024, 3, 31):
+        await store.record("summary", day, {"metrics": {"sessions": 10, "bounceRate": 40.0}})
+        day += timedelta(days=1)
+
+    window = DateWindow(date(2024, 1, 15), date(2024, 3, 31))
+    combined = (await store.aggregate("summary", window))[""]
+    assert combined == {"sessions": 10 * window.days, "bounceRate": 40.0}
+    assert combined == (await HistoryStore.aggregate(store, "summary", window))[""]
+
+    months = await store.bucketed("summary", DateWindow(date(2024, 1, 1), date(2024, 3, 31)), "month")
+    assert [(row["period_start"], row["sessions"]) for row in months] == [
+        ("2024-01-01", 310), ("2024-02-01", 290), ("2024-03-01", 310),
+    ]
+
+    await store.record("summary", date(2024, 2, 10), {"metrics": {"sessions": 110, "bounceRate": 40.0}})
+    february = await store.rollup_rows("summary", "month", DateWindow(date(2024, 2, 1), date(2024, 2, 1)))
+    assert february[0]["sessions"] == 390
+    assert (await store.aggregate("summary", window))[""]["sessions"] == 10 * window.days + 100
+    await store.close()
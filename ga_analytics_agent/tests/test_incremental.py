@@ -0,0 +1,71 @@
+"""Test incremental fetching of daily GA reports."""
+
+import pytest
+from datetime import date, timedelta
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from date_ranges import DateWindow
+from incremental import DailyRowStore, fetch_daily_window, missing_spans
+
+
+class FakeDailyDeps:
+    """Serves one row per requested day, skipping days listed as without traffic."""
+
+    def __init__(self, quiet_days=()):
+        self.requests = []
+        self.quiet_days = set(quiet_days)
+
+    async def fetch_ga_data(self, endpoint, params=None):
+        self.requests.append((endpoint, params))
+        day = date.fromisoformat(params["startDate"])
+        end = date.fromisoformat(params["endDate"])
+        rows = []
+        while day <= end:
+            if day not in self.quiet_days:
+                rows.append({"rawDate": day.strftime("%Y%m%d"), "users": 10, "pageViews": 30, "sessions": 12})
+            day += timedelta(days=1)
+        return {"dailyData": rows}
+
+
+@pytest.mark.unit
+def test_missing_spans_merges_small_gaps():
+    """Nearby missing days are fetched together; distant runs stay separate."""
+    days = [date(2024, 6, 1), date(2024, 6, 2), date(2024, 6, 5), date(2024, 6, 30)]
+    assert missing_spans(days, merge_gap=3) == [
+        DateWindow(date(2024, 6, 1), date(2024, 6, 5)),
+        DateWindow(date(2024, 6, 30), date(2024, 6, 30)),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_rolling_window_only_fetches_new_and_unsettled_days():
+    """The next day's window reuses settled rows and refetches only the tail."""
+    store = DailyRowStore(settle_days=2)
+    deps = FakeDailyDeps(quiet_days={date(2024, 5, 20)})
+
+    first = await fetch_daily_window(deps, "30days", store=store, today=date(2024, 6, 10))
+    assert first["incremental"] == {"requests": 1, "fetched_days": 31, "reused_days": 0}
+    assert first["totals"] == {"pageViews": 900, "sessions": 360}  # Daily users are not unique users
+    assert len(first["dailyData"]) == 31
+
+    second = await fetch_daily_window(deps, "30days", store=store, today=date(2024, 6, 11))
+    # Jun 9 and Jun 10 were fetched too early to be final, Jun 11 is new
+    assert deps.requests[-1] == ("/api/daily-traffic", {"startDate": "2024-06-09", "endDate": "2024-06-11"})
+    assert second["incremental"] == {"requests": 1, "fetched_days": 3, "reused_days": 28}
+    assert second["dailyData"][0]["rawDate"] == "20240512"
+    assert second["dailyData"][-1]["rawDate"] == "20240611"
+    assert second["totals"]["sessions"] == 360
+
+
+@pytest.mark.asyncio
+async def test_daily_window_series_are_kept_per_filter():
+    """Different report parameters do not share stored rows."""
+    store = DailyRowStore(settle_days=0)
+    deps = FakeDailyDeps()
+    await fetch_daily_window(deps, "7days", params={"pagePathFilter": "/blog"}, store=store, today=date(2024, 6, 10))
+    await fetch_daily_window(deps, "7days", store=store, today=date(2024, 6, 10))
+    await fetch_daily_window(deps, "7days", store=store, today=date(2024, 6, 10))
+    assert len(deps.requests) == 2
@@ -0,0 +1,85 @@
+"""Test the indexed insight rule registry."""
+
+import pytest
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from insights import DEFAULT_RULES, InsightRuleSet
+
+
+def make_insight(title):
+    return {
+        "insight_type": "trend",
+        "title": title,
+        "description": title,
+        "impact": "",
+        "action_items": [],
+        "priority": "low",
+    }
+
+
+@pytest.mark.unit
+def test_only_rules_for_present_sections_and_fields_run():
+    """Rules are skipped when their section or any declared field is missing."""
+    rules = InsightRuleSet()
+    calls = []
+
+    @rules.rule("traffic_rule", fields=("traffic.sessions",))
+    def traffic_rule(data):
+        calls.append("traffic")
+        return make_insight("traffic")
+
+    @rules.rule("device_rule", fields=("devices.desktop.conversion_rate", "traffic.sessions"))
+    def device_rule(data):
+        calls.append("devices")
+        return None
+
+    @rules.rule("pages_rule", fields=("pages.bounce_rate",))
+    def pages_rule(data):
+        calls.append("pages")
+        return make_insight("pages")
+
+    assert [rule.name for rule in rules.candidates({"traffic": {}})] == ["traffic_rule"]
+    assert rules.evaluate({"traffic": {"users": 10}}) == []
+
+    results = rules.evaluate({
+        "devices": {"desktop": {"conversion_rate": 2.0}},
+        "traffic": {"sessions": 10},
+        "pages": [{"path": "/"}, {"path": "/pricing", "bounce_rate": 90}],
+    })
+    assert [result["title"] for result in results] == ["traffic", "pages"]
+    assert calls == ["traffic", "devices", "pages"]
+
+    stats = rules.stats()
+    assert stats["traffic_rule"]["calls"] == 1 and stats["traffic_rule"]["fired"] == 1
+    assert stats["device_rule"]["calls"] == 1 and stats["device_rule"]["fired"] == 0
+    assert stats["pages_rule"]["total_ms"] >= 0
+
+
+@pytest.mark.unit
+def test_rules_can_be_replaced_and_removed():
+    """Registering a name again replaces the rule; unregistering drops its index entry."""
+    rules = InsightRuleSet()
+    rules.register("rule", ("traffic.sessions",), lambda data: make_insight("first"))
+    rules.register("rule", ("pages.views",), lambda data: make_insight("second"))
+    assert len(rules) == 1
+    assert rules.evaluate({"traffic": {"sessions": 1}}) == []
+    assert rules.evaluate({"pages": [{"views": 1}]})[0]["title"] == "second"
+
+    rules.unregister("rule")
+    assert rules.candidates({"pages": []}) == []
+    with pytest.raises(ValueError):
+        rules.register("empty", (), lambda data: None)
+
+
+@pytest.mark.unit
+def test_default_rules_match_legacy_thresholds():
+    """The built-in rules keep the original generate_insights conditions."""
+    results = DEFAULT_RULES.evaluate({
+        "traffic": {"direct_traffic_percentage": 50},
+        "devices": {"mobile": {"conversion_rate": 1.0}},
+        "conversions": {"trend": "declining"},
+    })
+    assert [result["title"] for result in results] == ["Declining Conversion Rate Trend"]
@@ -86,6 +86,56 @@ async def test_dashboard_summary_integration(sample_ga_data):
         mock_deps.cleanup.assert_called_once()
 
 
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_dashboard_summary_partial_results(sample_ga_data):
+    """Test dashboard sections are fetched concurrently with per-section deadlines."""
+    import asyncio
+    
+    with patch('agent.GAAnalyticsDependencies.from_settings') as mock_deps_factory:
+        mock_deps = AsyncMock()
+        mock_deps.cache_ttl = 300
+        mock_deps.cleanup = AsyncMock()
+        
+        in_flight = 0
+        max_in_flight = 0
+        
+        async def mock_fetch_response(endpoint, params=None):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            try:
+                if endpoint == "/api/traffic":
+                    await asyncio.sleep(1)  # Exceeds the section deadline
+                if endpoint == "/api/devices":
+                    raise ValueError("GA MCP server error: 500 - backend unavailable")
+                await asyncio.sleep(0.01)
+                return sample_ga_data[endpoint.rsplit("/", 1)[-1]]
+            finally:
+                in_flight -= 1
+        
+        mock_deps.fetch_ga_data = AsyncMock(side_effect=mock_fetch_response)
+        mock_deps_factory.return_value = mock_deps
+        
+        result = await get_dashboard_summary(session_id="dashboard-test", section_timeout=0.1)
+        
+        # Healthy sections still return
+        assert result["summary"] == sample_ga_data["summary"]
+        assert result["pages"] == sample_ga_data["pages"]
+        
+        # Slow and failing sections come back as error markers
+        assert result["traffic"]["status"] == "timeout"
+        assert result["devices"]["status"] == "error"
+        assert "500" in result["devices"]["error"]
+        assert sorted(result["failed_sections"]) == ["devices", "traffic"]
+        
+        # Sections were in flight together and individually timed
+        assert max_in_flight == 4
+        assert set(result["section_timings_ms"]) == {"summary", "traffic", "pages", "devices"}
+        assert result["section_timings_ms"]["traffic"] < 1000
+        mock_deps.cleanup.assert_called_once()
+
+
 @pytest.mark.integration
 @pytest.mark.asyncio
 async def test_proactive_monitoring_workflow():
@@ -0,0 +1,113 @@
+"""Test the deterministic fast path for simple lookups."""
+
+import pytest
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agent import ga_analytics_agent, run_analytics_query
+from answer_cache import AnswerCache
+from date_ranges import parse_date_range
+from intent_router import RoutedQuery, answer_routed, route_query, try_fast_answer
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("query,expected", [
+    ("Sessions last 30 days", RoutedQuery("summary_metric", "/api/summary", "last 30 days", "sessions")),
+    ("What were our page views yesterday?", RoutedQuery("summary_metric", "/api/summary", "yesterday", "pageViews")),
+    ("bounce rate", RoutedQuery("summary_metric", "/api/summary", "30days", "bounceRate")),
+    ("How many new users this week", RoutedQuery("summary_metric", "/api/summary", "this week", "newUsers")),
+    ("Top 5 pages this week", RoutedQuery("top_pages", "/api/pages", "this week", "views", 5)),
+    ("Sessions in the past week", RoutedQuery("summary_metric", "/api/summary", "7days", "sessions")),
+    ("Show me the most viewed pages", RoutedQuery("top_pages", "/api/pages", "30days", "views", 10)),
+    ("top traffic sources in the last quarter", RoutedQuery("top_sources", "/api/traffic", "last quarter", "sessions", 10)),
+])
+def test_routes_simple_lookups(query, expected):
+    """Lookups resolve to an endpoint, period alias, metric and limit."""
+    assert route_query(query) == expected
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("query", [
+    "Why did traffic drop last week?",
+    "Show traffic data",
+    "Get summary data",
+    "Compare sessions this month to last month",
+    "How can we improve our bounce rate?",
+])
+def test_open_ended_questions_fall_through(query):
+    """Anything beyond a plain lookup is left to the agent."""
+    assert route_query(query) is None
+
+
+@pytest.mark.asyncio
+async def test_answers_are_filled_from_ga_data():
+    """Templates format the metric and the ranked rows for the resolved window."""
+    deps = MagicMock()
+    deps.fetch_ga_data = AsyncMock(return_value={"metrics": {"sessions": 12345, "bounceRate": 0.4213}})
+    window = parse_date_range("7days")
+
+    answer = await answer_routed(deps, RoutedQuery("summary_metric", "/api/summary", "7days", "bounceRate"))
+    assert answer == f"Bounce rate ({window.start} to {window.end}): 42.1%."
+    deps.fetch_ga_data.assert_awaited_once_with("/api/summary", window.to_params())
+
+    deps.fetch_ga_data = AsyncMock(return_value={"pages": [
+        {"path": "/", "views": 1200, "users": 800},
+        {"path": "/pricing", "views": 300, "users": 250},
+    ]})
+    answer = await answer_routed(deps, route_query("top 2 pages yesterday"))
+    yesterday = parse_date_range("yesterday").start
+    assert answer == (
+        f"Top 2 pages ({yesterday}):\n"
+        "1. /: 1,200 views, 800 users\n"
+        "2. /pricing: 300 views, 250 users"
+    )
+    assert deps.fetch_ga_data.await_args.args[1]["limit"] == 2
+
+    # Calendar periods are answered for the calendar period, not a rolling window
+    deps.fetch_ga_data = AsyncMock(return_value={"metrics": {"sessions": 900}})
+    last_month = parse_date_range("last month")
+    answer = await answer_routed(deps, route_query("sessions last month"))
+    assert answer == f"Sessions ({last_month.start} to {last_month.end}): 900."
+    assert last_month.start.day == 1 and (last_month.end + timedelta(days=1)).day == 1
+
+
+@pytest.mark.asyncio
+async def test_fetch_failure_falls_back_to_agent():
+    """A failing lookup returns None instead of raising."""
+    deps = MagicMock()
+    deps.fetch_ga_data = AsyncMock(side_effect=RuntimeError("server down"))
+    assert await try_fast_answer(deps, "sessions last week") is None
+    assert await try_fast_answer(deps, "why did sessions drop") is None
+    assert deps.fetch_ga_data.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_run_analytics_query_skips_agent_for_lookups():
+    """Routed conversational lookups never call the LLM; other questions still do."""
+    deps = MagicMock()
+    deps.fetch_ga_data = AsyncMock(return_value={"metrics": {"sessions": 1000}})
+    deps.cleanup = AsyncMock()
+    deps.marketing_goals = []
+    deps.target_audience = None
+    deps.business_type = None
+    result = MagicMock()
+    result.data = "Traffic fell because of a tracking change."
+
+    with patch('agent.GAAnalyticsDependencies.from_settings', return_value=deps), \
+            patch('agent.get_answer_cache', return_value=AnswerCache(ttl=0)), \
+            patch('agent.build_marketing_context', return_value=""), \
+            patch.object(ga_analytics_agent, 'run', new=AsyncMock(return_value=result)) as mock_run:
+        answer = await run_analytics_query("How many sessions last week?")
+        assert answer.startswith("Sessions (") and answer.endswith("1,000.")
+        mock_run.assert_not_awaited()
+
+        assert await run_analytics_query("Why did sessions drop?") == result.data
+        assert mock_run.await_count == 1
+
+        with patch('agent.settings.intent_router_enabled', False):
+            await run_analytics_query("How many sessions last week?")
+        assert mock_run.await_count == 2
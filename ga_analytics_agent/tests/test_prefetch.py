@@ -0,0 +1,92 @@
+"""Test speculative prefetch of GA reports."""
+
+import asyncio
+import pytest
+from unittest.mock import MagicMock, patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agent import fetch_analytics_data, ga_analytics_agent, run_analytics_query
+from answer_cache import AnswerCache
+from prefetch import PrefetchPlan, classify_query, start_prefetch
+
+
+def echo_endpoint(delay=0.0):
+    """Transport answering with the requested endpoint after ``delay`` seconds."""
+    async def request(endpoint, params):
+        await asyncio.sleep(delay)
+        return {"endpoint": endpoint}
+    return request
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("query,expected", [
+    ("Which blog pages did mobile visitors read yesterday?",
+     PrefetchPlan(("/api/summary", "/api/pages"), "yesterday")),
+    ("Where does our organic traffic come from?", PrefetchPlan(("/api/traffic",), "last7days")),
+    ("Desktop vs tablet in the last 90 days", PrefetchPlan(("/api/devices",), "last 90 days")),
+    ("Analyze current GA data for anomalies", PrefetchPlan(("/api/summary",), "last7days")),
+])
+def test_classifies_endpoints_and_period(query, expected):
+    """Keywords pick endpoints in a fixed order; period phrases pick the range."""
+    assert classify_query(query, max_endpoints=2) == expected
+
+
+@pytest.mark.unit
+def test_max_endpoints_zero_disables_prefetch():
+    assert classify_query("top pages by traffic source", max_endpoints=0).endpoints == ()
+
+
+@pytest.mark.asyncio
+async def test_tool_joins_the_prefetched_request(isolated_deps):
+    """The tool's fetch for a prefetched report shares the in-flight request."""
+    deps = isolated_deps(transport=echo_endpoint(0.05))
+    prefetch = start_prefetch(deps, "How did our pages do in the past week?", max_endpoints=2)
+    await asyncio.sleep(0)
+
+    ctx = MagicMock()
+    ctx.deps = deps
+    data = await fetch_analytics_data(ctx, "/api/pages", "7days")
+
+    assert data == {"endpoint": "/api/pages"}
+    assert deps._request_ga_data.await_count == 2  # summary and pages, once each
+    assert deps.single_flight.coalesced == 1
+    await asyncio.gather(*prefetch.tasks)
+
+
+@pytest.mark.asyncio
+async def test_failed_prefetch_is_swallowed(isolated_deps):
+    deps = isolated_deps(transport=RuntimeError("server down"))
+    prefetch = start_prefetch(deps, "device breakdown", max_endpoints=1)
+    await asyncio.gather(*prefetch.tasks)
+    assert prefetch.tasks[0].exception() is None
+
+
+@pytest.mark.asyncio
+async def test_run_analytics_query_prefetches_before_the_model_answers(isolated_deps):
+    """Fetches are already running when the agent starts, and leftovers are cancelled."""
+    deps = isolated_deps(transport=echo_endpoint(0.05))
+    seen_in_flight = []
+
+    async def fake_run(user_prompt, *, deps, **kwargs):
+        await asyncio.sleep(0)
+        seen_in_flight.append(deps.single_flight.stats_snapshot()["in_flight"])
+        result = MagicMock()
+        result.data = "Traffic held steady."
+        return result
+
+    with patch('agent.GAAnalyticsDependencies.from_settings', return_value=deps), \
+            patch('agent.get_answer_cache', return_value=AnswerCache(ttl=3600)) as cache, \
+            patch('agent.build_marketing_context', return_value=""), \
+            patch('prefetch.settings.prefetch_max_endpoints', 2), \
+            patch.object(ga_analytics_agent, 'run', side_effect=fake_run):
+        assert await run_analytics_query("How did traffic sources shift this week?") == "Traffic held steady."
+
+    assert seen_in_flight == [2]
+    # Unused prefetches are not part of the answer's recorded data
+    assert list(cache.return_value._entries.values())[0].reads == {}
+    # The shared requests themselves still complete and fill the cache
+    await asyncio.gather(*deps.single_flight._in_flight.values())
+    assert len(deps.cache) == 2
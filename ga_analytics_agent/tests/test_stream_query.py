@@ -0,0 +1,133 @@
+"""Test streamed analytics answers."""
+
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock, patch
+from pydantic_ai.messages import SystemPrompt
+from pydantic_ai.models.test import TestModel
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agent import fetch_analytics_data, ga_analytics_agent, stream_analytics_query
+from answer_cache import AnswerCache
+from dependencies import GAAnalyticsDependencies
+from prompts import CONVERSATIONAL_PROMPT
+
+
+def fake_run_stream(chunks, error=None):
+    """A run_stream stand-in that calls one tool, then streams text chunks."""
+    @asynccontextmanager
+    async def run_stream(user_prompt, *, deps, **kwargs):
+        ctx = MagicMock()
+        ctx.deps = deps
+        await fetch_analytics_data(ctx, endpoint="/api/summary", date_range="7days")
+
+        async def stream_text(delta=False):
+            for chunk in chunks:
+                yield chunk
+            if error is not None:
+                raise error
+
+        result = MagicMock()
+        result.stream_text = stream_text
+        yield result
+    return run_stream
+
+
+async def collect(query, **kwargs):
+    return [event async for event in stream_analytics_query(query, **kwargs)]
+
+
+@pytest.mark.asyncio
+async def test_streams_tool_events_then_text_chunks(isolated_deps):
+    """Tool calls arrive before the answer, which arrives chunk by chunk and is cached."""
+    deps = isolated_deps()
+    cache = AnswerCache(ttl=3600)
+
+    with patch('agent.GAAnalyticsDependencies.from_settings', return_value=deps), \
+            patch('agent.get_answer_cache', return_value=cache), \
+            patch('agent.build_marketing_context', return_value=""), \
+            patch.object(ga_analytics_agent, 'run_stream', new=fake_run_stream(["Traffic ", "grew ", "12%."])):
+        events = await collect("Why did traffic grow?")
+
+        assert [(event.type, event.tool) for event in events[:2]] == [
+            ("tool_call", "fetch_analytics_data"),
+            ("tool_result", "fetch_analytics_data"),
+        ]
+        assert events[0].args == {"endpoint": "/api/summary", "date_range": "7days"}
+        assert [event.content for event in events[2:]] == ["Traffic ", "grew ", "12%."]
+        deps.cleanup.assert_awaited_once()
+
+        # The complete answer is reused as one chunk
+        events = await collect("why did traffic grow")
+        assert [(event.type, event.content) for event in events] == [("text", "Traffic grew 12%.")]
+
+
+@pytest.mark.asyncio
+async def test_routed_lookups_do_not_start_the_agent(isolated_deps):
+    """Lookups answered by the intent router stream as a single chunk."""
+    deps = isolated_deps()
+    run_stream = MagicMock()
+
+    with patch('agent.GAAnalyticsDependencies.from_settings', return_value=deps), \
+            patch('agent.get_answer_cache', return_value=AnswerCache(ttl=0)), \
+            patch('agent.build_marketing_context', return_value=""), \
+            patch.object(ga_analytics_agent, 'run_stream', new=run_stream):
+        events = await collect("sessions last week")
+
+    assert len(events) == 1 and events[0].content.endswith("1,000.")
+    run_stream.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_run_errors_reach_the_consumer(isolated_deps):
+    """A failing run raises after the chunks already produced, and nothing is cached."""
+    deps = isolated_deps()
+    cache = AnswerCache(ttl=3600)
+    received = []
+
+    with patch('agent.GAAnalyticsDependencies.from_settings', return_value=deps), \
+            patch('agent.get_answer_cache', return_value=cache), \
+            patch('agent.build_marketing_context', return_value=""), \
+            patch.object(ga_analytics_agent, 'run_stream', new=fake_run_stream(["Partial"], RuntimeError("model down"))):
+        with pytest.raises(RuntimeError, match="model down"):
+            async for event in stream_analytics_query("Why did traffic grow?"):
+                received.append(event)
+
+    assert [event.content for event in received if event.type == "text"] == ["Partial"]
+    assert len(cache) == 0
+    deps.cleanup.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_tools_report_nothing_outside_a_stream(isolated_deps):
+    """Tools called by a regular run behave as before."""
+    ctx = MagicMock()
+    ctx.deps = isolated_deps()
+    assert await fetch_analytics_data(ctx, "/api/summary", "7days") == {"metrics": {"sessions": 1000}}
+
+
+@pytest.mark.asyncio
+async def test_streams_through_the_real_agent_with_test_model():
+    """The real run_stream call works end to end, with the mode instructions in the system prompt."""
+    def from_settings(settings_override=None, **kwargs):
+        return GAAnalyticsDependencies(api_rate_limit=0, **kwargs)
+
+    model = TestModel(call_tools=["generate_actionable_insights"], custom_result_text="No issues stand out.")
+    with ga_analytics_agent.override(model=model), \
+            patch('agent.GAAnalyticsDependencies.from_settings', side_effect=from_settings), \
+            patch('agent.get_answer_cache', return_value=AnswerCache(ttl=0)), \
+            patch('prefetch.settings.prefetch_max_endpoints', 0):
+        events = await collect("What should we improve?")
+
+    assert [(event.type, event.tool) for event in events[:2]] == [
+        ("tool_call", "generate_actionable_insights"),
+        ("tool_result", "generate_actionable_insights"),
+    ]
+    assert "".join(event.content for event in events if event.type == "text") == "No issues stand out."
+    system_prompts = [
+        message.content for message in ga_analytics_agent.last_run_messages if isinstance(message, SystemPrompt)
+    ]
+    assert CONVERSATIONAL_PROMPT in system_prompts
@@ -0,0 +1,145 @@
+"""Test one-pass processing of large report row lists."""
+
+import httpx
+import pytest
+from unittest.mock import MagicMock
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from resilience import RetryBudget
+from streaming import P2Quantile, PageStats, RankingSummary, TopK, iter_report_rows
+from tools import summarize_pages
+
+
+def page_rows(count):
+    """Page rows in arbitrary order; every tenth page bounces heavily."""
+    for index in range(count):
+        views = (index * 7919) % count
+        yield {"path": f"/page-{index}", "views": views, "users": 1, "bounceRate": 0.9 if index % 10 == 0 else 0.4}
+
+
+class PagedDeps:
+    """Serves a fixed page list by limit and offset."""
+
+    max_retries = 2
+    retry_base_delay = 0.0
+    retry_max_delay = 0.0
+    debug = False
+
+    def __init__(self, total, fail_at=()):
+        self.rows = list(page_rows(total))
+        self.requests = []
+        self.fail_at = set(fail_at)
+        self.retry_budget = RetryBudget(max_seconds=1.0)
+
+    async def fetch_ga_data(self, endpoint, params=None):
+        if params["offset"] in self.fail_at:
+            self.fail_at.remove(params["offset"])
+            raise httpx.ConnectTimeout("timed out")
+        self.requests.append(params)
+        start = params["offset"]
+        return {"pages": self.rows[start:start + params["limit"]]}
+
+
+@pytest.mark.unit
+def test_top_k_keeps_best_items_in_bounded_memory():
+    """Only k items are kept, best first, and ties keep arrival order."""
+    top = TopK(3)
+    for score, item in [(5, "a"), (9, "b"), (1, "c"), (9, "d"), (7, "e"), (9, "f")]:
+        top.push(score, item)
+    assert len(top) == 3
+    assert top.items() == [(9, "b"), (9, "d"), (9, "f")]
+
+    bottom = TopK(2, largest=False)
+    for score, item in [(5, "a"), (1, "b"), (3, "c")]:
+        bottom.push(score, item)
+    assert bottom.items() == [(1, "b"), (3, "c")]
+
+
+@pytest.mark.unit
+def test_page_stats_single_pass_over_generator():
+    """Counts, totals, weighted rates, threshold hits and top pages come from one pass over a generator."""
+    stats = PageStats(top_k=3).consume(page_rows(1000))
+    summary = stats.summary()
+    assert summary["count"] == 1000
+    assert summary["totals"]["users"] == 1000
+    assert "bounceRate" not in summary["totals"]
+    rows = list(page_rows(1000))
+    weighted = sum(row["bounceRate"] * row["views"] for row in rows) / sum(row["views"] for row in rows)
+    assert summary["means"] == {"bounceRate": pytest.approx(weighted)}
+    assert summary["thresholdHits"] == {"high_bounce": 100}
+    assert [row["views"] for row in summary["top"]] == [999, 998, 997]
+
+
+@pytest.mark.asyncio
+async def test_iter_report_rows_pages_through_offsets():
+    """Rows are streamed page by page until a short page, honouring max_rows."""
+    deps = PagedDeps(2500)
+    stats = await PageStats(top_k=1).aconsume(
+        iter_report_rows(deps, params={"dateRange": "30days"}, page_size=1000)
+    )
+    assert stats.count == 2500
+    assert [params["offset"] for params in deps.requests] == [0, 1000, 2000]
+    assert deps.requests[0] == {"dateRange": "30days", "limit": 1000, "offset": 0}
+
+    deps = PagedDeps(2500)
+    rows = [row async for row in iter_report_rows(deps, page_size=1000, max_rows=1200)]
+    assert len(rows) == 1200
+    assert [params["limit"] for params in deps.requests] == [1000, 200]
+
+
+
+@pytest.mark.asyncio
+async def test_summarize_pages_restarts_a_failed_scan():
+    """A transient failure mid-scan retries the scan without counting pages twice."""
+    ctx = MagicMock()
+    ctx.deps = PagedDeps(2500, fail_at={1000})
+    summary = await summarize_pages(ctx, "30days", top_k=1)
+    assert summary["count"] == 2500
+    assert [params["offset"] for params in ctx.deps.requests] == [0, 0, 1000, 2000]
+
+@pytest.mark.unit
+def test_p2_quantile_tracks_exact_quantiles():
+    """P-squared estimates stay close to exact quantiles; small samples are exact."""
+    values = [((index * 7919) % 10007) / 100 for index in range(10007)]
+    exact = sorted(values)
+    for q in (0.5, 0.9, 0.99):
+        estimator = P2Quantile(q)
+        for value in values:
+            estimator.add(value)
+        assert estimator.value() == pytest.approx(exact[int(q * len(exact))], abs=1.0)
+
+    small = P2Quantile(0.5)
+    assert small.value() is None
+    for value in (3, 1, 2, 10):
+        small.add(value)
+    assert small.value() == 2.5
+    with pytest.raises(ValueError):
+        P2Quantile(1.0)
+
+
+@pytest.mark.unit
+def test_ranking_summary_answers_several_rankings_in_one_pass():
+    """Top, bottom and quantiles per metric; tiny pages are left out of rate rankings."""
+    rows = [
+        {"path": "/", "views": 5000, "bounceRate": 0.30},
+        {"path": "/pricing", "views": 800, "bounceRate": 0.85},
+        {"path": "/blog/a", "views": 300, "bounceRate": 0.60},
+        {"path": "/typo", "views": 1, "bounceRate": 1.0},
+    ]
+    summary = RankingSummary.for_report(
+        "pages", k=2, metrics=("views", "bounceRate"), min_weight=10
+    ).consume(rows).summary()
+
+    assert summary["count"] == 4
+    views = summary["metrics"]["views"]
+    assert views["top"] == [{"path": "/", "value": 5000}, {"path": "/pricing", "value": 800}]
+    assert views["bottom"] == [{"path": "/typo", "value": 1}, {"path": "/blog/a", "value": 300}]
+    bounce = summary["metrics"]["bounceRate"]
+    assert [row["path"] for row in bounce["top"]] == ["/pricing", "/blog/a"]
+    assert bounce["quantiles"]["p50"] == pytest.approx(0.725)
+
+    with pytest.raises(ValueError):
+        RankingSummary.for_report("campaigns")
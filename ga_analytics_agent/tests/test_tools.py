@@ -11,12 +11,15 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 from tools import (
     fetch_ga_data, 
     analyze_metrics, 
+    analyze_metric_columns,
     generate_insights,
     GADataRequest,
     MetricAnalysis,
     InsightGeneration
 )
 from dependencies import GAAnalyticsDependencies
+from metric_engine import analyze_metrics_batch
+from resilience import GAFetchError, RetryPolicy
 
 
 @pytest.mark.unit
@@ -87,14 +90,15 @@ async def test_fetch_ga_data_invalid_endpoint(mock_dependencies):
 @pytest.mark.unit
 @pytest.mark.asyncio
 async def test_fetch_ga_data_with_retry(mock_dependencies):
-    """Test fetch_ga_data retry logic on failure."""
+    """Test fetch_ga_data retry logic on transient failure."""
     mock_dependencies.max_retries = 2
     mock_dependencies.debug = True
+    mock_dependencies.retry_base_delay = 0
     
-    # First call fails, second succeeds
+    # First call fails with a connection error, second succeeds
     expected_data = {"sessions": 1000}
     mock_dependencies.fetch_ga_data = AsyncMock(
-        side_effect=[Exception("Network error"), expected_data]
+        side_effect=[httpx.ConnectError("Network error"), expected_data]
     )
     
     mock_ctx = MagicMock()
@@ -114,16 +118,70 @@ async def test_fetch_ga_data_with_retry(mock_dependencies):
 async def test_fetch_ga_data_max_retries_exceeded(mock_dependencies):
     """Test fetch_ga_data when max retries exceeded."""
     mock_dependencies.max_retries = 2
-    mock_dependencies.fetch_ga_data = AsyncMock(side_effect=Exception("Persistent error"))
+    mock_dependencies.retry_base_delay = 0
+    mock_dependencies.fetch_ga_data = AsyncMock(side_effect=GAFetchError(
+        "GA MCP server error: 503 - Persistent error", kind="http", status_code=503
+    ))
     
     mock_ctx = MagicMock()
     mock_ctx.deps = mock_dependencies
     
-    with pytest.raises(ValueError, match="Failed to fetch GA data after 2 attempts"):
+    # Initial attempt plus max_retries retries
+    with pytest.raises(ValueError, match="Failed to fetch GA data after 3 attempts"):
         await fetch_ga_data(
             ctx=mock_ctx,
             endpoint="/api/summary"
         )
+    assert mock_dependencies.fetch_ga_data.call_count == 3
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_fetch_ga_data_does_not_retry_client_errors(mock_dependencies):
+    """Test 4xx validation errors fail immediately without retries."""
+    mock_dependencies.max_retries = 3
+    mock_dependencies.fetch_ga_data = AsyncMock(side_effect=GAFetchError(
+        "GA MCP server error: 400 - Invalid dateRange", kind="http", status_code=400
+    ))
+    
+    mock_ctx = MagicMock()
+    mock_ctx.deps = mock_dependencies
+    
+    with pytest.raises(ValueError, match="400 - Invalid dateRange"):
+        await fetch_ga_data(ctx=mock_ctx, endpoint="/api/summary")
+    assert mock_dependencies.fetch_ga_data.call_count == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_fetch_ga_data_retry_budget_exhausted(mock_dependencies):
+    """Test Retry-After delays are charged against the per-query budget."""
+    mock_dependencies.max_retries = 5
+    mock_dependencies.retry_budget_seconds = 1.0
+    mock_dependencies.fetch_ga_data = AsyncMock(side_effect=GAFetchError(
+        "GA MCP server error: 429 - Quota exceeded", kind="http", status_code=429, retry_after=30
+    ))
+    
+    mock_ctx = MagicMock()
+    mock_ctx.deps = mock_dependencies
+    
+    with pytest.raises(ValueError, match="retry budget exhausted"):
+        await fetch_ga_data(ctx=mock_ctx, endpoint="/api/summary")
+    assert mock_dependencies.fetch_ga_data.call_count == 1
+
+
+@pytest.mark.unit
+def test_retry_policy_backoff_is_capped_and_honours_retry_after():
+    """Test backoff grows exponentially up to the cap, with Retry-After as a floor."""
+    policy = RetryPolicy(max_retries=5, base_delay=0.5, max_delay=4.0, random=lambda: 1.0)
+    
+    assert [policy.backoff(retry) for retry in range(5)] == [0.5, 1.0, 2.0, 4.0, 4.0]
+    
+    rate_limited = GAFetchError("429", kind="http", status_code=429, retry_after=10)
+    assert policy.delay_for(0, rate_limited) == 10
+    
+    jittered = RetryPolicy(base_delay=0.5, max_delay=4.0, random=lambda: 0.25)
+    assert jittered.backoff(2) == 0.5
 
 
 @pytest.mark.unit
@@ -201,6 +259,41 @@ async def test_analyze_metrics_warning_conditions():
     assert "decrease in traffic" in sessions_analysis.recommendation
 
 
+@pytest.mark.unit
+def test_analyze_metrics_batch_matches_rules():
+    """The vectorized engine computes change, trend and severity per row."""
+    batch = analyze_metrics_batch(
+        names=["sessions", "sessions", "bounce_rate", "conversion_rate", "page_views"],
+        current=[700, 1000, 72.0, 2.0, 50],
+        previous=[1000, None, 80.0, 3.0, 0],
+    )
+    assert list(batch.trends()) == ["down", "stable", "down", "down", "stable"]
+    assert list(batch.severities()) == ["warning", "normal", "warning", "critical", "normal"]
+    assert batch.change_percentage[0] == pytest.approx(-30.0)
+    assert list(batch.flagged) == [0, 2, 3]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_analyze_metric_columns_only_returns_flagged_rows():
+    """Column analysis builds models only for non-normal rows, labelled per row."""
+    mock_ctx = MagicMock()
+    mock_ctx.deps.debug = False
+    rows = 10_000
+    names = ["sessions"] * rows
+    current = [100.0] * rows
+    previous = [100.0] * rows
+    previous[1234] = 200.0
+    labels = [f"/page-{i}" for i in range(rows)]
+
+    analyses = await analyze_metric_columns(mock_ctx, names, current, previous, labels)
+
+    assert len(analyses) == 1
+    assert analyses[0].metric_name == "/page-1234"
+    assert analyses[0].change_percentage == -50.0
+    assert analyses[0].severity == "warning"
+
+
 @pytest.mark.unit
 @pytest.mark.asyncio
 async def test_analyze_metrics_critical_conditions():